@@ -1,9 +1,12 @@
 import streamlit as st
 import requests
+import json
+import time
 from config.model_config import ModelProvider
 from pathlib import Path
 
 API_URL = "http://localhost:8000"
+JOB_POLL_INTERVAL = 1.0
 
 # Load CSS
 def load_css():
@@ -35,6 +38,8 @@ model_provider = st.sidebar.selectbox(
 # Initialize session state
 if 'current_index_path' not in st.session_state:
     st.session_state.current_index_path = None
+if 'current_document_id' not in st.session_state:
+    st.session_state.current_document_id = None
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 if 'document_summary' not in st.session_state:
@@ -50,44 +55,86 @@ if st.session_state.model_provider != model_provider:
     st.session_state.chat_history = []
     st.session_state.document_summary = None
 
-@st.cache_data
-def get_document_summary(index_path, model_provider):
-    response = requests.post(
-        f"{API_URL}/documents/summarize", 
-        json={"index_path": index_path, "model_provider": model_provider}
-    )
-    if response.status_code == 200:
-        return response.json().get("summary", "No summary available.")
-    else:
-        return "Failed to summarize document."
+def iter_sse_events(response):
+    """Parses a text/event-stream response into (event, data) pairs"""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
+
+def stream_to_placeholder(endpoint, payload, placeholder, css_class):
+    """Renders streamed tokens into a placeholder; returns the full text and the final sources"""
+    text, sources = "", None
+    with requests.post(f"{API_URL}{endpoint}", json=payload, stream=True) as response:
+        if response.status_code != 200:
+            return None, None
+        for event, data in iter_sse_events(response):
+            if event == "token":
+                text += data
+                placeholder.markdown(f'<div class="{css_class}">{text}</div>', unsafe_allow_html=True)
+            elif event == "sources":
+                sources = data
+            elif event == "error":
+                return None, None
+    return text, sources
 
 # Callback for sending messages
 def send_message():
     st.session_state.send_message = True
 
+def wait_for_job(job, label):
+    """Polls an ingestion job until it finishes, showing per-stage progress"""
+    progress = st.progress(0.0, text=f"{label}: queued")
+    while job["status"] in ("queued", "running"):
+        time.sleep(JOB_POLL_INTERVAL)
+        response = requests.get(f"{API_URL}/documents/jobs/{job['job_id']}")
+        if response.status_code != 200:
+            progress.empty()
+            return None
+        job = response.json()
+        stages = job.get("stages", {})
+        completed = sum(1 for status in stages.values() if status == "completed")
+        stage = job.get("current_stage") or job["status"]
+        progress.progress(completed / max(len(stages), 1), text=f"{label}: {stage}")
+    progress.empty()
+    return job
+
 # Upload documents or process links
 st.header("Upload Documents or Process Links")
 upload_option = st.radio("Choose an option:", ("Upload Files", "Paste Document Link"))
 
 if upload_option == "Upload Files":
     uploaded_files = st.file_uploader("Choose files", accept_multiple_files=True)
-    if st.button("Upload"):
-        for uploaded_file in uploaded_files:
-            files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
-            response = requests.post(f"{API_URL}/documents/upload", files=files)
-            if response.status_code == 200:
-                st.success(f"Uploaded and processed: {uploaded_file.name}")
-                st.session_state.current_index_path = response.json().get('index_path')
-                st.session_state.document_summary = None
-            else:
-                st.error(f"Failed to upload {uploaded_file.name}")
+    if st.button("Upload") and uploaded_files:
+        files = [("files", (f.name, f, f.type)) for f in uploaded_files]
+        response = requests.post(f"{API_URL}/documents/jobs", files=files)
+        if response.status_code == 200:
+            for submitted in response.json().get("jobs", []):
+                filename = submitted["filename"]
+                job = wait_for_job(submitted, filename)
+                if job and job["status"] == "completed":
+                    st.success(f"Uploaded and processed: {filename}")
+                    st.session_state.current_index_path = job["result"].get('index_path')
+                    st.session_state.current_document_id = job["result"].get('document_id')
+                    st.session_state.document_summary = None
+                else:
+                    st.error(f"Failed to process {filename}: {job.get('error') if job else 'job not found'}")
+        else:
+            st.error("Failed to upload files")
 else:
     document_link = st.text_input("Enter document link (including arXiv links):")
     if st.button("Process Link"):
-        response = requests.post(f"{API_URL}/documents/process-link", json={"document_link": document_link})
-        if response.status_code == 200:
-            st.success(f"Processed document from link: {response.json().get('filename')}")
-            st.session_state.current_index_path = response.json().get('index_path')
+        response = requests.post(f"{API_URL}/documents/jobs/link", json={"document_link": document_link})
+        job = wait_for_job(response.json(), "Processing link") if response.status_code == 200 else None
+        if job and job["status"] == "completed":
+            st.success(f"Processed document from link: {job['result'].get('filename')}")
+            st.session_state.current_index_path = job["result"].get('index_path')
+            st.session_state.current_document_id = job["result"].get('document_id')
             st.session_state.document_summary = None
         else:
             st.error("Failed to process document link")
@@ -95,15 +142,18 @@ else:
 # Summarize document
 if st.session_state.current_index_path:
     if st.button("Summarize Document") or st.session_state.document_summary:
-        if not st.session_state.document_summary:
-            st.session_state.document_summary = get_document_summary(
-                st.session_state.current_index_path,
-                st.session_state.model_provider
-            )
-        
         st.markdown("---")
         st.markdown("## 📄 Document Summary")
-        st.markdown(f"""
+        summary_placeholder = st.empty()
+        if not st.session_state.document_summary:
+            summary, _ = stream_to_placeholder(
+                "/documents/summarize/stream",
+                {"index_path": st.session_state.current_index_path, "model_provider": st.session_state.model_provider},
+                summary_placeholder,
+                "summary-container"
+            )
+            st.session_state.document_summary = summary or "Failed to summarize document."
+        summary_placeholder.markdown(f"""
         <div class="summary-container">
             {st.session_state.document_summary}
         </div>
@@ -130,21 +180,28 @@ user_input = st.text_input(
 
 # Handle message sending
 if st.session_state.send_message:
-    if st.session_state.current_index_path and user_input:
+    if (st.session_state.current_index_path or st.session_state.current_document_id) and user_input:
         st.session_state.chat_history.append({"role": "user", "content": user_input})
+        st.markdown(f'<div class="user-message">{user_input}</div>', unsafe_allow_html=True)
         
-        response = requests.post(
-            f"{API_URL}/documents/ask",
-            json={
+        answer, sources = stream_to_placeholder(
+            "/documents/ask/stream",
+            {
                 "query": user_input,
                 "index_path": st.session_state.current_index_path,
+                # Without a per-document index the question goes to the corpus, narrowed to this document
+                "document_ids": [st.session_state.current_document_id] if st.session_state.current_document_id else None,
                 "model_provider": st.session_state.model_provider
-            }
+            },
+            st.empty(),
+            "assistant-message"
         )
         
-        if response.status_code == 200:
-            answer = response.json().get("answer", "No answer found.")
-            st.session_state.chat_history.append({"role": "assistant", "content": answer})
+        if answer is not None:
+            web_sources = (sources or {}).get("web", [])
+            if web_sources:
+                answer += "\n\nSources:\n" + "".join(f"- {source['title']}: {source['url']}\n" for source in web_sources)
+            st.session_state.chat_history.append({"role": "assistant", "content": answer or "No answer found."})
         else:
             st.error("Failed to get an answer.")
     
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, ConfigDict
+import os
+from dotenv import load_dotenv
+from researcher.core.config.model_config import EmbeddingProvider, MODEL_CONFIG
+
+load_dotenv()
+
+# Paraphrased questions score about 0.95 under ada-002 but lower under MiniLM, the local default
+SIMILARITY_THRESHOLD_DEFAULTS = {
+    EmbeddingProvider.OPENAI: "0.95",
+    EmbeddingProvider.LOCAL: "0.90"
+}
+
+class AnswerCacheConfig(BaseModel):
+    """Configuration for reusing answers to repeated questions over the same index"""
+    enabled: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    # Number of (index, provider, model) scopes kept in memory
+    max_indexes: int = int(os.getenv("ANSWER_CACHE_MAX_INDEXES", "256"))
+    max_entries_per_index: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES_PER_INDEX", "500"))
+    # Cosine similarity between query embeddings above which a past answer is reused
+    similarity_threshold: float = float(os.getenv(
+        "ANSWER_CACHE_SIMILARITY_THRESHOLD", SIMILARITY_THRESHOLD_DEFAULTS[MODEL_CONFIG.embedding.provider]
+    ))
+    ttl_seconds: float = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+    # Answers that used web search go stale independently of the index, so they are not cached by default
+    cache_web_answers: bool = os.getenv("ANSWER_CACHE_WEB_ANSWERS", "false").lower() == "true"
+
+    model_config = ConfigDict(protected_namespaces=())
+
+ANSWER_CACHE_CONFIG = AnswerCacheConfig()
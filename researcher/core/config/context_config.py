@@ -0,0 +1,20 @@
+from pydantic import BaseModel, ConfigDict
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class ContextConfig(BaseModel):
+    """Token budgets for the context placed in answer prompts"""
+    document_max_tokens: int = int(os.getenv("CONTEXT_DOCUMENT_MAX_TOKENS", "2000"))
+    web_max_tokens: int = int(os.getenv("CONTEXT_WEB_MAX_TOKENS", "800"))
+    # A chunk that does not fit whole is truncated only if at least this many tokens remain
+    min_partial_tokens: int = int(os.getenv("CONTEXT_MIN_PARTIAL_TOKENS", "64"))
+    # Must match the chunk overlap used at ingestion so repeated text between neighbours is removed
+    chunk_overlap_chars: int = 50
+    # Shorter shared text between neighbours is treated as coincidence rather than splitter overlap
+    chunk_overlap_min_chars: int = 10
+
+    model_config = ConfigDict(protected_namespaces=())
+
+CONTEXT_CONFIG = ContextConfig()
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, ConfigDict
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class HTTPClientConfig(BaseModel):
+    """Configuration for the shared outbound HTTP client"""
+    max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    max_connections_per_host: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+    keepalive_timeout: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    dns_cache_ttl: int = 300
+    connect_timeout: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    total_timeout: float = float(os.getenv("HTTP_TOTAL_TIMEOUT", "60"))
+    max_retries: int = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+
+    model_config = ConfigDict(protected_namespaces=())
+
+HTTP_CLIENT_CONFIG = HTTPClientConfig()
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class IngestionConfig(BaseModel):
+    """Configuration for document ingestion workers and pools"""
+    # PDF parsing and text splitting are CPU-bound and run in separate processes
+    cpu_workers: int = int(os.getenv("INGESTION_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+    use_process_pool: bool = os.getenv("INGESTION_USE_PROCESS_POOL", "true").lower() == "true"
+    # Embedding requests and index writes block on network and disk
+    io_workers: int = int(os.getenv("INGESTION_IO_WORKERS", "8"))
+    # Query embeddings and corpus shard searches get their own threads so questions never queue behind uploads
+    query_workers: int = int(os.getenv("QUERY_WORKERS", "8"))
+    # Uploads and downloads are streamed to disk in chunks and rejected past max_upload_bytes
+    max_upload_bytes: int = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+    upload_chunk_bytes: int = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+    # Files up to this size are parsed from memory in the I/O pool instead of being re-read from disk
+    in_memory_parse_max_bytes: int = int(os.getenv("IN_MEMORY_PARSE_MAX_BYTES", str(8 * 1024 * 1024)))
+    # Files processed at once by /documents/upload-multiple
+    max_parallel_files: int = int(os.getenv("INGESTION_MAX_PARALLEL_FILES", "4"))
+    # Chunks from concurrently ingested files are embedded together in batches of this size
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "1000"))
+    embedding_batch_wait_ms: float = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "50"))
+    # Background ingestion jobs submitted through /documents/jobs
+    max_concurrent_jobs: int = int(os.getenv("INGESTION_MAX_CONCURRENT_JOBS", "2"))
+    job_db_path: str = os.getenv("INGESTION_JOB_DB_PATH", os.path.join("cache", "jobs.sqlite"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+INGESTION_CONFIG = IngestionConfig()
@@ -10,6 +10,26 @@ class ModelProvider(str, Enum):
     OPENAI = "openai"
     LOCAL = "local"
 
+class EmbeddingProvider(str, Enum):
+    OPENAI = "openai"
+    LOCAL = "local"
+
+class EmbeddingConfig(BaseModel):
+    """Configuration for the model that embeds chunks and queries"""
+    provider: EmbeddingProvider = EmbeddingProvider(os.getenv("EMBEDDING_PROVIDER", "openai"))
+    openai_model: str = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+    local_model: str = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    # torch or int8 (dynamically quantized linear layers, CPU only)
+    local_backend: str = os.getenv("LOCAL_EMBEDDING_BACKEND", "torch")
+    device: str = os.getenv("LOCAL_EMBEDDING_DEVICE", "cpu")
+    # Intra-op threads used by torch; 0 keeps its default of one per core
+    num_threads: int = int(os.getenv("LOCAL_EMBEDDING_THREADS", "0"))
+    batch_size: int = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64"))
+    # How long a query waits for queries from concurrent requests to join its batch
+    query_batch_wait_ms: float = float(os.getenv("LOCAL_EMBEDDING_QUERY_BATCH_WAIT_MS", "5"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
 class LocalModelConfig(BaseModel):
     """Configuration for Hugging Face Inference API"""
     model_id: str = "mistralai/Mistral-7B-Instruct-v0.3"
@@ -19,6 +39,9 @@ class LocalModelConfig(BaseModel):
     top_p: float = 0.9
     torch_dtype: str = "bfloat16"
     device_map: str = "auto"
+    # In-flight requests to the inference endpoint; further requests queue
+    max_concurrent_requests: int = int(os.getenv("LOCAL_MODEL_MAX_CONCURRENT_REQUESTS", "4"))
+    timeout: float = float(os.getenv("LOCAL_MODEL_TIMEOUT", "120"))
 
     model_config = ConfigDict(protected_namespaces=())
 
@@ -28,6 +51,10 @@ class OpenAIConfig(BaseModel):
     api_key: str = os.getenv("OPENAI_API_KEY", "")
     max_tokens: int = 500
     temperature: float = 0.7
+    # Connection pool of the long-lived client shared by all requests
+    max_connections: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    max_keepalive_connections: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    timeout: float = float(os.getenv("OPENAI_TIMEOUT", "60"))
 
     model_config = ConfigDict(protected_namespaces=())
 
@@ -35,6 +62,7 @@ class ModelConfig(BaseModel):
     """Main configuration class for model settings"""
     openai: OpenAIConfig = OpenAIConfig()
     local: LocalModelConfig = LocalModelConfig()
+    embedding: EmbeddingConfig = EmbeddingConfig()
     active_provider: ModelProvider = ModelProvider.OPENAI
 
     model_config = ConfigDict(protected_namespaces=())
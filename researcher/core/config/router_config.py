@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+import os
+from dotenv import load_dotenv
+from researcher.core.config.model_config import EmbeddingProvider, MODEL_CONFIG
+
+load_dotenv()
+
+# Cosine scores sit on a different scale per embedding model: ada-002 rarely scores related text
+# below 0.7, while MiniLM (the local default) puts relevant chunks at roughly 0.4-0.7
+SIMILARITY_THRESHOLD_DEFAULTS = {
+    EmbeddingProvider.OPENAI: {"document": "0.80", "external": "0.72"},
+    EmbeddingProvider.LOCAL: {"document": "0.55", "external": "0.40"}
+}
+_thresholds = SIMILARITY_THRESHOLD_DEFAULTS[MODEL_CONFIG.embedding.provider]
+
+class QueryRouterConfig(BaseModel):
+    """Configuration for choosing between document context and web search"""
+    # Decide confident cases locally; only ambiguous queries reach the LLM
+    local_routing_enabled: bool = os.getenv("ROUTER_LOCAL_ROUTING_ENABLED", "true").lower() == "true"
+    # Best chunk similarity at or above which a query without temporal keywords is answered from the document
+    document_similarity_threshold: float = float(os.getenv("ROUTER_DOCUMENT_SIMILARITY_THRESHOLD", _thresholds["document"]))
+    # Best chunk similarity below which a query with external signals goes to web search
+    external_similarity_threshold: float = float(os.getenv("ROUTER_EXTERNAL_SIMILARITY_THRESHOLD", _thresholds["external"]))
+    # The routing completion only has to name a function
+    llm_max_tokens: int = int(os.getenv("ROUTER_LLM_MAX_TOKENS", "60"))
+    # Fraction of locally routed queries also sent to the LLM in the background to measure agreement
+    shadow_sample_rate: float = float(os.getenv("ROUTER_SHADOW_SAMPLE_RATE", "0.0"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+ROUTER_CONFIG = QueryRouterConfig()
@@ -9,6 +9,16 @@ class GoogleSearchConfig(BaseModel):
     api_key: str = os.getenv("GOOGLE_API_KEY", "")
     search_engine_id: str = os.getenv("GOOGLE_CSE_ID", "")
     max_results: int = 5
+    # Start the web search alongside the LLM routing call when the query looks external
+    speculative_search_enabled: bool = os.getenv("SPECULATIVE_SEARCH_ENABLED", "true").lower() == "true"
+    # Rate budget for searches that may be discarded when routing picks the document
+    speculative_searches_per_minute: float = float(os.getenv("SPECULATIVE_SEARCHES_PER_MINUTE", "30"))
+    speculative_search_burst: int = int(os.getenv("SPECULATIVE_SEARCH_BURST", "5"))
+    # Result cache: identical queries within the TTL reuse the previous response
+    cache_max_entries: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+    cache_ttl_seconds: float = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "900"))
+    # API errors are remembered briefly so a failing or exhausted quota is not hammered
+    error_cache_ttl_seconds: float = float(os.getenv("SEARCH_ERROR_CACHE_TTL_SECONDS", "30"))
     
     model_config = ConfigDict(protected_namespaces=())
 
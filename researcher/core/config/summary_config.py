@@ -0,0 +1,35 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class SummaryConfig(BaseModel):
+    """Configuration for document summaries and their persistent cache"""
+    cache_enabled: bool = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    db_path: str = os.getenv("SUMMARY_DB_PATH", os.path.join("cache", "summaries.sqlite"))
+    # Providers whose summary is generated in the background as soon as a document is ingested
+    precompute_providers: List[str] = [
+        provider.strip()
+        for provider in os.getenv("SUMMARY_PRECOMPUTE_PROVIDERS", "openai").split(",")
+        if provider.strip()
+    ]
+    # Background summaries generated at once; the rest wait, so bulk uploads do not flood the model
+    max_background_summaries: int = int(os.getenv("SUMMARY_MAX_BACKGROUND_SUMMARIES", "2"))
+    # Retrieval for summaries: hits per generated query, then a diverse subset of at most max_chunks
+    retrieval_k: int = int(os.getenv("SUMMARY_RETRIEVAL_K", "8"))
+    max_chunks: int = int(os.getenv("SUMMARY_MAX_CHUNKS", "30"))
+    mmr_lambda: float = float(os.getenv("SUMMARY_MMR_LAMBDA", "0.7"))
+    # Chunks at least this similar to an already selected chunk are treated as duplicates
+    duplicate_threshold: float = float(os.getenv("SUMMARY_DUPLICATE_THRESHOLD", "0.95"))
+    # Articles whose chunks fit in this many tokens are summarized in a single call
+    single_pass_max_tokens: int = int(os.getenv("SUMMARY_SINGLE_PASS_MAX_TOKENS", "12000"))
+    # Token budget of each chunk group (and partial summary group) in map-reduce mode
+    group_max_tokens: int = int(os.getenv("SUMMARY_GROUP_MAX_TOKENS", "3000"))
+    # Concurrent LLM calls per document while mapping and reducing
+    max_concurrent_calls: int = int(os.getenv("SUMMARY_MAX_CONCURRENT_CALLS", "4"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+SUMMARY_CONFIG = SummaryConfig()
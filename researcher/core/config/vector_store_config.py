@@ -0,0 +1,93 @@
+from pydantic import BaseModel, ConfigDict
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class IndexCacheConfig(BaseModel):
+    """Configuration for the in-process cache of loaded vector indexes"""
+    max_entries: int = int(os.getenv("INDEX_CACHE_MAX_ENTRIES", "32"))
+    max_bytes: int = int(os.getenv("INDEX_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class EmbeddingCacheConfig(BaseModel):
+    """Configuration for the persistent chunk and query embedding caches"""
+    enabled: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    path: str = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("cache", "embeddings.sqlite"))
+    lookup_batch_size: int = 500
+    query_cache_max_entries: int = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class CorpusConfig(BaseModel):
+    """Configuration for the corpus-wide index that spans every ingested document"""
+    enabled: bool = os.getenv("CORPUS_INDEX_ENABLED", "true").lower() == "true"
+    index_dir: str = os.getenv("CORPUS_INDEX_DIR", "corpus_index")
+    # Also write a standalone index per upload; summaries and index_path questions need one, but it doubles index writes
+    per_document_indexes: bool = os.getenv("CORPUS_PER_DOCUMENT_INDEXES", "true").lower() == "true"
+    # Upper bound on the chunks in one shard; compaction packs small shards up to this size
+    shard_max_chunks: int = int(os.getenv("CORPUS_SHARD_MAX_CHUNKS", "50000"))
+    # Compact a shard once this fraction of its chunks has been deleted
+    compaction_tombstone_ratio: float = float(os.getenv("CORPUS_COMPACTION_TOMBSTONE_RATIO", "0.2"))
+    # Merge small shards once there are more than this many of them
+    compaction_max_small_shards: int = int(os.getenv("CORPUS_COMPACTION_MAX_SMALL_SHARDS", "8"))
+    # A shard is small below this fraction of shard_max_chunks; larger shards are never merged again
+    compaction_small_shard_ratio: float = float(os.getenv("CORPUS_COMPACTION_SMALL_SHARD_RATIO", "0.125"))
+    # Shards replaced by compaction stay on disk this long so in-flight searches can finish
+    retired_shard_grace_seconds: float = float(os.getenv("CORPUS_RETIRED_SHARD_GRACE_SECONDS", "60"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class AnnConfig(BaseModel):
+    """
+    Approximate nearest neighbour settings. With index_type "auto" the structure is picked from
+    the vector count: exact search below flat_max_vectors, HNSW below hnsw_max_vectors, IVF below
+    ivfpq_min_vectors and IVF-PQ above it.
+    """
+    index_type: str = os.getenv("ANN_INDEX_TYPE", "auto")
+    flat_max_vectors: int = int(os.getenv("ANN_FLAT_MAX_VECTORS", "10000"))
+    # HNSW builds slowly and shards are rebuilt on every write, so auto only picks it when enabled
+    hnsw_max_vectors: int = int(os.getenv("ANN_HNSW_MAX_VECTORS", "0"))
+    ivfpq_min_vectors: int = int(os.getenv("ANN_IVFPQ_MIN_VECTORS", "1000000"))
+    hnsw_m: int = int(os.getenv("ANN_HNSW_M", "32"))
+    hnsw_ef_construction: int = int(os.getenv("ANN_HNSW_EF_CONSTRUCTION", "80"))
+    ef_search: int = int(os.getenv("ANN_EF_SEARCH", "64"))
+    # 0 picks about 4 * sqrt(n) lists, capped so every list gets enough training points
+    ivf_nlist: int = int(os.getenv("ANN_IVF_NLIST", "0"))
+    nprobe: int = int(os.getenv("ANN_NPROBE", "16"))
+    # 0 picks dim / 4 sub-quantizers
+    pq_m: int = int(os.getenv("ANN_PQ_M", "0"))
+    pq_nbits: int = 8
+    # IVF-PQ candidates are re-scored exactly against the memory-mapped float32 vectors
+    pq_rescore_factor: int = int(os.getenv("ANN_PQ_RESCORE_FACTOR", "8"))
+    train_sample_size: int = int(os.getenv("ANN_TRAIN_SAMPLE_SIZE", "100000"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class CompressionConfig(BaseModel):
+    """
+    Compressed vector codes that searches scan instead of the float32 vectors. The float32 vectors
+    stay memory-mapped on disk and only the top candidates are re-scored against them exactly.
+    """
+    # none, fp16 or int8 (per-dimension scalar quantization)
+    codec: str = os.getenv("VECTOR_CODEC", "none")
+    # Project exact-search codes onto this many principal components; 0 keeps every dimension
+    pca_dim: int = int(os.getenv("VECTOR_PCA_DIM", "0"))
+    # Candidates re-scored exactly per requested result
+    rescore_factor: int = int(os.getenv("VECTOR_RESCORE_FACTOR", "4"))
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class VectorStoreConfig(BaseModel):
+    """Configuration for vector index storage and retrieval"""
+    index_dir: str = os.getenv("INDEX_DIR", "faiss_indexes")
+    cache: IndexCacheConfig = IndexCacheConfig()
+    embedding_cache: EmbeddingCacheConfig = EmbeddingCacheConfig()
+    corpus: CorpusConfig = CorpusConfig()
+    ann: AnnConfig = AnnConfig()
+    compression: CompressionConfig = CompressionConfig()
+
+    model_config = ConfigDict(protected_namespaces=())
+
+VECTOR_STORE_CONFIG = VectorStoreConfig()
@@ -1,12 +1,34 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from researcher.core.routers import document_routes
+from researcher.core.utils.concurrency import shutdown_pools
+from researcher.core.utils.ingestion_jobs import job_manager
+from researcher.core.utils.http_client import http_client
+from researcher.core.utils.model_factory import ModelFactory
+from researcher.core.utils.rag_pipeline import RAGPipeline
+from researcher.core.utils.summary_cache import summary_manager
+from researcher.core.utils.vector_store import stop_corpus_maintenance
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.start()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await summary_manager.stop()
+    await stop_corpus_maintenance()
+    await http_client.close()
+    await ModelFactory.close_all()
+    RAGPipeline.clear()
+    shutdown_pools()
 
 app = FastAPI(
     title="ResearchGPT API",
     description="Backend API for ResearchGPT: Your AI Research Assistant for Scientific Papers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
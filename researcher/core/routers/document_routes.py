@@ -1,14 +1,37 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Body
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from typing import List
+from typing import List, Optional
 import os
+import time
+import asyncio
 import logging
-import aiohttp
 import re
-import aiofiles
-from researcher.core.utils.text_processing import extract_text, chunk_text
-from researcher.core.utils.vector_store import store_chunks, search_similar_chunks
+from researcher.core.utils.vector_store import (
+    search_similar_chunks,
+    search_corpus,
+    get_corpus_index,
+    delete_document,
+    schedule_corpus_maintenance,
+    embed_query,
+    get_index_content_hash,
+    get_index_cache_stats,
+    get_embedding_cache_stats
+)
+from researcher.core.utils.corpus_index import DocumentFilter
+from researcher.core.utils.embedding_providers import EmbeddingModelMismatchError
+from researcher.core.utils.mmap_index import UnsupportedIndexFormatError
+from researcher.core.utils.answer_cache import AnswerScope, answer_cache
+from researcher.core.utils.summary_cache import summary_manager
 from researcher.core.utils.rag_pipeline import RAGPipeline
+from researcher.core.utils.model_factory import ModelFactory
+from researcher.core.utils.concurrency import run_io_bound, run_query_bound
+from researcher.core.utils.streaming import collect_stream, replay_events, stream_events
+from researcher.core.utils.search_utils import get_search_cache_stats
+from researcher.core.utils.ingestion import UPLOAD_DIR, DocumentDownloadError, download_document, ingest_document
+from researcher.core.utils.ingestion_jobs import job_manager
+from researcher.core.utils.file_utils import FileTooLargeError, SavedFile, iter_upload, stream_to_file
+from researcher.core.config.ingestion_config import INGESTION_CONFIG
 from config.model_config import ModelProvider
 
 
@@ -18,8 +41,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-UPLOAD_DIR = "uploads"
-
 # Pydantic models for request bodies
 class DocumentLinkRequest(BaseModel):
     document_link: str
@@ -27,90 +48,142 @@ class DocumentLinkRequest(BaseModel):
 
 class QuestionRequest(BaseModel):
     query: str
-    index_path: str
+    # Searches a single document's index when set, otherwise the corpus narrowed by document_ids/filters
+    index_path: Optional[str] = None
+    document_ids: Optional[List[str]] = None
+    filters: Optional[DocumentFilter] = None
     model_provider: ModelProvider
     model_config = ConfigDict(protected_namespaces=())
 
+    def corpus_filter(self) -> DocumentFilter:
+        document_filter = self.filters.model_copy() if self.filters else DocumentFilter()
+        if self.document_ids is not None:
+            document_filter.document_ids = self.document_ids
+        return document_filter
+
 class SummarizeRequest(BaseModel):
     index_path: str
     model_provider: ModelProvider
     model_config = ConfigDict(protected_namespaces=())
 
-async def save_uploaded_file(file: UploadFile) -> str:
-    if not os.path.exists(UPLOAD_DIR):
-        os.makedirs(UPLOAD_DIR)
-    
+async def save_uploaded_file(file: UploadFile) -> SavedFile:
     file_path = os.path.join(UPLOAD_DIR, file.filename)
     
     try:
-        contents = await file.read()
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(contents)
+        saved = await stream_to_file(
+            iter_upload(file, INGESTION_CONFIG.upload_chunk_bytes),
+            file_path,
+            max_bytes=INGESTION_CONFIG.max_upload_bytes,
+            keep_in_memory_below=INGESTION_CONFIG.in_memory_parse_max_bytes
+        )
         logger.info(f"File saved successfully: {file_path}")
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
     
-    return file_path
+    return saved
 
-async def process_document(file_path: str, filename: str) -> dict:
+async def process_document(saved: SavedFile, filename: str, source: str = "upload") -> dict:
     try:
-        extracted_text = await extract_text(file_path)
-        chunks = await chunk_text(extracted_text)
-        index_path = await store_chunks(chunks, {"filename": filename})
-        logger.info(f"Document processed: {filename}")
-        return {"filename": filename, "file_path": file_path, "num_chunks": len(chunks), "index_path": index_path}
+        result = await ingest_document(saved.file_path, filename, content=saved.content, source=source)
+        result["content_hash"] = saved.sha256
+        summary_manager.schedule(result["index_path"])
+        return result
     except Exception as e:
         logger.error(f"Error processing document: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
 
 @router.post("/upload")
 async def upload_document(file: UploadFile = File(...)):
-    file_path = await save_uploaded_file(file)
-    return await process_document(file_path, file.filename)
+    saved = await save_uploaded_file(file)
+    return await process_document(saved, file.filename)
 
 @router.post("/upload-multiple")
 async def upload_multiple_documents(files: List[UploadFile] = File(...)):
-    results = []
-    for file in files:
-        file_path = await save_uploaded_file(file)
-        result = await process_document(file_path, file.filename)
-        results.append(result)
+    semaphore = asyncio.Semaphore(INGESTION_CONFIG.max_parallel_files)
+
+    async def upload_one(file: UploadFile) -> dict:
+        async with semaphore:
+            try:
+                saved = await save_uploaded_file(file)
+                return await process_document(saved, file.filename)
+            except HTTPException as e:
+                return {"filename": file.filename, "error": e.detail}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[upload_one(file) for file in files])
+    logger.info(f"Processed {len(files)} documents in {time.perf_counter() - started:.2f}s")
     return results
 
 @router.post("/process-link")
 async def process_document_link(request: DocumentLinkRequest):
     try:
-        # Check if it's an arXiv link
-        arxiv_id_match = request.document_link.split('/')[-1]
-        if arxiv_id_match:
-            document_link = f"https://arxiv.org/pdf/{arxiv_id_match}.pdf"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(document_link) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    filename = arxiv_id_match + '.pdf'
-                    file_path = os.path.join(UPLOAD_DIR, filename)
-                    
-                    async with aiofiles.open(file_path, 'wb') as f:
-                        await f.write(content)
-                    return await process_document(file_path, filename)
-                else:
-                    raise HTTPException(status_code=response.status, detail="Failed to download document")
+        saved, filename = await download_document(request.document_link)
+        return await process_document(saved, filename, source=request.document_link)
+    except DocumentDownloadError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing document link: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing document link: {str(e)}")
 
+@router.post("/jobs")
+async def submit_ingestion_jobs(files: List[UploadFile] = File(...)):
+    jobs = []
+    for file in files:
+        saved = await save_uploaded_file(file)
+        jobs.append(job_manager.submit_file(saved.file_path, file.filename))
+    return {"jobs": [job.model_dump() for job in jobs]}
+
+@router.post("/jobs/link")
+async def submit_link_ingestion_job(request: DocumentLinkRequest):
+    job = job_manager.submit_link(request.document_link)
+    return job.model_dump()
+
+@router.get("/jobs")
+async def list_ingestion_jobs(limit: int = 50):
+    return {"jobs": [job.model_dump() for job in job_manager.list_jobs(limit)]}
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    job = job_manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No ingestion job with id {job_id}")
+    return job.model_dump()
+
+def answer_scope(rag: RAGPipeline, request: QuestionRequest) -> AnswerScope:
+    if request.index_path:
+        index_version = get_index_content_hash(request.index_path)
+    else:
+        index_version = f"corpus:{get_corpus_index().version()}:{request.corpus_filter().cache_key()}"
+    return index_version, ModelProvider(request.model_provider).value, rag.model.model_name
+
+async def retrieve_question_chunks(request: QuestionRequest, query_vector: list) -> list:
+    if request.index_path:
+        return await search_similar_chunks(request.query, request.index_path, query_vector=query_vector)
+    return await search_corpus(request.query, document_filter=request.corpus_filter(), query_vector=query_vector)
+
 @router.post("/ask")
 async def ask_question(request: QuestionRequest):
     try:
-        similar_chunks = await search_similar_chunks(request.query, request.index_path)
-        rag = RAGPipeline(request.model_provider)
-        answer = await rag.answer_question(request.query, similar_chunks)
-        return {"query": request.query, "answer": answer}
+        rag = RAGPipeline.for_provider(request.model_provider)
+        scope = answer_scope(rag, request)
+        query_vector = await run_query_bound(embed_query, request.query)
+        cached = answer_cache.lookup(scope, request.query, query_vector)
+        if cached is not None:
+            return {"query": request.query, "answer": cached.answer, "cached": True, "context": None}
+
+        similar_chunks = await retrieve_question_chunks(request, query_vector)
+        result = await rag.answer_question_with_sources(request.query, similar_chunks)
+        answer_cache.store(scope, request.query, query_vector, result["answer"], result["sources"])
+        return {"query": request.query, "answer": result["answer"], "cached": False, "context": result["context"]}
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (EmbeddingModelMismatchError, UnsupportedIndexFormatError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error answering question: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error answering question: {str(e)}")
@@ -118,19 +191,82 @@ async def ask_question(request: QuestionRequest):
 @router.post("/summarize")
 async def summarize_document_route(request: SummarizeRequest):
     try:
-        rag = RAGPipeline(request.model_provider)
-        queries = await rag.generate_queries()
-
-        all_chunks = []
-        for query in queries:
-            chunks = await search_similar_chunks(query, request.index_path, k=8)
-            all_chunks.extend(chunks)
-
-        unique_chunks = list({chunk.page_content: chunk for chunk in all_chunks}.values())
-        summary = await rag.summarize_document(unique_chunks)
-        return {"summary": summary}
+        rag = RAGPipeline.for_provider(request.model_provider)
+        result = await summary_manager.get_summary(rag, request.index_path)
+        return {"summary": result["summary"]}
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except (EmbeddingModelMismatchError, UnsupportedIndexFormatError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Error summarizing document: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error summarizing document: {str(e)}")
+
+@router.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    rag = RAGPipeline.for_provider(request.model_provider)
+    try:
+        scope = answer_scope(rag, request)
+        query_vector = await run_query_bound(embed_query, request.query)
+        cached = answer_cache.lookup(scope, request.query, query_vector)
+        if cached is not None:
+            events = replay_events(cached.answer, cached.sources)
+        else:
+            similar_chunks = await retrieve_question_chunks(request, query_vector)
+            events = collect_stream(
+                rag.stream_answer(request.query, similar_chunks),
+                lambda answer, sources: answer_cache.store(scope, request.query, query_vector, answer, sources)
+            )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (EmbeddingModelMismatchError, UnsupportedIndexFormatError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return StreamingResponse(stream_events(events), media_type="text/event-stream")
+
+@router.post("/summarize/stream")
+async def summarize_document_stream(request: SummarizeRequest):
+    rag = RAGPipeline.for_provider(request.model_provider)
+    try:
+        scope = summary_manager.scope(rag, request.index_path)
+        cached = await summary_manager.lookup(scope)
+        if cached is not None:
+            events = replay_events(cached["summary"], cached["sources"])
+        else:
+            events = await summary_manager.stream_summary(rag, request.index_path, scope)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (EmbeddingModelMismatchError, UnsupportedIndexFormatError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return StreamingResponse(stream_events(events), media_type="text/event-stream")
+
+@router.get("/corpus")
+async def list_corpus_documents(limit: int = 100):
+    corpus = get_corpus_index()
+    records = corpus.registry.find(limit=limit)
+    return {"documents": [record.model_dump() for record in records], "stats": corpus.stats()}
+
+@router.delete("/corpus/{document_id}")
+async def delete_corpus_document(document_id: str):
+    record = await run_io_bound(delete_document, document_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"No document with id {document_id} in the corpus")
+    schedule_corpus_maintenance()
+    return {"deleted": record.model_dump()}
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return {
+        "index_cache": get_index_cache_stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "search_cache": get_search_cache_stats(),
+        "answer_cache": answer_cache.stats(),
+        "summary_cache": summary_manager.stats()
+    }
+
+@router.get("/models/stats")
+async def get_model_stats():
+    return ModelFactory.stats()
+
+@router.get("/router/stats")
+async def get_router_stats():
+    return RAGPipeline.router_stats()
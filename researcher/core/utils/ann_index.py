@@ -0,0 +1,133 @@
+from typing import Optional, Sequence, Tuple
+import math
+import time
+import faiss
+import numpy as np
+import logging
+from researcher.core.config.vector_store_config import AnnConfig
+
+logger = logging.getLogger(__name__)
+
+ANN_FILE = "ann.faiss"
+
+FLAT = "flat"
+HNSW = "hnsw"
+IVF = "ivf"
+IVFPQ = "ivfpq"
+INDEX_TYPES = (FLAT, HNSW, IVF, IVFPQ)
+
+# faiss warns below this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+def choose_index_type(n: int, config: AnnConfig) -> str:
+    """Picks the index structure for n vectors; exact search stays cheapest for small indexes"""
+    if config.index_type != "auto":
+        if config.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown ANN index type: {config.index_type}")
+        return config.index_type
+    if n < config.flat_max_vectors:
+        return FLAT
+    if n < config.hnsw_max_vectors:
+        return HNSW
+    if n < config.ivfpq_min_vectors:
+        return IVF
+    return IVFPQ
+
+def ivf_nlist(n: int, config: AnnConfig) -> int:
+    nlist = config.ivf_nlist or int(4 * math.sqrt(n))
+    return max(1, min(nlist, n // MIN_POINTS_PER_CENTROID))
+
+def pq_subquantizers(dim: int, config: AnnConfig) -> int:
+    m = min(config.pq_m or max(1, dim // 4), dim)
+    while dim % m:
+        m -= 1
+    return m
+
+def _training_sample(vectors: np.ndarray, config: AnnConfig) -> np.ndarray:
+    if len(vectors) <= config.train_sample_size:
+        return np.ascontiguousarray(vectors)
+    rows = np.sort(np.random.default_rng(0).choice(len(vectors), config.train_sample_size, replace=False))
+    return np.ascontiguousarray(vectors[rows])
+
+def build_ann_index(
+    vectors: np.ndarray,
+    config: AnnConfig,
+    scalar_quantizer: Optional[int] = None
+) -> Tuple[str, Optional[faiss.Index]]:
+    """
+    Builds an inner-product ANN index over L2-normalised vectors. Returns the chosen type and the
+    index, or (FLAT, None) when exact search is used. IVF centroids and PQ codebooks are trained
+    on a sample of the vectors. With a faiss scalar quantizer type, HNSW and IVF store
+    quantized codes instead of float32 vectors.
+    """
+    n, dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+    index_type = choose_index_type(n, config)
+    min_training = MIN_POINTS_PER_CENTROID * (2 ** config.pq_nbits if index_type == IVFPQ else 1)
+    if index_type in (IVF, IVFPQ) and n < min_training:
+        logger.warning(f"Too few vectors ({n}) to train an {index_type} index, using exact search")
+        index_type = FLAT
+    if index_type == FLAT or n == 0:
+        return FLAT, None
+
+    started = time.perf_counter()
+    if index_type == HNSW:
+        if scalar_quantizer is None:
+            index = faiss.IndexHNSWFlat(dim, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWSQ(dim, scalar_quantizer, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = config.hnsw_ef_construction
+    else:
+        nlist = ivf_nlist(n, config)
+        quantizer = faiss.IndexFlatIP(dim)
+        if index_type == IVF and scalar_quantizer is None:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        elif index_type == IVF:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, scalar_quantizer, faiss.METRIC_INNER_PRODUCT)
+        else:
+            m = pq_subquantizers(dim, config)
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, config.pq_nbits, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(_training_sample(vectors, config))
+    index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+    logger.info(f"Built {index_type} index over {n} vectors in {time.perf_counter() - started:.2f}s")
+    return index_type, index
+
+def write_ann_index(index: faiss.Index, path: str) -> None:
+    faiss.write_index(index, path)
+
+def read_ann_index(path: str) -> faiss.Index:
+    # Memory-mapped where the index type supports it, so large IVF lists are paged in on demand
+    return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+def id_selector(
+    allowed_ids: Optional[Sequence[int]] = None,
+    excluded_ids: Optional[Sequence[int]] = None
+) -> Tuple[Optional[faiss.IDSelector], list]:
+    """
+    Selector restricting a faiss search to allowed_ids or away from excluded_ids. The second
+    value holds the selectors it wraps; faiss does not own them, so keep it alive for the search.
+    """
+    if allowed_ids is not None:
+        selector = faiss.IDSelectorBatch(np.asarray(allowed_ids, dtype=np.int64))
+        return selector, [selector]
+    if excluded_ids is not None and len(excluded_ids):
+        excluded = faiss.IDSelectorBatch(np.asarray(excluded_ids, dtype=np.int64))
+        return faiss.IDSelectorNot(excluded), [excluded]
+    return None, []
+
+def search_ann(
+    index: faiss.Index,
+    index_type: str,
+    queries: np.ndarray,
+    k: int,
+    config: AnnConfig,
+    allowed_ids: Optional[Sequence[int]] = None,
+    excluded_ids: Optional[Sequence[int]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Searches with the configured recall knobs; missing results have id -1"""
+    selector, _wrapped = id_selector(allowed_ids, excluded_ids)
+    if index_type == HNSW:
+        params = faiss.SearchParametersHNSW(efSearch=max(config.ef_search, k), sel=selector)
+    else:
+        params = faiss.SearchParametersIVF(nprobe=config.nprobe, sel=selector)
+    return index.search(np.ascontiguousarray(queries, dtype=np.float32), k, params=params)
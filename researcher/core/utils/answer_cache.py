@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+import threading
+import time
+import numpy as np
+import logging
+from researcher.core.config.answer_cache_config import AnswerCacheConfig, ANSWER_CACHE_CONFIG
+from researcher.core.utils.embedding_cache import normalize_query
+from researcher.core.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# (index content hash, model provider, model name)
+AnswerScope = Tuple[str, str, str]
+
+class CachedAnswer:
+    def __init__(self, query: str, answer: str, sources: Dict[str, Any], vector: np.ndarray):
+        self.query = query
+        self.answer = answer
+        self.sources = sources
+        self.vector = vector
+        self.created_at = time.time()
+
+class ScopedAnswers:
+    """Past answers for one index and model, searchable by exact query and by query embedding"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def add(self, key: str, entry: CachedAnswer) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def exact(self, key: str) -> Optional[CachedAnswer]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[CachedAnswer], float]:
+        with self._lock:
+            if not self._entries:
+                return None, 0.0
+            entries = list(self._entries.values())
+            if self._matrix is None:
+                self._matrix = np.stack([entry.vector for entry in entries])
+            scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return entries[best], float(scores[best])
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._matrix = None
+
+class AnswerCache:
+    """
+    Reuses answers to repeated questions. Entries are scoped by the index content hash,
+    so re-ingesting a document moves its questions to a fresh scope automatically.
+    """
+
+    def __init__(self, config: AnswerCacheConfig = ANSWER_CACHE_CONFIG):
+        self.config = config
+        self._scopes = LRUCache(max_entries=config.max_indexes)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _scope(self, scope: AnswerScope, create: bool = False) -> Optional[ScopedAnswers]:
+        answers = self._scopes.get(scope)
+        if answers is None and create:
+            answers = ScopedAnswers(self.config.max_entries_per_index)
+            self._scopes.put(scope, answers)
+        return answers
+
+    def _expired(self, entry: CachedAnswer) -> bool:
+        return time.time() - entry.created_at > self.config.ttl_seconds
+
+    def lookup(self, scope: AnswerScope, query: str, query_vector: Sequence[float]) -> Optional[CachedAnswer]:
+        if not self.config.enabled:
+            return None
+        answers = self._scope(scope)
+        entry = None
+        if answers is not None:
+            key = normalize_query(query)
+            entry = answers.exact(key)
+            if entry is not None and self._expired(entry):
+                answers.remove(key)
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    self.exact_hits += 1
+                return entry
+
+            entry, similarity = answers.nearest(_unit(query_vector))
+            if entry is not None and similarity >= self.config.similarity_threshold and not self._expired(entry):
+                logger.info(f"Answer cache hit for '{query}' via '{entry.query}' (similarity {similarity:.3f})")
+                with self._lock:
+                    self.semantic_hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(
+        self,
+        scope: AnswerScope,
+        query: str,
+        query_vector: Sequence[float],
+        answer: str,
+        sources: Dict[str, Any]
+    ) -> None:
+        if not self.config.enabled:
+            return
+        if sources.get("web") and not self.config.cache_web_answers:
+            return
+        entry = CachedAnswer(query, answer, sources, _unit(query_vector))
+        self._scope(scope, create=True).add(normalize_query(query), entry)
+        with self._lock:
+            self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            hits = self.exact_hits + self.semantic_hits
+            return {
+                "enabled": self.config.enabled,
+                "scopes": len(self._scopes),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_ratio": hits / lookups if lookups else 0.0
+            }
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+answer_cache = AnswerCache()
@@ -0,0 +1,147 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import asyncio
+import multiprocessing
+import threading
+import time
+import logging
+from researcher.core.config.ingestion_config import INGESTION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_cpu_pool: Optional[Executor] = None
+_io_pool: Optional[Executor] = None
+_query_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+def get_cpu_pool() -> Executor:
+    """Bounded pool for CPU-bound work such as PDF parsing and text splitting"""
+    global _cpu_pool
+    with _pool_lock:
+        if _cpu_pool is None:
+            if INGESTION_CONFIG.use_process_pool:
+                _cpu_pool = ProcessPoolExecutor(
+                    max_workers=INGESTION_CONFIG.cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                _cpu_pool = ThreadPoolExecutor(
+                    max_workers=INGESTION_CONFIG.cpu_workers,
+                    thread_name_prefix="ingest-cpu"
+                )
+            logger.info(f"Started CPU pool with {INGESTION_CONFIG.cpu_workers} workers")
+        return _cpu_pool
+
+def get_io_pool() -> Executor:
+    """Bounded thread pool for blocking network and disk work such as embedding calls"""
+    global _io_pool
+    with _pool_lock:
+        if _io_pool is None:
+            _io_pool = ThreadPoolExecutor(
+                max_workers=INGESTION_CONFIG.io_workers,
+                thread_name_prefix="ingest-io"
+            )
+            logger.info(f"Started I/O pool with {INGESTION_CONFIG.io_workers} workers")
+        return _io_pool
+
+def get_query_pool() -> Executor:
+    """Bounded thread pool for the blocking steps of answering a question, kept apart from ingestion"""
+    global _query_pool
+    with _pool_lock:
+        if _query_pool is None:
+            _query_pool = ThreadPoolExecutor(
+                max_workers=INGESTION_CONFIG.query_workers,
+                thread_name_prefix="query"
+            )
+            logger.info(f"Started query pool with {INGESTION_CONFIG.query_workers} workers")
+        return _query_pool
+
+async def run_cpu_bound(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), partial(func, *args, **kwargs))
+
+async def run_io_bound(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), partial(func, *args, **kwargs))
+
+async def run_query_bound(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_query_pool(), partial(func, *args, **kwargs))
+
+def shutdown_pools() -> None:
+    global _cpu_pool, _io_pool, _query_pool
+    with _pool_lock:
+        for pool in (_cpu_pool, _io_pool, _query_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+        _io_pool = None
+        _query_pool = None
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests to a backend and records how long callers queue for a slot"""
+
+    def __init__(self, max_concurrent: int, name: str):
+        self.max_concurrent = max_concurrent
+        self.name = name
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.total_queue_time = 0.0
+        self.max_queue_time = 0.0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        queue_time = time.perf_counter() - queued_at
+        self.total_queue_time += queue_time
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        if queue_time > 1.0:
+            logger.info(f"{self.name} request waited {queue_time:.2f}s for a slot")
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.in_flight
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "avg_queue_time": self.total_queue_time / started if started else 0.0,
+            "max_queue_time": self.max_queue_time
+        }
+
+class TokenBucket:
+    """Non-blocking rate budget: refills at rate_per_minute up to capacity tokens"""
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Sequence, Tuple
+from langchain.docstore.document import Document
+import logging
+from researcher.core.config.context_config import ContextConfig, CONTEXT_CONFIG
+from researcher.core.utils.token_counter import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+def overlap_length(previous: str, current: str, max_chars: int, min_chars: int = 1) -> int:
+    """
+    Length of the longest suffix of previous that is also a prefix of current, between min_chars
+    and max_chars. The shared text must consist of whole words, as the text splitter's overlap does.
+    """
+    for size in range(min(max_chars, len(previous), len(current)), max(min_chars, 1) - 1, -1):
+        if not previous.endswith(current[:size]):
+            continue
+        starts_word = size == len(previous) or previous[-size - 1].isspace()
+        ends_word = size == len(current) or current[size].isspace()
+        if starts_word and ends_word:
+            return size
+    return 0
+
+def document_key(chunk: Document) -> str:
+    """Chunks are neighbours only within one document; chunk ids count positions in it"""
+    return str(chunk.metadata.get("document_id") or chunk.metadata.get("filename") or "")
+
+def truncate_to_tokens(text: str, max_tokens: int, count_tokens: TokenCounter) -> str:
+    """Cuts text at a word boundary so that it fits in max_tokens"""
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    end = max(1, len(text) * max_tokens // tokens)
+    while end > 0 and count_tokens(text[:end]) > max_tokens:
+        end = int(end * 0.9)
+    cut = text.rfind(" ", 0, end)
+    return text[:cut if cut > 0 else end].rstrip() + " ..."
+
+class AssembledContext:
+    def __init__(self, text: str, tokens: int, items: List[Any]):
+        self.text = text
+        self.tokens = tokens
+        self.items = items
+
+class ContextBuilder:
+    """
+    Assembles answer prompt context within separate token budgets for document chunks
+    and web results. Chunks are taken in descending score order; neighbouring chunks
+    that were both selected are joined without the overlap left by the text splitter.
+    """
+
+    def __init__(self, count_tokens: TokenCounter, config: ContextConfig = CONTEXT_CONFIG):
+        self.count_tokens = count_tokens
+        self.config = config
+
+    def _fill(self, texts: Sequence[str], max_tokens: int) -> Tuple[List[int], List[str], int]:
+        """Returns the positions kept, their (possibly truncated) texts and the tokens used"""
+        kept, kept_texts, used = [], [], 0
+        for position, text in enumerate(texts):
+            tokens = self.count_tokens(text)
+            remaining = max_tokens - used
+            if tokens > remaining:
+                if remaining < self.config.min_partial_tokens:
+                    break
+                text = truncate_to_tokens(text, remaining, self.count_tokens)
+                tokens = self.count_tokens(text)
+            kept.append(position)
+            kept_texts.append(text)
+            used += tokens
+        return kept, kept_texts, used
+
+    def build_document_context(self, chunks: List[Document]) -> AssembledContext:
+        ranked = sorted(chunks, key=lambda chunk: chunk.metadata.get("score", 0.0), reverse=True)
+        kept, texts, _ = self._fill([chunk.page_content for chunk in ranked], self.config.document_max_tokens)
+        selected = [(ranked[position], text) for position, text in zip(kept, texts)]
+
+        # Present the selected chunks in document order so overlapping neighbours can be joined
+        selected.sort(key=lambda item: (document_key(item[0]), item[0].metadata.get("chunk_id", 0)))
+        parts: List[str] = []
+        previous: Tuple[str, Any] = ("", None)
+        previous_text = ""
+        for chunk, text in selected:
+            key, chunk_id = document_key(chunk), chunk.metadata.get("chunk_id")
+            trimmed = text
+            if previous[1] is not None and key == previous[0] and chunk_id == previous[1] + 1:
+                overlap = overlap_length(
+                    previous_text, text, self.config.chunk_overlap_chars, self.config.chunk_overlap_min_chars
+                )
+                trimmed = text[overlap:].lstrip()
+            parts.append(trimmed)
+            previous, previous_text = (key, chunk_id), text
+
+        context = " ".join(part for part in parts if part)
+        return AssembledContext(context, self.count_tokens(context), [chunk for chunk, _ in selected])
+
+    def build_web_context(self, search_results: List[Any]) -> AssembledContext:
+        entries = [f"Source ({result.title}): {result.content}" for result in search_results]
+        kept, texts, _ = self._fill(entries, self.config.web_max_tokens)
+        context = "\n".join(texts)
+        return AssembledContext(context, self.count_tokens(context) if texts else 0, [search_results[i] for i in kept])
+
+def context_usage(document: AssembledContext, web: AssembledContext) -> Dict[str, int]:
+    return {
+        "document_tokens": document.tokens,
+        "document_chunks": len(document.items),
+        "web_tokens": web.tokens,
+        "web_results": len(web.items)
+    }
@@ -0,0 +1,536 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from langchain.docstore.document import Document
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import numpy as np
+import logging
+from researcher.core.config.vector_store_config import CorpusConfig, VECTOR_STORE_CONFIG
+from researcher.core.utils.mmap_index import MMapIndex, is_mmap_index
+from researcher.core.utils.concurrency import run_query_bound
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILE = "registry.sqlite"
+SHARDS_DIR = "shards"
+
+# arXiv filenames carry a version suffix (2301.01234v2.pdf); all versions map to one document
+ARXIV_VERSION = re.compile(r"^(\d{4}\.\d{4,5}|\d{7})v\d+(?=\.pdf$)")
+
+def document_id_for(filename: str) -> str:
+    """
+    Stable id for an uploaded file; re-uploading the same file or a newer arXiv version replaces the
+    document. The readable part is sanitized, so a hash of the name keeps e.g. "a b.pdf" and "a_b.pdf" apart.
+    """
+    name = ARXIV_VERSION.sub(r"\1", filename)
+    return f"{re.sub(r'[^A-Za-z0-9_-]', '_', name)}-{hashlib.sha256(name.encode('utf-8')).hexdigest()[:8]}"
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class DocumentFilter(BaseModel):
+    """Restricts a corpus search to matching documents; unset fields match everything"""
+    document_ids: Optional[List[str]] = None
+    sources: Optional[List[str]] = None
+    uploaded_after: Optional[float] = None
+    uploaded_before: Optional[float] = None
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.model_dump().values())
+
+    def cache_key(self) -> str:
+        return json.dumps(self.model_dump(), sort_keys=True)
+
+class DocumentRecord(BaseModel):
+    document_id: str
+    filename: str
+    source: Optional[str] = None
+    uploaded_at: float
+    num_chunks: int
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class ShardRecord(BaseModel):
+    shard_id: int
+    num_chunks: int
+    deleted: int
+
+    @property
+    def live(self) -> int:
+        return self.num_chunks - self.deleted
+
+class CorpusUpdate(BaseModel):
+    """Result of adding a document: only chunks whose text changed are written or tombstoned"""
+    record: DocumentRecord
+    added: int
+    removed: int
+    unchanged: int
+
+# (document id, chunk hash, position of the chunk in its document) for each row of a shard, in row order
+ShardChunks = Sequence[Tuple[str, str, int]]
+
+class DocumentRegistry:
+    """
+    SQLite tables of the documents in the corpus, its shards and the chunks in each shard.
+    Deleted chunks are tombstoned in place until compaction rewrites their shard. Every
+    change is a single transaction, so searches see either the old or the new corpus.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "document_id TEXT PRIMARY KEY, filename TEXT NOT NULL, source TEXT, "
+            "uploaded_at REAL NOT NULL, num_chunks INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS shards ("
+            "shard_id INTEGER PRIMARY KEY, num_chunks INTEGER NOT NULL, created_at REAL NOT NULL, retired_at REAL);"
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "shard_id INTEGER NOT NULL, row INTEGER NOT NULL, document_id TEXT NOT NULL, chunk_hash TEXT NOT NULL, "
+            "chunk_index INTEGER NOT NULL, deleted INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (shard_id, row));"
+            "CREATE INDEX IF NOT EXISTS chunks_by_document ON chunks (document_id, deleted);"
+        )
+        self._conn.commit()
+
+    def _rows(self, query: str, params: Sequence[Any] = ()) -> List[DocumentRecord]:
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            DocumentRecord(document_id=row[0], filename=row[1], source=row[2], uploaded_at=row[3], num_chunks=row[4])
+            for row in rows
+        ]
+
+    def _insert_shard(self, shard_id: int, chunks: ShardChunks) -> None:
+        self._conn.execute(
+            "INSERT INTO shards (shard_id, num_chunks, created_at) VALUES (?, ?, ?)",
+            (shard_id, len(chunks), time.time())
+        )
+        self._conn.executemany(
+            "INSERT INTO chunks (shard_id, row, document_id, chunk_hash, chunk_index) VALUES (?, ?, ?, ?, ?)",
+            [(shard_id, row, *chunk) for row, chunk in enumerate(chunks)]
+        )
+
+    def write_document(
+        self,
+        record: DocumentRecord,
+        shard_id: Optional[int],
+        chunks: ShardChunks,
+        tombstones: Sequence[Tuple[int, int]],
+        moved: Sequence[Tuple[int, int, int]] = ()
+    ) -> None:
+        """
+        Registers a document's new shard, tombstones its stale chunks and records the new
+        position (chunk index, shard id, row) of the chunks it kept, in one transaction
+        """
+        with self._lock, self._conn:
+            if shard_id is not None:
+                self._insert_shard(shard_id, chunks)
+            self._conn.executemany("UPDATE chunks SET deleted = 1 WHERE shard_id = ? AND row = ?", tombstones)
+            self._conn.executemany("UPDATE chunks SET chunk_index = ? WHERE shard_id = ? AND row = ?", moved)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (document_id, filename, source, uploaded_at, num_chunks) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (record.document_id, record.filename, record.source, record.uploaded_at, record.num_chunks)
+            )
+
+    def delete_document(self, document_id: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE chunks SET deleted = 1 WHERE document_id = ?", (document_id,))
+            return self._conn.execute("DELETE FROM documents WHERE document_id = ?", (document_id,)).rowcount > 0
+
+    def get(self, document_id: str) -> Optional[DocumentRecord]:
+        rows = self._rows(
+            "SELECT document_id, filename, source, uploaded_at, num_chunks FROM documents WHERE document_id = ?",
+            (document_id,)
+        )
+        return rows[0] if rows else None
+
+    def find(self, document_filter: Optional[DocumentFilter] = None, limit: Optional[int] = None) -> List[DocumentRecord]:
+        clauses, params = [], []
+        if document_filter is not None:
+            if document_filter.document_ids is not None:
+                clauses.append(f"document_id IN ({','.join('?' * len(document_filter.document_ids))})")
+                params.extend(document_filter.document_ids)
+            if document_filter.sources is not None:
+                clauses.append(f"source IN ({','.join('?' * len(document_filter.sources))})")
+                params.extend(document_filter.sources)
+            if document_filter.uploaded_after is not None:
+                clauses.append("uploaded_at >= ?")
+                params.append(document_filter.uploaded_after)
+            if document_filter.uploaded_before is not None:
+                clauses.append("uploaded_at < ?")
+                params.append(document_filter.uploaded_before)
+        query = "SELECT document_id, filename, source, uploaded_at, num_chunks FROM documents"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY uploaded_at DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return self._rows(query, params)
+
+    def count_documents(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def live_chunks(self, document_id: str) -> List[Tuple[int, int, str]]:
+        """(shard id, row, chunk hash) of a document's chunks that are not tombstoned"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT c.shard_id, c.row, c.chunk_hash FROM chunks c JOIN shards s ON s.shard_id = c.shard_id "
+                "WHERE c.document_id = ? AND c.deleted = 0 AND s.retired_at IS NULL ORDER BY c.shard_id, c.row",
+                (document_id,)
+            ).fetchall()
+
+    def live_rows(self, shard_id: int) -> List[Tuple[int, str, str, int]]:
+        """(row, document id, chunk hash, chunk index) of a shard's chunks that are not tombstoned"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT row, document_id, chunk_hash, chunk_index FROM chunks WHERE shard_id = ? AND deleted = 0 ORDER BY row",
+                (shard_id,)
+            ).fetchall()
+
+    def chunk_indexes(self, locations: Sequence[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+        """Position within its document of the chunk at each (shard id, row)"""
+        with self._lock:
+            return {
+                (shard_id, row): self._conn.execute(
+                    "SELECT chunk_index FROM chunks WHERE shard_id = ? AND row = ?", (shard_id, row)
+                ).fetchone()[0]
+                for shard_id, row in locations
+            }
+
+    def shards(self) -> List[ShardRecord]:
+        """Live shards with their tombstone counts"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.shard_id, s.num_chunks, COALESCE(SUM(c.deleted), 0) FROM shards s "
+                "LEFT JOIN chunks c ON c.shard_id = s.shard_id WHERE s.retired_at IS NULL "
+                "GROUP BY s.shard_id ORDER BY s.shard_id"
+            ).fetchall()
+        return [ShardRecord(shard_id=row[0], num_chunks=row[1], deleted=row[2]) for row in rows]
+
+    def shards_for(self, document_ids: Sequence[str]) -> Dict[int, List[str]]:
+        """Maps each shard holding live chunks of the given documents to those documents"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT c.shard_id, c.document_id FROM chunks c JOIN shards s ON s.shard_id = c.shard_id "
+                f"WHERE c.deleted = 0 AND s.retired_at IS NULL AND c.document_id IN ({','.join('?' * len(document_ids))})",
+                list(document_ids)
+            ).fetchall()
+        by_shard: Dict[int, List[str]] = {}
+        for shard_id, document_id in rows:
+            by_shard.setdefault(shard_id, []).append(document_id)
+        return by_shard
+
+    def tombstones(self) -> Dict[int, np.ndarray]:
+        """Deleted rows per shard, including retired shards that in-flight searches may still scan"""
+        with self._lock:
+            rows = self._conn.execute("SELECT shard_id, row FROM chunks WHERE deleted = 1").fetchall()
+        by_shard: Dict[int, List[int]] = {}
+        for shard_id, row in rows:
+            by_shard.setdefault(shard_id, []).append(row)
+        return {shard_id: np.asarray(found, dtype=np.int64) for shard_id, found in by_shard.items()}
+
+    def next_shard_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(shard_id) + 1, 0) FROM shards").fetchone()[0]
+
+    def replace_shards(self, retired_ids: Sequence[int], new_shards: Sequence[Tuple[int, ShardChunks]]) -> None:
+        """Swaps compacted shards for their replacements in one transaction"""
+        with self._lock, self._conn:
+            for shard_id, chunks in new_shards:
+                self._insert_shard(shard_id, chunks)
+            placeholders = ",".join("?" * len(retired_ids))
+            self._conn.execute(f"UPDATE shards SET retired_at = ? WHERE shard_id IN ({placeholders})", [time.time(), *retired_ids])
+
+    def retired_shards(self, retired_before: float) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT shard_id FROM shards WHERE retired_at < ?", (retired_before,)).fetchall()
+        return [row[0] for row in rows]
+
+    def registered_shard_ids(self) -> List[int]:
+        """Live and retired shards; anything else under the shards directory is an orphan"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT shard_id FROM shards").fetchall()]
+
+    def drop_shard(self, shard_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks WHERE shard_id = ?", (shard_id,))
+            self._conn.execute("DELETE FROM shards WHERE shard_id = ?", (shard_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class CorpusIndex:
+    """
+    One logical index over every ingested document, stored as immutable MMapIndex shards.
+
+    Each write appends a new shard holding only the chunks that changed, and deleted or
+    replaced chunks are tombstoned in the registry and skipped by searches. Compaction later
+    rewrites shards with many tombstones and packs small shards together up to shard_max_chunks;
+    replaced shards stay on disk for a grace period so in-flight searches can finish. Searches
+    fan out to the shards that hold matching documents in parallel and merge the per-shard top-k.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        config: CorpusConfig = VECTOR_STORE_CONFIG.corpus,
+        load_shard: Callable[[str], MMapIndex] = MMapIndex,
+        embedding_model: Optional[str] = None
+    ):
+        self.root = root
+        self.config = config
+        self.load_shard = load_shard
+        self.embedding_model = embedding_model
+        self.registry = DocumentRegistry(os.path.join(root, REGISTRY_FILE))
+        self._write_lock = threading.Lock()
+        self._remove_unregistered_shards()
+        self._tombstones = self.registry.tombstones()
+
+    def shard_path(self, shard_id: int) -> str:
+        return os.path.join(self.root, SHARDS_DIR, f"shard_{shard_id:05d}")
+
+    def shard_ids(self) -> List[int]:
+        return [shard.shard_id for shard in self.registry.shards()]
+
+    def _shard_ids_on_disk(self) -> List[int]:
+        shards_dir = os.path.join(self.root, SHARDS_DIR)
+        if not os.path.isdir(shards_dir):
+            return []
+        return sorted(
+            int(name.split("_")[1]) for name in os.listdir(shards_dir)
+            if re.fullmatch(r"shard_\d{5}", name) and is_mmap_index(os.path.join(shards_dir, name))
+        )
+
+    def _remove_unregistered_shards(self) -> None:
+        """Deletes shards a crash left on disk before they were registered"""
+        registered = set(self.registry.registered_shard_ids())
+        for shard_id in self._shard_ids_on_disk():
+            if shard_id not in registered:
+                logger.warning(f"Removing unregistered corpus shard {shard_id}")
+                shutil.rmtree(self.shard_path(shard_id), ignore_errors=True)
+
+    def _read_shard(self, shard_id: int) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+        shard = self.load_shard(self.shard_path(shard_id))
+        ids = list(range(shard.ntotal))
+        return shard.get_texts(ids), np.asarray(shard.vectors), [shard.get_metadata(i) for i in ids]
+
+    def _write_shard(self, texts: Sequence[str], vectors: np.ndarray, metadatas: Sequence[Dict[str, Any]]) -> int:
+        shard_id = self.registry.next_shard_id()
+        MMapIndex.write(self.shard_path(shard_id), texts, vectors, metadatas=metadatas, embedding_model=self.embedding_model)
+        return shard_id
+
+    def add_document(
+        self,
+        document_id: str,
+        filename: str,
+        texts: Sequence[str],
+        vectors: np.ndarray,
+        source: Optional[str] = None
+    ) -> CorpusUpdate:
+        """
+        Adds (or replaces) a document's chunks in the corpus. Chunks of a previous version
+        with unchanged text are kept in place; only new chunks are written and only removed
+        ones are tombstoned.
+        """
+        with self._write_lock:
+            hashes = [chunk_hash(text) for text in texts]
+            available: Dict[str, List[Tuple[int, int]]] = {}
+            for shard_id, row, hash_ in self.registry.live_chunks(document_id):
+                available.setdefault(hash_, []).append((shard_id, row))
+            added, moved = [], []
+            for i, hash_ in enumerate(hashes):
+                if available.get(hash_):
+                    moved.append((i, *available[hash_].pop(0)))
+                else:
+                    added.append(i)
+            stale = [location for locations in available.values() for location in locations]
+
+            uploaded_at = time.time()
+            shard_id = None
+            if added:
+                metadata = {"document_id": document_id, "filename": filename, "source": source, "uploaded_at": uploaded_at}
+                shard_id = self._write_shard([texts[i] for i in added], np.asarray(vectors)[added], [metadata] * len(added))
+
+            record = DocumentRecord(
+                document_id=document_id, filename=filename, source=source,
+                uploaded_at=uploaded_at, num_chunks=len(texts)
+            )
+            self.registry.write_document(record, shard_id, [(document_id, hashes[i], i) for i in added], stale, moved)
+            self._tombstones = self.registry.tombstones()
+
+        logger.info(
+            f"Updated {filename} in the corpus: {len(added)} chunks added, {len(stale)} removed, "
+            f"{len(texts) - len(added)} unchanged"
+        )
+        return CorpusUpdate(record=record, added=len(added), removed=len(stale), unchanged=len(texts) - len(added))
+
+    def delete_document(self, document_id: str) -> bool:
+        """Tombstones every chunk of a document; the space is reclaimed by compaction"""
+        with self._write_lock:
+            deleted = self.registry.delete_document(document_id)
+            self._tombstones = self.registry.tombstones()
+        if deleted:
+            logger.info(f"Deleted {document_id} from the corpus")
+        return deleted
+
+    def _compaction_plan(self) -> List[ShardRecord]:
+        shards = self.registry.shards()
+        plan = [
+            shard for shard in shards
+            if shard.num_chunks and shard.deleted / shard.num_chunks >= self.config.compaction_tombstone_ratio
+        ]
+        small_max = max(1, int(self.config.shard_max_chunks * self.config.compaction_small_shard_ratio))
+        small = [shard for shard in shards if shard not in plan and shard.live < small_max]
+        if len(small) > self.config.compaction_max_small_shards:
+            plan.extend(small)
+        return sorted(plan, key=lambda shard: shard.shard_id)
+
+    def needs_compaction(self) -> bool:
+        return bool(self._compaction_plan())
+
+    def compact(self) -> Dict[str, int]:
+        """Rewrites tombstoned and small shards into as few shards of at most shard_max_chunks as possible"""
+        with self._write_lock:
+            plan = self._compaction_plan()
+            if not plan:
+                return {"compacted_shards": 0, "written_shards": 0, "dropped_chunks": 0}
+
+            started = time.perf_counter()
+            texts, vectors, metadatas, chunks = [], [], [], []
+            for shard in plan:
+                shard_texts, shard_vectors, shard_metadatas = self._read_shard(shard.shard_id)
+                live = self.registry.live_rows(shard.shard_id)
+                keep = [row for row, _, _, _ in live]
+                texts.extend(shard_texts[row] for row in keep)
+                vectors.extend(shard_vectors[keep])
+                metadatas.extend(shard_metadatas[row] for row in keep)
+                chunks.extend((document_id, hash_, chunk_index) for _, document_id, hash_, chunk_index in live)
+
+            new_shards = []
+            next_id = self.registry.next_shard_id()
+            for start in range(0, len(texts), self.config.shard_max_chunks):
+                end = start + self.config.shard_max_chunks
+                shard_id = next_id + len(new_shards)
+                MMapIndex.write(
+                    self.shard_path(shard_id), texts[start:end], np.stack(vectors[start:end]),
+                    metadatas=metadatas[start:end], embedding_model=self.embedding_model
+                )
+                new_shards.append((shard_id, chunks[start:end]))
+
+            self.registry.replace_shards([shard.shard_id for shard in plan], new_shards)
+            self._tombstones = self.registry.tombstones()
+
+        dropped = sum(shard.deleted for shard in plan)
+        logger.info(
+            f"Compacted {len(plan)} corpus shards into {len(new_shards)}, dropping {dropped} deleted chunks "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return {"compacted_shards": len(plan), "written_shards": len(new_shards), "dropped_chunks": dropped}
+
+    def purge_retired(self) -> int:
+        """Deletes compacted-away shards once their grace period has passed"""
+        retired = self.registry.retired_shards(time.time() - self.config.retired_shard_grace_seconds)
+        for shard_id in retired:
+            shutil.rmtree(self.shard_path(shard_id), ignore_errors=True)
+            self.registry.drop_shard(shard_id)
+        return len(retired)
+
+    def maintain(self) -> Dict[str, int]:
+        purged = self.purge_retired()
+        return {**self.compact(), "purged_shards": purged}
+
+    def version(self) -> str:
+        """Changes whenever a shard is written or a chunk deleted; used to scope cached answers"""
+        digest = hashlib.sha256()
+        for shard in self.registry.shards():
+            content_hash = self.load_shard(self.shard_path(shard.shard_id)).content_hash
+            digest.update(f"{shard.shard_id}:{content_hash}:{shard.deleted}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        shards = self.registry.shards()
+        return {
+            "documents": self.registry.count_documents(),
+            "shards": len(shards),
+            "chunks": sum(shard.live for shard in shards),
+            "deleted_chunks": sum(shard.deleted for shard in shards)
+        }
+
+    def _search_shard(
+        self,
+        shard_id: int,
+        query_vector: Sequence[float],
+        k: int,
+        document_ids: Optional[List[str]],
+        tombstones: Dict[int, np.ndarray]
+    ) -> List[Tuple[float, int, int]]:
+        shard = self.load_shard(self.shard_path(shard_id))
+        if self.embedding_model and shard.embedding_model and shard.embedding_model != self.embedding_model:
+            # Vectors from another embedding model live in a different space; re-ingesting moves them over
+            logger.warning(f"Skipping corpus shard {shard_id} built with {shard.embedding_model}")
+            return []
+        allowed = shard.metadata_rows("document_id", document_ids) if document_ids is not None else None
+        hits = shard.search(query_vector, k, allowed, excluded_ids=tombstones.get(shard_id))
+        return [(score, shard_id, chunk_id) for chunk_id, score in hits]
+
+    async def search(
+        self,
+        query_vector: Sequence[float],
+        k: int = 5,
+        document_filter: Optional[DocumentFilter] = None
+    ) -> List[Document]:
+        """Scatter-gather search across shards; returns the merged top-k chunks"""
+        # Taken before the shard list: if compaction retires a listed shard meanwhile, its deleted
+        # rows are still excluded, and shards written by the compaction hold no deleted rows
+        tombstones = self._tombstones
+        if document_filter is not None and not document_filter.is_empty():
+            # Only shards that hold a matching document are searched, and only over those documents
+            records = self.registry.find(document_filter)
+            by_shard = self.registry.shards_for([record.document_id for record in records]) if records else {}
+            targets = list(by_shard.items())
+        else:
+            targets = [(shard_id, None) for shard_id in self.shard_ids()]
+        if not targets:
+            return []
+
+        results = await asyncio.gather(*[
+            run_query_bound(self._search_shard, shard_id, query_vector, k, document_ids, tombstones)
+            for shard_id, document_ids in targets
+        ])
+        top = heapq.nlargest(k, (hit for hits in results for hit in hits))
+
+        documents = []
+        chunk_indexes = self.registry.chunk_indexes([(shard_id, row) for _, shard_id, row in top])
+        for score, shard_id, row in top:
+            shard = self.load_shard(self.shard_path(shard_id))
+            for doc in shard.get_documents([(row, score)]):
+                # Shard rows are storage positions; callers order and join chunks by their place in the document
+                doc.metadata["chunk_id"] = chunk_indexes[(shard_id, row)]
+                documents.append(doc)
+        # Chunks kept from an earlier version carry its metadata; the registry has the current one
+        records = {
+            record.document_id: record
+            for record in self.registry.find(DocumentFilter(document_ids=list({doc.metadata["document_id"] for doc in documents})))
+        } if documents else {}
+        for doc in documents:
+            record = records.get(doc.metadata["document_id"])
+            if record is not None:
+                doc.metadata.update(filename=record.filename, source=record.source, uploaded_at=record.uploaded_at)
+        logger.info(f"Searched {len(targets)} corpus shards, returning {len(documents)} chunks")
+        return documents
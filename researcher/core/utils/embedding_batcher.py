@@ -0,0 +1,146 @@
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Set, Tuple
+import asyncio
+import threading
+import time
+import numpy as np
+import logging
+from researcher.core.utils.concurrency import run_io_bound
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding calls into fewer, fuller backend requests.
+    Callers wait at most max_wait_ms for other documents to join their batch.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 1000,
+        max_wait_ms: float = 50
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_count = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, so running flushes are held here until they finish
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests_sent = 0
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_count += len(texts)
+
+        if self._pending_count >= self.max_batch_size:
+            self._schedule_flush(loop, delay=0)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, delay=self.max_wait_ms / 1000)
+        return await future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, self._start_flush, loop)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self._flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        self._pending_count = 0
+        if not pending:
+            return
+
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        batches = [
+            texts[start:start + self.max_batch_size]
+            for start in range(0, len(texts), self.max_batch_size)
+        ]
+        logger.info(f"Embedding {len(texts)} chunks from {len(pending)} documents in {len(batches)} requests")
+        self.requests_sent += len(batches)
+
+        try:
+            results = await asyncio.gather(*[run_io_bound(self.embed_fn, batch) for batch in batches])
+            vectors = np.concatenate(results) if results else np.empty((0, 0), dtype=np.float32)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+class ThreadedEmbeddingBatcher:
+    """
+    Thread-safe batching for an in-process model: callers on any thread block while a single
+    worker thread encodes everything queued within max_wait_ms of the first request in one call.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5
+    ):
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[List[str], Future]] = []
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.batches = 0
+        self.texts = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        future: Future = Future()
+        with self._condition:
+            self._pending.append((texts, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        return future.result()
+
+    def _take_batch(self) -> List[Tuple[List[str], Future]]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while sum(len(texts) for texts, _ in self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            pending, self._pending = self._pending, []
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._take_batch()
+            texts = [text for request_texts, _ in pending for text in request_texts]
+            self.batches += 1
+            self.texts += len(texts)
+            try:
+                vectors = self.embed_fn(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for request_texts, future in pending:
+                future.set_result(vectors[offset:offset + len(request_texts)])
+                offset += len(request_texts)
@@ -0,0 +1,177 @@
+from typing import List, Dict, Any, Iterable, Optional, Sequence
+from langchain_core.embeddings import Embeddings
+from researcher.core.utils.lru_cache import LRUCache
+import numpy as np
+import hashlib
+import sqlite3
+import threading
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+def embedding_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+def normalize_query(text: str) -> str:
+    """Collapses whitespace and case so trivially different phrasings share a cache entry"""
+    return " ".join(text.split()).lower()
+
+def query_key(model_name: str, text: str) -> str:
+    return embedding_key(model_name, f"query\0{normalize_query(text)}")
+
+class EmbeddingStore:
+    """Persistent key -> float32 vector store backed by a local SQLite file"""
+
+    def __init__(self, path: str, lookup_batch_size: int = 500):
+        self.path = path
+        self.lookup_batch_size = lookup_batch_size
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Opened on first use, so importing the module does not create the database"""
+        with self._open_lock:
+            if self._connection is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+                )
+                conn.commit()
+                self._connection = conn
+            return self._connection
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), self.lookup_batch_size):
+                batch = unique_keys[start:start + self.lookup_batch_size]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Iterable[tuple]) -> None:
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps a LangChain embeddings backend with a content-addressed cache.
+    Chunks are keyed by hash(model name, text); only cache misses reach the backend.
+    Queries go through an in-memory LRU in front of the same persistent store.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        store: EmbeddingStore,
+        model_name: str,
+        query_cache_max_entries: int = 10000
+    ):
+        self.underlying = underlying
+        self.store = store
+        self.model = model_name
+        self.query_cache = LRUCache(max_entries=query_cache_max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.query_disk_hits = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.model, text) for text in texts]
+        cached = self.store.get_many(keys)
+
+        # Identical chunks within one call are embedded once
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            logger.info(f"Embedding {len(missing)} of {len(texts)} chunks (cache misses)")
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            new_vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+            self.store.put_many(new_vectors.items())
+            cached.update(new_vectors)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return [cached[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = query_key(self.model, text)
+        vector: Optional[np.ndarray] = self.query_cache.get(key)
+        if vector is None:
+            vector = self.store.get_many([key]).get(key)
+            if vector is not None:
+                with self._lock:
+                    self.query_disk_hits += 1
+            else:
+                vector = np.asarray(self.underlying.embed_query(text), dtype=np.float32)
+                self.store.put_many([(key, vector)])
+            self.query_cache.put(key, vector, nbytes=vector.nbytes)
+        return vector.tolist()
+
+    def embed_queries(self, texts: List[str]) -> np.ndarray:
+        """Embeds several queries, sending all cache misses to the backend in one request"""
+        keys = [query_key(self.model, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        for key in keys:
+            vector = self.query_cache.get(key)
+            if vector is not None:
+                found[key] = vector
+
+        from_disk = self.store.get_many([key for key in keys if key not in found])
+        found.update(from_disk)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            new_vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+            self.store.put_many(new_vectors.items())
+            found.update(new_vectors)
+
+        for key in set(from_disk) | set(missing):
+            self.query_cache.put(key, found[key], nbytes=found[key].nbytes)
+        with self._lock:
+            self.query_disk_hits += len(from_disk)
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            chunk_stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+            query_disk_hits = self.query_disk_hits
+        return {
+            **chunk_stats,
+            "query_cache": {**self.query_cache.stats(), "disk_hits": query_disk_hits}
+        }
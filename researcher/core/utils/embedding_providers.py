@@ -0,0 +1,91 @@
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+import os
+import threading
+import time
+import numpy as np
+import logging
+from researcher.core.config.model_config import EmbeddingConfig, EmbeddingProvider, MODEL_CONFIG
+from researcher.core.utils.embedding_batcher import ThreadedEmbeddingBatcher
+
+logger = logging.getLogger(__name__)
+
+TORCH = "torch"
+INT8 = "int8"
+LOCAL_BACKENDS = (TORCH, INT8)
+
+class EmbeddingModelMismatchError(ValueError):
+    """Raised when an index was built with a different embedding model than the one embedding queries"""
+
+def check_embedding_model(index_model: Optional[str], query_model: str, index_path: str) -> None:
+    # Indexes written before the model was recorded carry no name and are trusted
+    if index_model and index_model != query_model:
+        raise EmbeddingModelMismatchError(
+            f"Index at {index_path} was built with {index_model} but queries are embedded with {query_model}. "
+            "Re-ingest the document or switch EMBEDDING_PROVIDER back."
+        )
+
+class LocalEmbeddings(Embeddings):
+    """
+    sentence-transformers model run in-process, loaded on first use. Queries from concurrent
+    requests are encoded together by a batching thread; documents are encoded directly since
+    ingestion already batches them.
+    """
+
+    def __init__(self, config: EmbeddingConfig):
+        if config.local_backend not in LOCAL_BACKENDS:
+            raise ValueError(f"Unknown local embedding backend: {config.local_backend}")
+        self.config = config
+        self.model = config.local_model
+        self._encoder = None
+        self._load_lock = threading.Lock()
+        self.query_batcher = ThreadedEmbeddingBatcher(
+            self._encode,
+            max_batch_size=config.batch_size,
+            max_wait_ms=config.query_batch_wait_ms
+        )
+
+    def _load(self):
+        with self._load_lock:
+            if self._encoder is None:
+                import torch
+                from sentence_transformers import SentenceTransformer
+
+                if self.config.num_threads > 0:
+                    torch.set_num_threads(self.config.num_threads)
+                started = time.perf_counter()
+                encoder = SentenceTransformer(self.model, device=self.config.device)
+                if self.config.local_backend == INT8:
+                    # Dynamic int8 quantization of the linear layers; runs on CPU only
+                    encoder = torch.quantization.quantize_dynamic(encoder.cpu(), {torch.nn.Linear}, dtype=torch.qint8)
+                self._encoder = encoder
+                logger.info(
+                    f"Loaded embedding model {self.model} ({self.config.local_backend}, "
+                    f"{torch.get_num_threads()} threads) in {time.perf_counter() - started:.2f}s"
+                )
+        return self._encoder
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(
+            self._load().encode(
+                texts,
+                batch_size=self.config.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            ),
+            dtype=np.float32
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.query_batcher.embed([text])[0].tolist()
+
+def create_embeddings(config: EmbeddingConfig = MODEL_CONFIG.embedding) -> Embeddings:
+    """Embeddings backend for the configured provider; the result's .model names the embedding space"""
+    if config.provider == EmbeddingProvider.LOCAL:
+        return LocalEmbeddings(config)
+    return OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"), model=config.openai_model)
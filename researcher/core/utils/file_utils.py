@@ -0,0 +1,69 @@
+from typing import AsyncIterator, List, Optional
+import hashlib
+import os
+import logging
+import aiofiles
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+class FileTooLargeError(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the maximum allowed size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+class SavedFile:
+    def __init__(self, file_path: str, size: int, sha256: str, content: Optional[bytes] = None):
+        self.file_path = file_path
+        self.size = size
+        self.sha256 = sha256
+        # Raw bytes are kept only for small files so they can be parsed without re-reading the disk
+        self.content = content
+
+async def iter_upload(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+async def stream_to_file(
+    chunks: AsyncIterator[bytes],
+    file_path: str,
+    max_bytes: Optional[int] = None,
+    keep_in_memory_below: int = 0
+) -> SavedFile:
+    """
+    Writes an async byte stream to file_path without buffering it whole, hashing it on the fly.
+    The file only appears at file_path once it is complete and within max_bytes.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial_path = f"{file_path}.part-{os.getpid()}-{id(chunks)}"
+
+    digest = hashlib.sha256()
+    size = 0
+    buffered: Optional[List[bytes]] = [] if keep_in_memory_below > 0 else None
+    try:
+        async with aiofiles.open(partial_path, 'wb') as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise FileTooLargeError(max_bytes)
+                digest.update(chunk)
+                await f.write(chunk)
+                if buffered is not None:
+                    if size <= keep_in_memory_below:
+                        buffered.append(chunk)
+                    else:
+                        buffered = None
+        os.replace(partial_path, file_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+    logger.info(f"Saved {size} bytes to {file_path}")
+    content = b"".join(buffered) if buffered is not None else None
+    return SavedFile(file_path, size, digest.hexdigest(), content)
@@ -0,0 +1,89 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import random
+import logging
+import aiohttp
+from researcher.core.config.http_config import HTTPClientConfig, HTTP_CLIENT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HTTPClientManager:
+    """
+    Application-lifetime aiohttp session shared by web search and document downloads.
+    Keeps connections alive between requests and retries transient failures with backoff.
+    """
+
+    def __init__(self, config: HTTPClientConfig = HTTP_CLIENT_CONFIG):
+        self.config = config
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.config.max_connections,
+            limit_per_host=self.config.max_connections_per_host,
+            keepalive_timeout=self.config.keepalive_timeout,
+            ttl_dns_cache=self.config.dns_cache_ttl
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.config.total_timeout,
+            connect=self.config.connect_timeout
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        logger.info("Started shared HTTP client")
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("Closed shared HTTP client")
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        # Scripts and tests that never ran the app lifespan get a session on first use
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    def _backoff_delay(self, attempt: int, response: Optional[aiohttp.ClientResponse] = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.config.backoff_max)
+        delay = self.config.backoff_base * (2 ** attempt)
+        return min(delay, self.config.backoff_max) * (0.5 + random.random() / 2)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Sends a request, retrying connection errors and retryable statuses, and yields the response"""
+        session = await self.get_session()
+        attempt = 0
+        while True:
+            try:
+                response = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.config.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"{method} {url} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if response.status in RETRY_STATUSES and attempt < self.config.max_retries:
+                delay = self._backoff_delay(attempt, response)
+                response.release()
+                logger.warning(f"{method} {url} returned {response.status}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            try:
+                yield response
+            finally:
+                response.release()
+            return
+
+http_client = HTTPClientManager()
@@ -0,0 +1,118 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import os
+import time
+import logging
+from researcher.core.utils.text_processing import extract_text, chunk_text
+from researcher.core.utils.vector_store import embed_chunks, create_index, add_to_corpus, schedule_corpus_maintenance
+from researcher.core.utils.concurrency import run_io_bound
+from researcher.core.utils.embedding_batcher import EmbeddingBatcher
+from researcher.core.utils.http_client import http_client
+from researcher.core.utils.file_utils import FileTooLargeError, SavedFile, stream_to_file
+from researcher.core.config.ingestion_config import INGESTION_CONFIG
+from researcher.core.config.vector_store_config import VECTOR_STORE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "uploads"
+
+# Ordered stages reported while a document is ingested
+STAGE_DOWNLOAD = "download"
+STAGE_EXTRACT = "extract"
+STAGE_CHUNK = "chunk"
+STAGE_EMBED = "embed"
+STAGE_INDEX = "index"
+INGESTION_STAGES = [STAGE_EXTRACT, STAGE_CHUNK, STAGE_EMBED, STAGE_INDEX]
+
+StageCallback = Callable[[str], Awaitable[None]]
+
+# Shared by every ingestion in the process so concurrent files fill the same embedding requests
+embedding_batcher = EmbeddingBatcher(
+    embed_chunks,
+    max_batch_size=INGESTION_CONFIG.embedding_batch_size,
+    max_wait_ms=INGESTION_CONFIG.embedding_batch_wait_ms
+)
+
+class DocumentDownloadError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+async def _enter_stage(on_stage: Optional[StageCallback], stage: str) -> None:
+    if on_stage:
+        await on_stage(stage)
+
+def resolve_document_link(document_link: str) -> Tuple[str, str]:
+    """Maps an arXiv link to its PDF URL and a local filename"""
+    arxiv_id = document_link.split('/')[-1]
+    if not arxiv_id:
+        raise ValueError(f"Could not determine a document id from {document_link}")
+    return f"https://arxiv.org/pdf/{arxiv_id}.pdf", arxiv_id + '.pdf'
+
+async def download_document(document_link: str) -> Tuple[SavedFile, str]:
+    """Streams a document link into UPLOAD_DIR and returns the saved file and its filename"""
+    url, filename = resolve_document_link(document_link)
+    file_path = os.path.join(UPLOAD_DIR, filename)
+
+    async with http_client.request("GET", url) as response:
+        if response.status != 200:
+            raise DocumentDownloadError(response.status, "Failed to download document")
+        if response.content_length and response.content_length > INGESTION_CONFIG.max_upload_bytes:
+            raise FileTooLargeError(INGESTION_CONFIG.max_upload_bytes)
+        saved = await stream_to_file(
+            response.content.iter_chunked(INGESTION_CONFIG.upload_chunk_bytes),
+            file_path,
+            max_bytes=INGESTION_CONFIG.max_upload_bytes,
+            keep_in_memory_below=INGESTION_CONFIG.in_memory_parse_max_bytes
+        )
+    return saved, filename
+
+async def ingest_document(
+    file_path: str,
+    filename: str,
+    on_stage: Optional[StageCallback] = None,
+    content: Optional[bytes] = None,
+    source: Optional[str] = None
+) -> Dict:
+    """Runs extract -> chunk -> embed -> index for a document already on disk"""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    current_stage, stage_started = None, started
+
+    async def enter_stage(stage: str) -> None:
+        nonlocal stage_started, current_stage
+        now = time.perf_counter()
+        if current_stage:
+            timings[current_stage] = round(now - stage_started, 3)
+        current_stage, stage_started = stage, now
+        await _enter_stage(on_stage, stage)
+
+    await enter_stage(STAGE_EXTRACT)
+    extracted_text = await extract_text(file_path, content)
+
+    await enter_stage(STAGE_CHUNK)
+    chunks = await chunk_text(extracted_text)
+
+    await enter_stage(STAGE_EMBED)
+    vectors = await embedding_batcher.embed(chunks)
+
+    await enter_stage(STAGE_INDEX)
+    index_path = None
+    if VECTOR_STORE_CONFIG.corpus.per_document_indexes or not VECTOR_STORE_CONFIG.corpus.enabled:
+        index_path = await run_io_bound(create_index, chunks, {"filename": filename}, vectors)
+    update = await run_io_bound(add_to_corpus, filename, chunks, vectors, source)
+    schedule_corpus_maintenance()
+
+    finished = time.perf_counter()
+    timings[current_stage] = round(finished - stage_started, 3)
+    timings["total"] = round(finished - started, 3)
+
+    logger.info(f"Document processed: {filename} in {timings['total']}s")
+    return {
+        "filename": filename,
+        "file_path": file_path,
+        "num_chunks": len(chunks),
+        "index_path": index_path,
+        "document_id": update.record.document_id if update else None,
+        "corpus_changes": update.model_dump(exclude={"record"}) if update else None,
+        "timings": timings
+    }
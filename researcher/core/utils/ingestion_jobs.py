@@ -0,0 +1,212 @@
+from enum import Enum
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from researcher.core.config.ingestion_config import INGESTION_CONFIG
+from researcher.core.utils.ingestion import (
+    INGESTION_STAGES,
+    STAGE_DOWNLOAD,
+    download_document,
+    ingest_document
+)
+from researcher.core.utils.summary_cache import summary_manager
+
+logger = logging.getLogger(__name__)
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class StageStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+class IngestionJob(BaseModel):
+    job_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    current_stage: Optional[str] = None
+    stages: Dict[str, StageStatus] = {}
+    filename: Optional[str] = None
+    file_path: Optional[str] = None
+    document_link: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+    model_config = ConfigDict(protected_namespaces=())
+
+class JobStore:
+    """Persists ingestion jobs in SQLite so queued and running jobs survive a restart"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Opened on first use, so importing the module does not create the database"""
+        with self._open_lock:
+            if self._connection is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, data TEXT NOT NULL)"
+                )
+                conn.commit()
+                self._connection = conn
+            return self._connection
+
+    def save(self, job: IngestionJob) -> None:
+        job.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status.value, job.created_at, job.model_dump_json())
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return IngestionJob.model_validate_json(row[0]) if row else None
+
+    def list(self, limit: int = 50) -> List[IngestionJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [IngestionJob.model_validate_json(row[0]) for row in rows]
+
+    def unfinished(self) -> List[IngestionJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchall()
+        return [IngestionJob.model_validate_json(row[0]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class IngestionJobManager:
+    """Runs document ingestion in background workers with bounded concurrency"""
+
+    def __init__(self, store: JobStore, max_workers: int):
+        self.store = store
+        self.max_workers = max_workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        # Jobs interrupted by a restart start again from the beginning
+        for job in self.store.unfinished():
+            logger.info(f"Re-queueing ingestion job {job.job_id} after restart")
+            job.status = JobStatus.QUEUED
+            job.current_stage = None
+            job.stages = {stage: StageStatus.PENDING for stage in job.stages}
+            self.store.save(job)
+            self._queue.put_nowait(job.job_id)
+
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.max_workers)
+        ]
+        logger.info(f"Started {self.max_workers} ingestion workers")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _enqueue(self, job: IngestionJob) -> IngestionJob:
+        if self._queue is None:
+            raise RuntimeError("Ingestion job manager has not been started")
+        stages = ([STAGE_DOWNLOAD] if job.document_link else []) + INGESTION_STAGES
+        job.stages = {stage: StageStatus.PENDING for stage in stages}
+        self.store.save(job)
+        self._queue.put_nowait(job.job_id)
+        logger.info(f"Queued ingestion job {job.job_id}")
+        return job
+
+    def submit_file(self, file_path: str, filename: str) -> IngestionJob:
+        return self._enqueue(IngestionJob(file_path=file_path, filename=filename))
+
+    def submit_link(self, document_link: str) -> IngestionJob:
+        return self._enqueue(IngestionJob(document_link=document_link))
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        return self.store.get(job_id)
+
+    def list_jobs(self, limit: int = 50) -> List[IngestionJob]:
+        return self.store.list(limit)
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.store.get(job_id)
+                if job is not None:
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Ingestion worker {worker_id} failed on job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestionJob) -> None:
+        async def enter_stage(stage: str) -> None:
+            if job.current_stage:
+                job.stages[job.current_stage] = StageStatus.COMPLETED
+            job.current_stage = stage
+            job.stages[stage] = StageStatus.RUNNING
+            self.store.save(job)
+
+        job.status = JobStatus.RUNNING
+        self.store.save(job)
+        try:
+            if job.document_link:
+                await enter_stage(STAGE_DOWNLOAD)
+                saved, job.filename = await download_document(job.document_link)
+                job.file_path, content = saved.file_path, saved.content
+            else:
+                content = None
+            job.result = await ingest_document(
+                job.file_path,
+                job.filename,
+                on_stage=enter_stage,
+                content=content,
+                source=job.document_link or "upload"
+            )
+            job.stages[job.current_stage] = StageStatus.COMPLETED
+            job.status = JobStatus.COMPLETED
+            logger.info(f"Ingestion job {job.job_id} completed")
+            summary_manager.schedule(job.result["index_path"])
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = getattr(e, "detail", None) or str(e)
+            logger.error(f"Ingestion job {job.job_id} failed: {job.error}")
+        finally:
+            self.store.save(job)
+
+job_manager = IngestionJobManager(
+    JobStore(INGESTION_CONFIG.job_db_path),
+    max_workers=INGESTION_CONFIG.max_concurrent_jobs
+)
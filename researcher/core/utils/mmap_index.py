@@ -0,0 +1,401 @@
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from langchain.docstore.document import Document
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import logging
+from researcher.core.config.vector_store_config import AnnConfig, CompressionConfig, VECTOR_STORE_CONFIG
+from researcher.core.utils.ann_index import (
+    ANN_FILE, FLAT, IVFPQ, build_ann_index, read_ann_index, search_ann, write_ann_index
+)
+from researcher.core.utils.vector_compression import (
+    COMPRESSED_FILE, NONE, build_compressed_index, scalar_quantizer, search_compressed
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.npy"
+TEXTS_FILE = "texts.bin"
+OFFSETS_FILE = "offsets.npy"
+METADATA_IDS_FILE = "metadata_ids.npy"
+
+class UnsupportedIndexFormatError(ValueError):
+    """Raised for indexes written in a format this version cannot read"""
+
+def is_mmap_index(index_path: str) -> bool:
+    return os.path.isfile(os.path.join(index_path, MANIFEST_FILE))
+
+def is_legacy_index(index_path: str) -> bool:
+    """True for LangChain FAISS save_local directories (index.faiss + pickled docstore)"""
+    return (
+        os.path.isfile(os.path.join(index_path, "index.faiss"))
+        and os.path.isfile(os.path.join(index_path, "index.pkl"))
+    )
+
+def normalize_vectors(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def replace_directory(tmp_path: str, index_path: str) -> None:
+    """Swaps a fully written directory into place so readers never see a partial index"""
+    backup_path = None
+    if os.path.exists(index_path):
+        backup_path = f"{index_path}.old-{os.getpid()}-{time.time_ns()}"
+        os.rename(index_path, backup_path)
+    os.rename(tmp_path, index_path)
+    if backup_path:
+        shutil.rmtree(backup_path, ignore_errors=True)
+
+class MMapIndex:
+    """
+    Read-only vector index backed by memory-mapped files.
+
+    Layout of an index directory:
+        manifest.json     format version, dimensions, embedding model, shared metadata table
+        vectors.npy       float32 [n, dim] L2-normalised vectors, memory-mapped on open
+        offsets.npy       int64 [n + 1] byte offsets of each chunk inside texts.bin
+        texts.bin         UTF-8 chunk texts, concatenated
+        metadata_ids.npy  int32 [n] row in the manifest metadata table for each chunk
+        ann.faiss         optional HNSW / IVF / IVF-PQ index, present once the index is large enough
+        compressed.faiss  optional fp16 / int8 (optionally PCA-reduced) codes scanned by exact search
+
+    Only the manifest is parsed on open; chunk texts are read on demand for the top-k hits. When
+    searches run over compressed codes, the float32 vectors are only read to re-score candidates.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        ann_config: Optional[AnnConfig] = None,
+        compression_config: Optional[CompressionConfig] = None
+    ):
+        self.index_path = index_path
+        self.ann_config = ann_config or VECTOR_STORE_CONFIG.ann
+        self.compression_config = compression_config or VECTOR_STORE_CONFIG.compression
+        with open(os.path.join(index_path, MANIFEST_FILE), "r") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise UnsupportedIndexFormatError(
+                f"Unsupported index format version in {index_path}: {self.manifest.get('format_version')}"
+            )
+
+        self.vectors = np.load(os.path.join(index_path, VECTORS_FILE), mmap_mode="r")
+        self.offsets = np.load(os.path.join(index_path, OFFSETS_FILE), mmap_mode="r")
+        self.metadata_ids = np.load(os.path.join(index_path, METADATA_IDS_FILE), mmap_mode="r")
+        self.metadata_table: List[Dict[str, Any]] = self.manifest.get("metadata", [])
+        self.texts_path = os.path.join(index_path, TEXTS_FILE)
+        self._ann = None
+        self._compressed = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def ntotal(self) -> int:
+        return int(self.manifest["count"])
+
+    @property
+    def dim(self) -> int:
+        return int(self.manifest["dim"])
+
+    @property
+    def embedding_model(self) -> Optional[str]:
+        return self.manifest.get("embedding_model")
+
+    @property
+    def content_hash(self) -> str:
+        return self.manifest["content_hash"]
+
+    @property
+    def index_type(self) -> str:
+        return self.manifest.get("ann", {}).get("type", FLAT)
+
+    @property
+    def codec(self) -> str:
+        return self.manifest.get("compression", {}).get("codec", NONE)
+
+    def ann_index(self):
+        """The ANN index, read on first use; None for indexes searched exactly"""
+        if self.index_type == FLAT:
+            return None
+        with self._load_lock:
+            if self._ann is None:
+                self._ann = read_ann_index(os.path.join(self.index_path, ANN_FILE))
+        return self._ann
+
+    def compressed_index(self):
+        """Compressed codes for exact search, read on first use; None when exact search scans float32"""
+        if self.index_type != FLAT or self.codec == NONE:
+            return None
+        with self._load_lock:
+            if self._compressed is None:
+                self._compressed = read_ann_index(os.path.join(self.index_path, COMPRESSED_FILE))
+        return self._compressed
+
+    @classmethod
+    def write(
+        cls,
+        index_path: str,
+        texts: Sequence[str],
+        vectors: np.ndarray,
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        embedding_model: Optional[str] = None,
+        ann_config: Optional[AnnConfig] = None,
+        compression_config: Optional[CompressionConfig] = None
+    ) -> "MMapIndex":
+        """
+        Writes a new index to a temporary directory and atomically moves it into place.
+        An ANN index is built alongside the vectors when the chunk count calls for one,
+        and compressed codes replace the float32 scan when a codec is configured.
+        """
+        ann_config = ann_config or VECTOR_STORE_CONFIG.ann
+        compression_config = compression_config or VECTOR_STORE_CONFIG.compression
+        vectors = normalize_vectors(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(texts):
+            raise ValueError(f"Expected {len(texts)} vectors, got array of shape {vectors.shape}")
+        metadatas = metadatas or [{} for _ in texts]
+
+        # Chunks from one document share their metadata, so store each distinct dict once
+        metadata_table: List[Dict[str, Any]] = []
+        metadata_rows: Dict[str, int] = {}
+        metadata_ids = np.empty(len(texts), dtype=np.int32)
+        for i, metadata in enumerate(metadatas):
+            key = json.dumps(metadata, sort_keys=True)
+            if key not in metadata_rows:
+                metadata_rows[key] = len(metadata_table)
+                metadata_table.append(metadata)
+            metadata_ids[i] = metadata_rows[key]
+
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        content_hash = hashlib.sha256()
+        content_hash.update(vectors.tobytes())
+        for b in encoded:
+            content_hash.update(b)
+
+        parent = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = f"{index_path}.tmp-{os.getpid()}-{time.time_ns()}"
+        os.makedirs(tmp_path)
+        try:
+            np.save(os.path.join(tmp_path, VECTORS_FILE), vectors)
+            np.save(os.path.join(tmp_path, OFFSETS_FILE), offsets)
+            np.save(os.path.join(tmp_path, METADATA_IDS_FILE), metadata_ids)
+            with open(os.path.join(tmp_path, TEXTS_FILE), "wb") as f:
+                for b in encoded:
+                    f.write(b)
+            index_type, ann = build_ann_index(vectors, ann_config, scalar_quantizer(compression_config.codec))
+            if ann is not None:
+                write_ann_index(ann, os.path.join(tmp_path, ANN_FILE))
+            else:
+                compressed = build_compressed_index(vectors, compression_config)
+                if compressed is not None:
+                    write_ann_index(compressed, os.path.join(tmp_path, COMPRESSED_FILE))
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "count": len(texts),
+                "dim": int(vectors.shape[1]) if len(texts) else 0,
+                "metric": "cosine",
+                "embedding_model": embedding_model,
+                "content_hash": content_hash.hexdigest(),
+                "ann": {"type": index_type},
+                "compression": {"codec": compression_config.codec if len(texts) else NONE},
+                "created_at": time.time(),
+                "metadata": metadata_table
+            }
+            with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f)
+            replace_directory(tmp_path, index_path)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        logger.info(f"Wrote {index_type} index with {len(texts)} chunks to {index_path}")
+        return cls(index_path, ann_config, compression_config)
+
+    def search(
+        self,
+        query_vector: Sequence[float],
+        k: int = 5,
+        allowed_metadata_ids: Optional[Sequence[int]] = None,
+        excluded_ids: Optional[Sequence[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Cosine search; returns (chunk id, score) pairs ordered by descending score.
+        allowed_metadata_ids restricts the search to chunks whose metadata row is listed and
+        excluded_ids drops individual chunks (e.g. deleted ones). Uses the ANN index when there
+        is one, unless the filter leaves few enough chunks to score exactly.
+        """
+        if self.ntotal == 0:
+            return []
+        query = normalize_vectors(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))
+        allowed_ids = None
+        if allowed_metadata_ids is not None:
+            mask = np.isin(self.metadata_ids, np.asarray(allowed_metadata_ids, dtype=np.int32))
+            allowed_ids = np.flatnonzero(mask)
+            if excluded_ids is not None:
+                allowed_ids = np.setdiff1d(allowed_ids, np.asarray(excluded_ids, dtype=np.int64))
+                excluded_ids = None
+            if len(allowed_ids) == 0:
+                return []
+
+        small_filter = allowed_ids is not None and len(allowed_ids) < self.ann_config.flat_max_vectors
+        if small_filter or self.ann_index() is None:
+            if allowed_ids is None and self.compressed_index() is not None:
+                return self._compressed_search(query, k, excluded_ids)[0]
+            return self._exact_search(query[0], k, allowed_ids, excluded_ids)
+        return self._ann_search(query, k, allowed_ids, excluded_ids)[0]
+
+    def _exact_search(
+        self,
+        query: np.ndarray,
+        k: int,
+        allowed_ids: Optional[np.ndarray] = None,
+        excluded_ids: Optional[Sequence[int]] = None
+    ) -> List[Tuple[int, float]]:
+        if allowed_ids is None:
+            ids = None
+            scores = self.vectors @ query
+            if excluded_ids is not None and len(excluded_ids):
+                scores[np.asarray(excluded_ids, dtype=np.int64)] = -np.inf
+        else:
+            ids = allowed_ids
+            scores = self.vectors[ids] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        chunk_ids = top if ids is None else ids[top]
+        return [(int(i), float(score)) for i, score in zip(chunk_ids, scores[top])]
+
+    def _ann_search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        allowed_ids: Optional[np.ndarray] = None,
+        excluded_ids: Optional[Sequence[int]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        # PQ and scalar-quantized distances are approximate, so fetch extra candidates and re-score them
+        if self.index_type == IVFPQ:
+            factor = self.ann_config.pq_rescore_factor
+        elif self.codec != NONE:
+            factor = self.compression_config.rescore_factor
+        else:
+            factor = 1
+        scores, ids = search_ann(
+            self.ann_index(), self.index_type, queries, min(k * factor, self.ntotal),
+            self.ann_config, allowed_ids, excluded_ids
+        )
+        return self._collect_hits(queries, ids, scores, k, rescore=factor > 1)
+
+    def _compressed_search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        excluded_ids: Optional[Sequence[int]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        fetch = min(k * self.compression_config.rescore_factor, self.ntotal)
+        scores, ids = search_compressed(self.compressed_index(), queries, fetch, excluded_ids)
+        return self._collect_hits(queries, ids, scores, k, rescore=True)
+
+    def _collect_hits(
+        self,
+        queries: np.ndarray,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        rescore: bool
+    ) -> List[List[Tuple[int, float]]]:
+        """Turns faiss results into hits, re-scoring the candidates against the float32 vectors if asked"""
+        results = []
+        for query, row_ids, row_scores in zip(queries, ids, scores):
+            found = row_ids >= 0
+            row_ids, row_scores = row_ids[found], row_scores[found]
+            if rescore and len(row_ids):
+                row_scores = self.get_vectors(row_ids) @ query
+                order = np.argsort(-row_scores)[:k]
+                row_ids, row_scores = row_ids[order], row_scores[order]
+            results.append([(int(i), float(score)) for i, score in zip(row_ids[:k], row_scores[:k])])
+        return results
+
+    def metadata_rows(self, key: str, values: Sequence[Any]) -> List[int]:
+        """Rows of the metadata table whose key is one of values"""
+        wanted = set(values)
+        return [row for row, metadata in enumerate(self.metadata_table) if metadata.get(key) in wanted]
+
+    def search_batch(self, query_vectors: np.ndarray, k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Scores every query against the index in one matrix product (or one ANN call); returns hits per query"""
+        if self.ntotal == 0:
+            return [[] for _ in range(len(query_vectors))]
+        queries = normalize_vectors(np.asarray(query_vectors, dtype=np.float32))
+        if self.ann_index() is not None:
+            return self._ann_search(queries, k)
+        if self.compressed_index() is not None:
+            return self._compressed_search(queries, k)
+        scores = queries @ self.vectors.T
+        k = min(k, self.ntotal)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [
+            [(int(i), float(score)) for i, score in zip(row_ids, row_scores)]
+            for row_ids, row_scores in zip(top, top_scores)
+        ]
+
+    def get_vectors(self, ids: Sequence[int]) -> np.ndarray:
+        return np.asarray(self.vectors[np.asarray(ids, dtype=np.int64)])
+
+    def get_texts(self, ids: Sequence[int]) -> List[str]:
+        """Reads only the requested chunk texts from disk"""
+        texts: Dict[int, str] = {}
+        with open(self.texts_path, "rb") as f:
+            for i in sorted(set(ids)):
+                start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+                f.seek(start)
+                texts[i] = f.read(end - start).decode("utf-8")
+        return [texts[i] for i in ids]
+
+    def get_metadata(self, chunk_id: int) -> Dict[str, Any]:
+        return dict(self.metadata_table[int(self.metadata_ids[chunk_id])])
+
+    def get_documents(self, hits: Sequence[Tuple[int, float]]) -> List[Document]:
+        ids = [chunk_id for chunk_id, _ in hits]
+        documents = []
+        for (chunk_id, score), text in zip(hits, self.get_texts(ids)):
+            metadata = self.get_metadata(chunk_id)
+            metadata.update({"chunk_id": chunk_id, "score": score})
+            documents.append(Document(page_content=text, metadata=metadata))
+        return documents
+
+    def similarity_search_by_vector(self, query_vector: Sequence[float], k: int = 5) -> List[Document]:
+        return self.get_documents(self.search(query_vector, k))
+
+    def memory_bytes(self) -> int:
+        """
+        Bytes a search reads in full: the ANN index or compressed codes when present, otherwise
+        the float32 vectors. Re-scoring and chunk texts only touch the rows they need.
+        """
+        files = [OFFSETS_FILE, METADATA_IDS_FILE]
+        if self.index_type != FLAT:
+            files.append(ANN_FILE)
+        elif self.codec != NONE and self.ntotal:
+            files.append(COMPRESSED_FILE)
+        else:
+            files.append(VECTORS_FILE)
+        return sum(os.path.getsize(os.path.join(self.index_path, name)) for name in files)
+
+    def nbytes(self) -> int:
+        return sum(
+            os.path.getsize(os.path.join(self.index_path, name))
+            for name in os.listdir(self.index_path)
+        )
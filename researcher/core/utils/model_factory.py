@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
 import os
 from openai import AsyncOpenAI
-from huggingface_hub import InferenceClient
-from typing import List, Dict
+from huggingface_hub import AsyncInferenceClient
+from typing import Any, AsyncIterator, List, Dict
+import httpx
 import json
+import threading
 import logging
 from researcher.core.config.model_config import ModelProvider, get_model_config
+from researcher.core.utils.concurrency import ConcurrencyLimiter
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -20,14 +23,48 @@ class LLMInterface(ABC):
         self, 
         prompt: str, 
         system_prompt: str = None,
-        functions: List[Dict] = None
+        functions: List[Dict] = None,
+        max_tokens: int = None
     ) -> str:
         pass
 
+    @abstractmethod
+    def stream_text(self, prompt: str, system_prompt: str = None) -> AsyncIterator[str]:
+        """Yields the completion incrementally as text deltas"""
+        pass
+
+    @property
+    def model_name(self) -> str:
+        """Identifies the underlying model, e.g. for keying cached answers"""
+        return type(self).__name__
+
+    async def close(self) -> None:
+        """Releases the client's connection pool"""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
 class OpenAIModel(LLMInterface):
     def __init__(self):
         self.config = get_model_config().openai
-        self.client = AsyncOpenAI(api_key=self.config.api_key)
+        self.client = AsyncOpenAI(
+            api_key=self.config.api_key,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections
+                ),
+                timeout=self.config.timeout
+            )
+        )
+
+    @property
+    def model_name(self) -> str:
+        return self.config.model_name
+
+    async def close(self) -> None:
+        await self.client.close()
 
     async def generate_text(self, prompt: str, system_prompt: str = None) -> str:
         messages = []
@@ -47,11 +84,33 @@ class OpenAIModel(LLMInterface):
             logger.error(f"Error generating text with OpenAI: {str(e)}")
             raise
 
+    async def stream_text(self, prompt: str, system_prompt: str = None) -> AsyncIterator[str]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.config.model_name,
+                messages=messages,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"Error streaming text with OpenAI: {str(e)}")
+            raise
+
     async def generate_text_with_functions(
         self, 
         prompt: str, 
         system_prompt: str = None,
-        functions: List[Dict] = None
+        functions: List[Dict] = None,
+        max_tokens: int = None
     ) -> str:
         try:
             messages = [
@@ -65,7 +124,8 @@ class OpenAIModel(LLMInterface):
                 messages=messages,
                 tools=[{"type": "function", "function": f} for f in functions],
                 tool_choice="auto",
-                temperature=0.1
+                temperature=0.1,
+                max_tokens=max_tokens or self.config.max_tokens
             )
             
             tool_calls = response.choices[0].message.tool_calls
@@ -94,7 +154,18 @@ class OpenAIModel(LLMInterface):
 class LocalModel(LLMInterface):
     def __init__(self):
         self.config = get_model_config().local
-        self.client = InferenceClient(token=self.config.hf_api_key)
+        self.client = AsyncInferenceClient(token=self.config.hf_api_key, timeout=self.config.timeout)
+        self.limiter = ConcurrencyLimiter(self.config.max_concurrent_requests, name="Local model")
+
+    @property
+    def model_name(self) -> str:
+        return self.config.model_id
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.limiter.stats()
         
     async def generate_text(self, prompt: str, system_prompt: str = None) -> str:
         try:
@@ -109,13 +180,14 @@ class LocalModel(LLMInterface):
                 "content": prompt
             })
 
-            response = self.client.chat.completions.create(
-                model=self.config.model_id,
-                messages=messages,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_new_tokens,
-                top_p=self.config.top_p
-            )
+            async with self.limiter.acquire():
+                response = await self.client.chat.completions.create(
+                    model=self.config.model_id,
+                    messages=messages,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_new_tokens,
+                    top_p=self.config.top_p
+                )
             
             return response.choices[0].message.content
 
@@ -123,11 +195,35 @@ class LocalModel(LLMInterface):
             logger.error(f"Error generating text with local model: {str(e)}")
             raise
 
+    async def stream_text(self, prompt: str, system_prompt: str = None) -> AsyncIterator[str]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        try:
+            async with self.limiter.acquire():
+                stream = await self.client.chat.completions.create(
+                    model=self.config.model_id,
+                    messages=messages,
+                    temperature=self.config.temperature,
+                    max_tokens=self.config.max_new_tokens,
+                    top_p=self.config.top_p,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"Error streaming text with local model: {str(e)}")
+            raise
+
     async def generate_text_with_functions(
         self, 
         prompt: str, 
         system_prompt: str = None,
-        functions: List[Dict] = None
+        functions: List[Dict] = None,
+        max_tokens: int = None
     ) -> str:
         try:
             logger.info(f"Generating text with functions using {self.config.model_id}")
@@ -158,13 +254,14 @@ Additional Context: {system_prompt if system_prompt else 'No additional context
             ]
 
             logger.info("Sending request to model for function selection")
-            response = self.client.chat.completions.create(
-                model=self.config.model_id,
-                messages=messages,
-                temperature=0.2,
-                max_tokens=self.config.max_new_tokens,
-                top_p=self.config.top_p
-            )
+            async with self.limiter.acquire():
+                response = await self.client.chat.completions.create(
+                    model=self.config.model_id,
+                    messages=messages,
+                    temperature=0.2,
+                    max_tokens=max_tokens or self.config.max_new_tokens,
+                    top_p=self.config.top_p
+                )
 
             response_text = response.choices[0].message.content.strip()
             logger.info(f"Received response from model: {response_text[:100]}...")
@@ -209,11 +306,37 @@ Additional Context: {system_prompt if system_prompt else 'No additional context
             })
 
 class ModelFactory:
+    """Hands out one long-lived model client per provider so connections are reused across requests"""
+    _models: Dict[ModelProvider, LLMInterface] = {}
+    _lock = threading.Lock()
+
     @staticmethod
-    def get_model(provider: ModelProvider) -> LLMInterface:
+    def create_model(provider: ModelProvider) -> LLMInterface:
         if provider == ModelProvider.OPENAI:
             return OpenAIModel()
         elif provider == ModelProvider.LOCAL:
             return LocalModel()
         else:
-            raise ValueError(f"Unknown model provider: {provider}")
\ No newline at end of file
+            raise ValueError(f"Unknown model provider: {provider}")
+
+    @classmethod
+    def get_model(cls, provider: ModelProvider) -> LLMInterface:
+        provider = ModelProvider(provider)
+        with cls._lock:
+            if provider not in cls._models:
+                logger.info(f"Creating shared model client for provider: {provider}")
+                cls._models[provider] = cls.create_model(provider)
+            return cls._models[provider]
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        with cls._lock:
+            return {provider.value: model.stats() for provider, model in cls._models.items()}
+
+    @classmethod
+    async def close_all(cls) -> None:
+        with cls._lock:
+            models = list(cls._models.values())
+            cls._models.clear()
+        for model in models:
+            await model.close()
\ No newline at end of file
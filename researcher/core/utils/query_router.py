@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional, Set
+from langchain.docstore.document import Document
+import asyncio
+import json
+import random
+import threading
+import logging
+from researcher.core.config.router_config import QueryRouterConfig, ROUTER_CONFIG
+from researcher.core.utils.model_factory import LLMInterface
+from researcher.core.utils.search_utils import QueryAnalyzer, FunctionRegistry
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_SEARCH = "google_search"
+ANSWER_FROM_DOCUMENT = "answer_from_document"
+
+ROUTING_SYSTEM_PROMPT = """You are a helpful research assistant. Based on the question, decide whether to:
+        1. Use the provided document context to answer (use answer_from_document)
+        2. Search the web for recent or additional information (use google_search)
+        Choose the appropriate function based on the nature of the question."""
+
+class RouteDecision:
+    def __init__(self, function_name: str, tier: str, reasons: List[str], top_score: Optional[float] = None):
+        self.function_name = function_name
+        self.tier = tier
+        self.reasons = reasons
+        self.top_score = top_score
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "function_name": self.function_name,
+            "tier": self.tier,
+            "reasons": self.reasons,
+            "top_score": self.top_score
+        }
+
+class QueryRouter:
+    """
+    Tiered router between document context and web search.
+    Keyword signals and retrieval similarity settle confident cases locally;
+    ambiguous queries fall through to a small, capped function-calling completion.
+    """
+
+    def __init__(
+        self,
+        model: LLMInterface,
+        query_analyzer: QueryAnalyzer,
+        function_registry: FunctionRegistry,
+        config: QueryRouterConfig = ROUTER_CONFIG
+    ):
+        self.model = model
+        self.query_analyzer = query_analyzer
+        self.function_registry = function_registry
+        self.config = config
+        self._lock = threading.Lock()
+        self._shadow_tasks: Set[asyncio.Task] = set()
+        self.decisions: Dict[str, int] = {}
+        self.compared = 0
+        self.agreed = 0
+
+    def local_decision(self, query: str, similar_chunks: List[Document], context: str) -> Dict[str, Any]:
+        """Returns the locally preferred function and whether the evidence is strong enough to skip the LLM"""
+        analysis = self.query_analyzer.analyze_query(query, context)
+        scores = [chunk.metadata["score"] for chunk in similar_chunks if "score" in chunk.metadata]
+        top_score = max(scores) if scores else None
+        lean = GOOGLE_SEARCH if analysis["needs_external_search"] else ANSWER_FROM_DOCUMENT
+
+        confident = False
+        if top_score is None:
+            # Without retrieval scores only an explicit temporal cue is decisive
+            confident = analysis["temporal_match"]
+        elif lean == ANSWER_FROM_DOCUMENT:
+            confident = top_score >= self.config.document_similarity_threshold
+        else:
+            confident = top_score < self.config.external_similarity_threshold
+            if not analysis["temporal_match"] and top_score >= self.config.document_similarity_threshold:
+                # Strong retrieval outweighs weak lexical external cues
+                lean, confident = ANSWER_FROM_DOCUMENT, True
+
+        return {
+            "function_name": lean,
+            "confident": confident,
+            "reasons": analysis["reasons"],
+            "top_score": top_score
+        }
+
+    async def llm_decision(self, query: str, context: str) -> str:
+        function_choice_prompt = f"""Question: {query}
+        Document Context Preview: {context[:500]}..."""
+
+        function_response = await self.model.generate_text_with_functions(
+            function_choice_prompt,
+            ROUTING_SYSTEM_PROMPT,
+            self.function_registry.get_function_definitions(),
+            max_tokens=self.config.llm_max_tokens
+        )
+        return json.loads(function_response).get("name")
+
+    def needs_llm(self, local: Dict[str, Any]) -> bool:
+        return not (self.config.local_routing_enabled and local["confident"])
+
+    async def route(
+        self,
+        query: str,
+        similar_chunks: List[Document],
+        context: str,
+        local: Optional[Dict[str, Any]] = None
+    ) -> RouteDecision:
+        if local is None:
+            local = self.local_decision(query, similar_chunks, context)
+
+        if not self.needs_llm(local):
+            decision = RouteDecision(local["function_name"], "local", local["reasons"], local["top_score"])
+            if random.random() < self.config.shadow_sample_rate:
+                task = asyncio.create_task(self._shadow_compare(query, context, decision.function_name))
+                self._shadow_tasks.add(task)
+                task.add_done_callback(self._shadow_tasks.discard)
+        else:
+            function_name = await self.llm_decision(query, context)
+            decision = RouteDecision(function_name, "llm", local["reasons"], local["top_score"])
+            self._record_agreement(local["function_name"], function_name)
+
+        with self._lock:
+            key = f"{decision.tier}:{decision.function_name}"
+            self.decisions[key] = self.decisions.get(key, 0) + 1
+        logger.info(
+            f"Routed query to {decision.function_name} via {decision.tier} tier "
+            f"(top score: {decision.top_score}, local lean: {local['function_name']})"
+        )
+        return decision
+
+    async def _shadow_compare(self, query: str, context: str, local_choice: str) -> None:
+        try:
+            self._record_agreement(local_choice, await self.llm_decision(query, context))
+        except Exception as e:
+            logger.warning(f"Shadow routing call failed: {str(e)}")
+
+    def _record_agreement(self, local_choice: str, llm_choice: str) -> None:
+        with self._lock:
+            self.compared += 1
+            if local_choice == llm_choice:
+                self.agreed += 1
+        if local_choice != llm_choice:
+            logger.info(f"Router disagreement: local chose {local_choice}, LLM chose {llm_choice}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "decisions": dict(self.decisions),
+                "compared_with_llm": self.compared,
+                "agreement_rate": self.agreed / self.compared if self.compared else None
+            }
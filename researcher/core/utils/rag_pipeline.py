@@ -1,23 +1,79 @@
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 from langchain.docstore.document import Document
 from researcher.core.utils.model_factory import ModelFactory, ModelProvider
 from researcher.core.utils.search_utils import GoogleSearchTool, QueryAnalyzer, FunctionRegistry
-import json
+from researcher.core.utils.query_router import QueryRouter, GOOGLE_SEARCH
+from researcher.core.utils.summarizer import Summarizer
+from researcher.core.utils.context_builder import ContextBuilder, context_usage
+from researcher.core.utils.token_counter import get_token_counter
+from researcher.core.utils.concurrency import TokenBucket
+from researcher.core.config.search_config import SEARCH_CONFIG
+import asyncio
+import threading
 import logging
 
 # Set up logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Shared across providers since it guards the search API quota
+speculative_search_budget = TokenBucket(
+    SEARCH_CONFIG.speculative_searches_per_minute,
+    SEARCH_CONFIG.speculative_search_burst
+)
+
+ANSWER_SYSTEM_PROMPT = """You are a helpful research assistant. Provide a clear and accurate answer based on the available information.
+            When using external sources, clearly indicate this with proper citations."""
+
 class RAGPipeline:
+    _pipelines: Dict[ModelProvider, "RAGPipeline"] = {}
+
     def __init__(self, model_provider: ModelProvider):
+        self.model_provider = ModelProvider(model_provider)
         self.model = ModelFactory.get_model(model_provider)
         self.google_search = GoogleSearchTool()
         self.query_analyzer = QueryAnalyzer()
         self.function_registry = FunctionRegistry()
+        self.router = QueryRouter(self.model, self.query_analyzer, self.function_registry)
+        self.summarizer = Summarizer(self.model)
+        self.context_builder = ContextBuilder(get_token_counter(self.model.model_name))
+        self.speculative_searches = {"started": 0, "used": 0, "discarded": 0}
+        self._stats_lock = threading.Lock()
+        # The query generation prompt does not depend on the document, so its output is reused
+        self._summary_queries: Dict[int, List[str]] = {}
         logger.info(f"Initialized RAG Pipeline with model provider: {model_provider}")
 
+    @classmethod
+    def for_provider(cls, model_provider: ModelProvider) -> "RAGPipeline":
+        """Returns the shared pipeline for a provider; pipelines hold no per-request state"""
+        model_provider = ModelProvider(model_provider)
+        if model_provider not in cls._pipelines:
+            cls._pipelines[model_provider] = cls(model_provider)
+        return cls._pipelines[model_provider]
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forgets the shared pipelines once ModelFactory.close_all has closed their model clients"""
+        cls._pipelines.clear()
+
+    @classmethod
+    def router_stats(cls) -> Dict[str, Any]:
+        return {
+            provider.value: {**pipeline.router.stats(), "speculative_searches": pipeline.speculative_search_stats()}
+            for provider, pipeline in cls._pipelines.items()
+        }
+
+    def _count_speculative_search(self, outcome: str) -> None:
+        with self._stats_lock:
+            self.speculative_searches[outcome] += 1
+
+    def speculative_search_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.speculative_searches)
+
     async def generate_queries(self, num_queries: int = 5) -> List[str]:
+        if num_queries in self._summary_queries:
+            return self._summary_queries[num_queries]
         logger.info(f"Generating {num_queries} queries for document summarization")
         system_prompt = "You are an AI assistant tasked with generating diverse queries to summarize a scientific research paper."
         prompt = f"""Generate {num_queries} diverse queries that would help in summarizing the key aspects of a scientific research paper. The queries should cover:
@@ -31,71 +87,68 @@ class RAGPipeline:
         Please provide {num_queries} concise queries."""
 
         response = await self.model.generate_text(prompt, system_prompt)
-        queries = response.split('\n')
-        return [query.strip() for query in queries if query.strip()]
+        queries = [query.strip() for query in response.split('\n') if query.strip()]
+        if queries:
+            self._summary_queries[num_queries] = queries
+        return queries
 
     async def summarize_document(self, chunks: List[Document]) -> str:
         logger.info(f"Summarizing document with {len(chunks)} chunks")
-        context = " ".join([chunk.page_content for chunk in chunks])
-        
-        system_prompt = "You are an expert research assistant capable of summarizing complex academic papers."
-        prompt = f"""Please summarize the following research article in detail. Your summary should include:
-
-        1. Title and authors (if available)
-        2. Main research question or objective
-        3. Key background information and context
-        4. Methodology used in the study
-        5. Primary findings and results
-        6. Significant conclusions and their implications
-        7. Any limitations mentioned in the study
-        8. Potential future research directions suggested
+        return await self.summarizer.summarize(chunks)
 
-        Organize the summary in a clear, coherent structure. Use academic language, but ensure it's accessible to a broader audience. If specific sections are unclear or missing, mention this in your summary.
+    async def summarize_document_with_sources(self, chunks: List[Document]) -> Dict[str, Any]:
+        summary = await self.summarize_document(chunks)
+        return {"summary": summary, "sources": {"documents": self._document_sources(chunks), "web": []}}
 
-        Here's the article text:
+    async def stream_summary(self, chunks: List[Document]) -> AsyncIterator[Dict[str, Any]]:
+        """Yields token events for the summary, then a sources event listing the chunks used"""
+        logger.info(f"Streaming summary of document with {len(chunks)} chunks")
+        # Map-reduce stages for long articles run first; only the final summary is streamed
+        prompt, system_prompt = await self.summarizer.build_final_prompt(chunks)
+        async for token in self.model.stream_text(prompt, system_prompt):
+            yield {"event": "token", "data": token}
+        yield {"event": "sources", "data": {"documents": self._document_sources(chunks), "web": []}}
 
-        {context}
-
-        Please provide a detailed summary based on the above instructions."""
-
-        return await self.model.generate_text(prompt, system_prompt)
-
-    async def answer_question(self, query: str, similar_chunks: List[Document]) -> str:
-        logger.info(f"Processing question: {query}")
-        context = " ".join([chunk.page_content for chunk in similar_chunks])
-        
-        # First, let the model decide which function to call
-        system_prompt = """You are a helpful research assistant. Based on the question, decide whether to:
-        1. Use the provided document context to answer (use answer_from_document)
-        2. Search the web for recent or additional information (use google_search)
-        Choose the appropriate function based on the nature of the question."""
-        
-        function_choice_prompt = f"""Question: {query}
-        Document Context Preview: {context[:500]}..."""
+    async def _plan_answer(self, query: str, similar_chunks: List[Document]) -> Dict[str, Any]:
+        """Decides between document context and web search and builds the final answer prompt"""
+        document = self.context_builder.build_document_context(similar_chunks)
+        no_web = web = self.context_builder.build_web_context([])
+        context = document.text
+        search_results = []
+        search_task: Optional[asyncio.Task] = None
+        search_used = False
         
         try:
-            # Get function choice using function calling
+            # Confident cases are routed locally; only ambiguous ones cost an LLM round trip
             logger.info("Determining whether to use Google Search or document context")
-            function_response = await self.model.generate_text_with_functions(
-                function_choice_prompt,
-                system_prompt,
-                self.function_registry.get_function_definitions()
-            )
+            local = self.router.local_decision(query, similar_chunks, context)
+            if (
+                self.router.needs_llm(local)
+                and local["function_name"] == GOOGLE_SEARCH
+                and SEARCH_CONFIG.speculative_search_enabled
+                and speculative_search_budget.try_acquire()
+            ):
+                # Overlap the likely web search with the routing completion
+                logger.info("Starting speculative Google search while routing")
+                search_task = asyncio.create_task(self.google_search.search(query))
+                self._count_speculative_search("started")
             
-            # Parse the function call
-            function_call = json.loads(function_response)
-            function_name = function_call.get("name")
-            logger.info(f"Model chose to use function: {function_name}")
+            decision = await self.router.route(query, similar_chunks, context, local=local)
+            function_name = decision.function_name
             
-            if function_name == "google_search":
-                logger.info("Performing Google search for additional information")
-                search_results = await self.google_search.search(query)
+            if function_name == GOOGLE_SEARCH:
+                if search_task is not None:
+                    search_used = True
+                    self._count_speculative_search("used")
+                    search_results = await search_task
+                else:
+                    logger.info("Performing Google search for additional information")
+                    search_results = await self.google_search.search(query)
                 if search_results:
                     logger.info(f"Found {len(search_results)} relevant search results")
-                    external_context = "\n".join([
-                        f"Source ({result.title}): {result.content}"
-                        for result in search_results
-                    ])
+                    web = self.context_builder.build_web_context(search_results)
+                    search_results = web.items
+                    external_context = web.text
                     
                     prompt = f"""Question: {query}
                     
@@ -113,25 +166,84 @@ class RAGPipeline:
             else:
                 logger.info("Using document context for answering")
                 prompt = f"Question: {query}\n\nDocument Context: {context}"
-            
+        except Exception as e:
+            logger.error(f"Error choosing answer strategy: {str(e)}")
+            logger.info("Falling back to document context due to error")
+            search_results = []
+            web = no_web
+            prompt = f"Question: {query}\n\nDocument Context: {context}"
+        finally:
+            if search_task is not None and not search_used:
+                logger.info("Discarding speculative Google search")
+                self._count_speculative_search("discarded")
+                search_task.cancel()
+                # Wait for the cancellation so the search never outlives the request and its errors are retrieved
+                await asyncio.gather(search_task, return_exceptions=True)
+        
+        return {
+            "prompt": prompt,
+            "fallback_prompt": f"Question: {query}\n\nDocument Context: {context}",
+            "search_results": search_results,
+            "chunks": document.items,
+            "context": context_usage(document, web),
+            "fallback_context": context_usage(document, no_web)
+        }
+
+    @staticmethod
+    def _document_sources(chunks: List[Document]) -> List[Dict[str, Any]]:
+        return [
+            {key: chunk.metadata[key] for key in ("filename", "chunk_id", "score") if key in chunk.metadata}
+            for chunk in chunks
+        ]
+
+    @staticmethod
+    def _format_citations(search_results: List[Any]) -> str:
+        if not search_results:
+            return ""
+        citations = "\n\nSources:\n"
+        for result in search_results:
+            citations += f"- {result.title}: {result.url}\n"
+        return citations
+
+    async def answer_question(self, query: str, similar_chunks: List[Document]) -> str:
+        result = await self.answer_question_with_sources(query, similar_chunks)
+        return result["answer"]
+
+    async def answer_question_with_sources(self, query: str, similar_chunks: List[Document]) -> Dict[str, Any]:
+        """Returns the answer with the same sources payload the streaming endpoint sends"""
+        logger.info(f"Processing question: {query}")
+        plan = await self._plan_answer(query, similar_chunks)
+        sources = {"documents": self._document_sources(plan["chunks"]), "web": []}
+        
+        try:
             # Generate final answer
-            system_prompt = """You are a helpful research assistant. Provide a clear and accurate answer based on the available information.
-            When using external sources, clearly indicate this with proper citations."""
-            
-            answer = await self.model.generate_text(prompt, system_prompt)
-            
-            # Add source attribution if external search was used
-            if function_name == "google_search" and search_results:
-                logger.info("Adding source citations to the answer")
-                answer += "\n\nSources:\n"
-                for result in search_results:
-                    answer += f"- {result.title}: {result.url}\n"
-            
-            return answer
-            
+            answer = await self.model.generate_text(plan["prompt"], ANSWER_SYSTEM_PROMPT)
         except Exception as e:
             logger.error(f"Error in answer_question: {str(e)}")
             logger.info("Falling back to document context due to error")
-            # Fallback to document context if function calling fails
-            prompt = f"Question: {query}\n\nDocument Context: {context}"
-            return await self.model.generate_text(prompt, system_prompt)
+            answer = await self.model.generate_text(plan["fallback_prompt"], ANSWER_SYSTEM_PROMPT)
+            return {"answer": answer, "sources": sources, "context": plan["fallback_context"]}
+        
+        # Add source attribution if external search was used
+        if plan["search_results"]:
+            logger.info("Adding source citations to the answer")
+            answer += self._format_citations(plan["search_results"])
+            sources["web"] = [result.to_dict() for result in plan["search_results"]]
+        return {"answer": answer, "sources": sources, "context": plan["context"]}
+
+    async def stream_answer(self, query: str, similar_chunks: List[Document]) -> AsyncIterator[Dict[str, Any]]:
+        """Yields a context event, token events as the answer is generated, then a final sources event"""
+        logger.info(f"Streaming answer to question: {query}")
+        plan = await self._plan_answer(query, similar_chunks)
+        yield {"event": "context", "data": plan["context"]}
+        
+        async for token in self.model.stream_text(plan["prompt"], ANSWER_SYSTEM_PROMPT):
+            yield {"event": "token", "data": token}
+        
+        yield {
+            "event": "sources",
+            "data": {
+                "documents": self._document_sources(plan["chunks"]),
+                "web": [result.to_dict() for result in plan["search_results"]]
+            }
+        }
@@ -1,7 +1,10 @@
-from typing import List, Dict, Any, Optional
-import aiohttp
+from typing import List, Dict, Any, Optional, Tuple
+import re
 import logging
 from researcher.core.config.search_config import SEARCH_CONFIG
+from researcher.core.utils.http_client import http_client
+from researcher.core.utils.lru_cache import LRUCache
+from researcher.core.utils.embedding_cache import normalize_query
 import json
 
 logger = logging.getLogger(__name__)
@@ -19,40 +22,67 @@ class SearchResult:
             "content": self.content
         }
 
+# Shared by every pipeline so identical questions from different users reuse one API call
+search_cache = LRUCache(max_entries=SEARCH_CONFIG.cache_max_entries)
+search_counters = {"api_calls": 0, "api_errors": 0, "error_hits": 0}
+
+def search_cache_key(query: str, max_results: int) -> Tuple[str, int]:
+    return normalize_query(query), max_results
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    return {**search_cache.stats(), **search_counters}
+
 class GoogleSearchTool:
     def __init__(self):
         self.api_key = SEARCH_CONFIG.api_key
         self.search_engine_id = SEARCH_CONFIG.search_engine_id
         self.base_url = "https://www.googleapis.com/customsearch/v1"
 
-    async def search(self, query: str) -> List[SearchResult]:
-        """Perform Google Custom Search"""
+    async def search(self, query: str, max_results: Optional[int] = None) -> List[SearchResult]:
+        """Perform Google Custom Search, serving repeated queries from the result cache"""
+        max_results = max_results or SEARCH_CONFIG.max_results
+        key = search_cache_key(query, max_results)
+        cached = search_cache.get(key)
+        if cached is not None:
+            results, is_error = cached
+            if is_error:
+                search_counters["error_hits"] += 1
+                logger.info("Skipping Google search after a recent API error for the same query")
+            return list(results)
+
+        results, is_error = await self._fetch(query, max_results)
+        ttl = SEARCH_CONFIG.error_cache_ttl_seconds if is_error else SEARCH_CONFIG.cache_ttl_seconds
+        search_cache.put(key, (results, is_error), ttl=ttl)
+        return list(results)
+
+    async def _fetch(self, query: str, max_results: int) -> Tuple[List[SearchResult], bool]:
+        """Returns the results and whether the API call failed"""
         params = {
             'key': self.api_key,
             'cx': self.search_engine_id,
             'q': query,
-            'num': SEARCH_CONFIG.max_results
+            'num': max_results
         }
 
+        search_counters["api_calls"] += 1
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return [
-                            SearchResult(
-                                title=item.get('title', ''),
-                                link=item.get('link', ''),
-                                snippet=item.get('snippet', '')
-                            )
-                            for item in data.get('items', [])
-                        ]
-                    else:
-                        logger.error(f"Google Search API error: {response.status}")
-                        return []
+            async with http_client.request("GET", self.base_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return [
+                        SearchResult(
+                            title=item.get('title', ''),
+                            link=item.get('link', ''),
+                            snippet=item.get('snippet', '')
+                        )
+                        for item in data.get('items', [])
+                    ], False
+                else:
+                    logger.error(f"Google Search API error: {response.status}")
         except Exception as e:
             logger.error(f"Error performing Google search: {str(e)}")
-            return []
+        search_counters["api_errors"] += 1
+        return [], True
 
 class FunctionRegistry:
     @staticmethod
@@ -89,6 +119,15 @@ class FunctionRegistry:
             }
         ]
 
+# Inflections accepted after a keyword stem, so "trends" and "comparison" match but "nowcasting" does not
+KEYWORD_SUFFIXES = ["e", "s", "es", "d", "ed", "ing", "er", "est", "ly", "ison", "isons"]
+
+def keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """Matches any keyword as a whole word or an inflected form of it"""
+    stems = sorted({keyword[:-1] if keyword.endswith("e") else keyword for keyword in keywords}, key=len, reverse=True)
+    suffixes = "|".join(sorted(KEYWORD_SUFFIXES, key=len, reverse=True))
+    return re.compile(rf"\b(?:{'|'.join(map(re.escape, stems))})(?:{suffixes})?\b")
+
 class QueryAnalyzer:
     def __init__(self):
         self.temporal_keywords = [
@@ -99,6 +138,8 @@ class QueryAnalyzer:
             'compare', 'other', 'alternative', 'different',
             'outside', 'beyond', 'additional', 'more'
         ]
+        self.temporal_pattern = keyword_pattern(self.temporal_keywords)
+        self.external_pattern = keyword_pattern(self.external_keywords)
 
     def analyze_query(self, query: str, document_context: str) -> Dict[str, Any]:
         """
@@ -106,25 +147,33 @@ class QueryAnalyzer:
         """
         needs_external = False
         reasons = []
+        # Match whole (possibly inflected) words so e.g. "know" does not trigger on "now"
+        normalized_query = query.lower()
 
         # Check for temporal keywords
-        if any(keyword in query.lower() for keyword in self.temporal_keywords):
+        temporal_match = self.temporal_pattern.search(normalized_query) is not None
+        if temporal_match:
             needs_external = True
             reasons.append("Query contains temporal keywords")
 
         # Check for comparison/external reference keywords
-        if any(keyword in query.lower() for keyword in self.external_keywords):
+        external_match = self.external_pattern.search(normalized_query) is not None
+        if external_match:
             needs_external = True
             reasons.append("Query suggests need for external information")
 
         # Check if the query topic is covered in the document context
         # This is a simple check; you might want to use more sophisticated methods
         main_terms = [word.lower() for word in query.split() if len(word) > 3]
-        if not any(term in document_context.lower() for term in main_terms):
+        topic_missing = bool(main_terms) and not any(term in document_context.lower() for term in main_terms)
+        if topic_missing:
             needs_external = True
             reasons.append("Query topic not found in document context")
 
         return {
             "needs_external_search": needs_external,
-            "reasons": reasons
-        } 
\ No newline at end of file
+            "reasons": reasons,
+            "temporal_match": temporal_match,
+            "external_match": external_match,
+            "topic_missing": topic_missing
+        }
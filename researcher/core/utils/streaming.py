@@ -0,0 +1,36 @@
+from typing import AsyncIterator, Callable
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_events(events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            yield format_sse(event["event"], event["data"])
+        yield format_sse("done", {})
+    except Exception as e:
+        logger.error(f"Error while streaming response: {str(e)}")
+        yield format_sse("error", {"detail": str(e)})
+
+async def replay_events(text: str, sources: dict) -> AsyncIterator[dict]:
+    yield {"event": "token", "data": text}
+    yield {"event": "sources", "data": sources}
+
+async def collect_stream(
+    events: AsyncIterator[dict],
+    on_complete: Callable[[str, dict], None]
+) -> AsyncIterator[dict]:
+    """Passes events through and hands the full text and sources to on_complete once the stream finishes"""
+    tokens, sources = [], None
+    async for event in events:
+        if event["event"] == "token":
+            tokens.append(event["data"])
+        elif event["event"] == "sources":
+            sources = event["data"]
+        yield event
+    if sources is not None:
+        on_complete("".join(tokens), sources)
@@ -0,0 +1,121 @@
+from typing import Callable, List, Tuple
+from langchain.docstore.document import Document
+import asyncio
+import time
+import logging
+from researcher.core.config.summary_config import SummaryConfig, SUMMARY_CONFIG
+from researcher.core.utils.model_factory import LLMInterface
+from researcher.core.utils.token_counter import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = "You are an expert research assistant capable of summarizing complex academic papers."
+
+def group_by_budget(
+    texts: List[str],
+    count_tokens: TokenCounter,
+    max_tokens: int,
+    min_group_size: int = 1
+) -> List[List[str]]:
+    """Packs consecutive texts into groups of at most max_tokens (a single oversized text forms its own group)"""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > max_tokens and len(current) >= min_group_size:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def build_summary_prompt(context: str, from_partial_summaries: bool = False) -> str:
+    source = "summaries of consecutive sections of the article" if from_partial_summaries else "article text"
+    return f"""Please summarize the following research article in detail. Your summary should include:
+
+        1. Title and authors (if available)
+        2. Main research question or objective
+        3. Key background information and context
+        4. Methodology used in the study
+        5. Primary findings and results
+        6. Significant conclusions and their implications
+        7. Any limitations mentioned in the study
+        8. Potential future research directions suggested
+
+        Organize the summary in a clear, coherent structure. Use academic language, but ensure it's accessible to a broader audience. If specific sections are unclear or missing, mention this in your summary.
+
+        Here's the {source}:
+
+        {context}
+
+        Please provide a detailed summary based on the above instructions."""
+
+def build_map_prompt(context: str) -> str:
+    return f"""Summarize the following excerpt from a research article. Keep the title and authors if present, the research question, methods, datasets, quantitative results, conclusions and stated limitations. Do not add information that is not in the excerpt.
+
+        Excerpt:
+
+        {context}"""
+
+def build_combine_prompt(context: str) -> str:
+    return f"""The following are summaries of consecutive sections of one research article. Merge them into a single summary that keeps every key claim, method, result and limitation, removing repetition.
+
+        Section summaries:
+
+        {context}"""
+
+class Summarizer:
+    """
+    Builds document summaries under a token budget. Short articles go to the model in one call;
+    longer ones are split into token-bounded groups that are summarized concurrently (map) and the
+    partial summaries are merged hierarchically until they fit a single final call (reduce).
+    """
+
+    def __init__(self, model: LLMInterface, config: SummaryConfig = SUMMARY_CONFIG, count_tokens: TokenCounter = None):
+        self.model = model
+        self.config = config
+        self.count_tokens = count_tokens or get_token_counter(model.model_name)
+
+    async def _summarize_groups(self, groups: List[List[str]], build_prompt: Callable[[str], str]) -> List[str]:
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_calls)
+
+        async def summarize(group: List[str]) -> str:
+            async with semaphore:
+                return await self.model.generate_text(build_prompt("\n\n".join(group)), SUMMARY_SYSTEM_PROMPT)
+
+        return await asyncio.gather(*[summarize(group) for group in groups])
+
+    async def build_final_prompt(self, chunks: List[Document]) -> Tuple[str, str]:
+        """Runs the map and reduce stages as needed and returns the prompt for the final summary call"""
+        # Chunk order follows the article so neighbouring chunks are summarized together
+        ordered = sorted(chunks, key=lambda chunk: chunk.metadata.get("chunk_id", 0))
+        texts = [chunk.page_content for chunk in ordered]
+        total_tokens = sum(self.count_tokens(text) for text in texts)
+
+        if total_tokens <= self.config.single_pass_max_tokens:
+            logger.info(f"Summarizing {len(texts)} chunks ({total_tokens} tokens) in a single pass")
+            return build_summary_prompt(" ".join(texts)), SUMMARY_SYSTEM_PROMPT
+
+        started = time.perf_counter()
+        groups = group_by_budget(texts, self.count_tokens, self.config.group_max_tokens)
+        logger.info(f"Summarizing {len(texts)} chunks ({total_tokens} tokens) as {len(groups)} groups")
+        partials = await self._summarize_groups(groups, build_map_prompt)
+
+        levels = 1
+        # A single partial cannot be reduced further; its over-budget text goes to the final call as is
+        while len(partials) > 1 and (
+            sum(self.count_tokens(partial) for partial in partials) > self.config.single_pass_max_tokens
+        ):
+            groups = group_by_budget(partials, self.count_tokens, self.config.group_max_tokens, min_group_size=2)
+            partials = await self._summarize_groups(groups, build_combine_prompt)
+            levels += 1
+
+        logger.info(f"Reduced to {len(partials)} partial summaries in {levels} levels and {time.perf_counter() - started:.2f}s")
+        return build_summary_prompt("\n\n".join(partials), from_partial_summaries=True), SUMMARY_SYSTEM_PROMPT
+
+    async def summarize(self, chunks: List[Document]) -> str:
+        prompt, system_prompt = await self.build_final_prompt(chunks)
+        return await self.model.generate_text(prompt, system_prompt)
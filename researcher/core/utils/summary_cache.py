@@ -0,0 +1,232 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from langchain.docstore.document import Document
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from researcher.core.config.summary_config import SummaryConfig, SUMMARY_CONFIG
+from researcher.core.config.model_config import ModelProvider
+from researcher.core.utils.rag_pipeline import RAGPipeline
+from researcher.core.utils.streaming import collect_stream
+from researcher.core.utils.vector_store import search_similar_chunks_batch, get_index_content_hash
+
+logger = logging.getLogger(__name__)
+
+# (index content hash, model provider, model name)
+SummaryScope = Tuple[str, str, str]
+
+class SummaryStore:
+    """Persists generated summaries in SQLite so they survive restarts"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Opened on first use, so importing the module does not create the database"""
+        with self._open_lock:
+            if self._connection is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS summaries ("
+                    "content_hash TEXT NOT NULL, provider TEXT NOT NULL, model_name TEXT NOT NULL, "
+                    "summary TEXT NOT NULL, sources TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "PRIMARY KEY (content_hash, provider, model_name))"
+                )
+                conn.commit()
+                self._connection = conn
+            return self._connection
+
+    def get(self, scope: SummaryScope) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, sources, created_at FROM summaries "
+                "WHERE content_hash = ? AND provider = ? AND model_name = ?",
+                scope
+            ).fetchone()
+        if row is None:
+            return None
+        return {"summary": row[0], "sources": json.loads(row[1]), "created_at": row[2]}
+
+    def put(self, scope: SummaryScope, summary: str, sources: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries "
+                "(content_hash, provider, model_name, summary, sources, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (*scope, summary, json.dumps(sources), time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+async def retrieve_summary_chunks(
+    rag: RAGPipeline,
+    index_path: str,
+    config: SummaryConfig = SUMMARY_CONFIG
+) -> List[Document]:
+    queries = await rag.generate_queries()
+    return await search_similar_chunks_batch(
+        queries,
+        index_path,
+        k=config.retrieval_k,
+        max_chunks=config.max_chunks,
+        lambda_mult=config.mmr_lambda,
+        duplicate_threshold=config.duplicate_threshold
+    )
+
+class SummaryManager:
+    """
+    Serves document summaries from the persistent store. Summaries for the configured
+    providers are generated in the background right after ingestion, a few at a time;
+    requests that arrive while one is being generated or streamed wait for it instead
+    of starting another.
+    """
+
+    def __init__(self, store: SummaryStore, config: SummaryConfig = SUMMARY_CONFIG):
+        self.store = store
+        self.config = config
+        self._tasks: Dict[SummaryScope, asyncio.Future] = {}
+        self._background_slots = asyncio.Semaphore(config.max_background_summaries)
+        self.hits = 0
+        self.waits = 0
+        self.generated = 0
+
+    @staticmethod
+    def scope(rag: RAGPipeline, index_path: str) -> SummaryScope:
+        return get_index_content_hash(index_path), rag.model_provider.value, rag.model.model_name
+
+    def get_cached(self, scope: SummaryScope) -> Optional[Dict[str, Any]]:
+        if not self.config.cache_enabled:
+            return None
+        cached = self.store.get(scope)
+        if cached is not None:
+            self.hits += 1
+        return cached
+
+    def store_summary(self, scope: SummaryScope, summary: str, sources: Dict[str, Any]) -> None:
+        if self.config.cache_enabled:
+            self.store.put(scope, summary, sources)
+
+    async def _generate(self, rag: RAGPipeline, index_path: str, scope: SummaryScope) -> Dict[str, Any]:
+        started = time.perf_counter()
+        chunks = await retrieve_summary_chunks(rag, index_path)
+        result = await rag.summarize_document_with_sources(chunks)
+        self.store_summary(scope, result["summary"], result["sources"])
+        self.generated += 1
+        logger.info(f"Generated summary for {index_path} with {scope[1]} in {time.perf_counter() - started:.2f}s")
+        return result
+
+    async def _generate_in_background(self, rag: RAGPipeline, index_path: str, scope: SummaryScope) -> Dict[str, Any]:
+        async with self._background_slots:
+            return await self._generate(rag, index_path, scope)
+
+    def _start(self, rag: RAGPipeline, index_path: str, scope: SummaryScope, background: bool = False) -> asyncio.Task:
+        generate = self._generate_in_background if background else self._generate
+        task = asyncio.create_task(generate(rag, index_path, scope))
+        self._tasks[scope] = task
+
+        def finished(task: asyncio.Task) -> None:
+            self._tasks.pop(scope, None)
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"Summary generation failed for {index_path}: {str(task.exception())}")
+
+        task.add_done_callback(finished)
+        return task
+
+    async def lookup(self, scope: SummaryScope) -> Optional[Dict[str, Any]]:
+        """Returns the stored summary, waiting for one that is being generated; None if there is none"""
+        cached = self.get_cached(scope)
+        if cached is not None:
+            return cached
+        task = self._tasks.get(scope)
+        if task is None:
+            return None
+        self.waits += 1
+        # Shielded so a disconnecting client does not abort a summary others may be waiting on
+        return await asyncio.shield(task)
+
+    async def get_summary(self, rag: RAGPipeline, index_path: str) -> Dict[str, Any]:
+        """Returns the summary for an index, generating it if nobody has yet"""
+        scope = self.scope(rag, index_path)
+        result = await self.lookup(scope)
+        if result is not None:
+            return result
+        return await asyncio.shield(self._start(rag, index_path, scope))
+
+    async def stream_summary(self, rag: RAGPipeline, index_path: str, scope: SummaryScope) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Retrieves the chunks and returns the summary's event stream. The summary counts as in
+        flight until the stream ends, so requests for it meanwhile wait instead of generating
+        their own; they get None, and generate it themselves, if the stream ends early.
+        """
+        in_flight = asyncio.get_running_loop().create_future()
+        self._tasks[scope] = in_flight
+
+        def release() -> None:
+            if self._tasks.get(scope) is in_flight:
+                del self._tasks[scope]
+            if not in_flight.done():
+                in_flight.set_result(None)
+
+        def complete(summary: str, sources: Dict[str, Any]) -> None:
+            self.store_summary(scope, summary, sources)
+            self.generated += 1
+            in_flight.set_result({"summary": summary, "sources": sources})
+
+        try:
+            chunks = await retrieve_summary_chunks(rag, index_path)
+        except BaseException:
+            release()
+            raise
+
+        async def events() -> AsyncIterator[Dict[str, Any]]:
+            try:
+                async for event in collect_stream(rag.stream_summary(chunks), complete):
+                    yield event
+            finally:
+                release()
+
+        return events()
+
+    def schedule(self, index_path: Optional[str]) -> None:
+        """Starts background summaries for a freshly ingested index"""
+        if not self.config.cache_enabled or index_path is None:
+            return
+        for provider in self.config.precompute_providers:
+            try:
+                rag = RAGPipeline.for_provider(ModelProvider(provider))
+                scope = self.scope(rag, index_path)
+                if scope not in self._tasks and self.store.get(scope) is None:
+                    self._start(rag, index_path, scope, background=True)
+            except Exception as e:
+                logger.warning(f"Could not schedule {provider} summary for {index_path}: {str(e)}")
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.cache_enabled,
+            "hits": self.hits,
+            "waits_on_in_flight": self.waits,
+            "generated": self.generated,
+            "in_flight": len(self._tasks)
+        }
+
+summary_manager = SummaryManager(SummaryStore(SUMMARY_CONFIG.db_path))
@@ -1,27 +1,40 @@
-from typing import List
+from typing import List, Optional
 import fitz
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from fastapi import HTTPException
+from researcher.core.utils.concurrency import run_cpu_bound, run_io_bound
 
 # async def extract_text(file_path: str) -> str:
 #     elements = partition(filename=file_path)
 #     return "\n\n".join([str(el) for el in elements])
 
-async def extract_text(file_path: str) -> str:
-    try:
+def extract_text_sync(file_path: str, content: Optional[bytes] = None) -> str:
+    if content is not None:
+        doc = fitz.open(stream=content, filetype="pdf")  # Parse the bytes already in memory
+    else:
         doc = fitz.open(file_path)  # Open the PDF
-        all_text = ""
-        for page in doc:
-            all_text += page.get_text("text") + "\n"
-        doc.close()
-        return all_text
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error extracting text from PDF: {str(e)}")
+    all_text = ""
+    for page in doc:
+        all_text += page.get_text("text") + "\n"
+    doc.close()
+    return all_text
 
-async def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> List[str]:
+def chunk_text_sync(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> List[str]:
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
         length_function=len,
     )
-    return text_splitter.split_text(text)
\ No newline at end of file
+    return text_splitter.split_text(text)
+
+async def extract_text(file_path: str, content: Optional[bytes] = None) -> str:
+    try:
+        if content is not None:
+            # Bytes already in memory are parsed in a thread rather than pickled to a worker process
+            return await run_io_bound(extract_text_sync, file_path, content)
+        return await run_cpu_bound(extract_text_sync, file_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error extracting text from PDF: {str(e)}")
+
+async def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 50) -> List[str]:
+    return await run_cpu_bound(chunk_text_sync, text, chunk_size, chunk_overlap)
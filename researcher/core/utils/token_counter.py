@@ -0,0 +1,22 @@
+from functools import lru_cache
+from typing import Callable
+import tiktoken
+import logging
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+@lru_cache(maxsize=None)
+def get_token_counter(model_name: str) -> TokenCounter:
+    """Returns a tiktoken-based counter for model_name, falling back to cl100k_base"""
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use; without them approximate at ~4 characters per token
+        logger.warning(f"Could not load a tiktoken encoding for {model_name}, estimating tokens: {str(e)}")
+        return lambda text: len(text) // 4 + 1
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
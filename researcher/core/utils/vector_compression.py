@@ -0,0 +1,70 @@
+from typing import Optional, Sequence, Tuple
+import time
+import faiss
+import numpy as np
+import logging
+from researcher.core.config.vector_store_config import CompressionConfig
+from researcher.core.utils.ann_index import id_selector
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_FILE = "compressed.faiss"
+
+NONE = "none"
+FP16 = "fp16"
+INT8 = "int8"
+SCALAR_QUANTIZERS = {
+    FP16: faiss.ScalarQuantizer.QT_fp16,
+    INT8: faiss.ScalarQuantizer.QT_8bit
+}
+
+def scalar_quantizer(codec: str) -> Optional[int]:
+    """faiss scalar quantizer type for a codec name; None stores float32"""
+    if codec == NONE:
+        return None
+    if codec not in SCALAR_QUANTIZERS:
+        raise ValueError(f"Unknown vector codec: {codec}")
+    return SCALAR_QUANTIZERS[codec]
+
+def build_compressed_index(vectors: np.ndarray, config: CompressionConfig) -> Optional[faiss.Index]:
+    """
+    Encodes L2-normalised vectors for the exact-search scan, optionally after a PCA projection.
+    Returns None when compression is off. Scores from the codes are approximate and are meant
+    to pick candidates for exact re-scoring.
+    """
+    qtype = scalar_quantizer(config.codec)
+    n, dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+    if qtype is None or n == 0:
+        return None
+
+    pca_dim = config.pca_dim if 0 < config.pca_dim < dim else 0
+    if pca_dim and n < pca_dim:
+        logger.info(f"Too few vectors ({n}) to fit {pca_dim} principal components, keeping {dim} dimensions")
+        pca_dim = 0
+
+    started = time.perf_counter()
+    index = faiss.IndexScalarQuantizer(pca_dim or dim, qtype, faiss.METRIC_INNER_PRODUCT)
+    if pca_dim:
+        index = faiss.IndexPreTransform(faiss.PCAMatrix(dim, pca_dim), index)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    index.train(vectors)
+    index.add(vectors)
+    logger.info(
+        f"Encoded {n} vectors as {config.codec}{f' over {pca_dim} components' if pca_dim else ''} "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return index
+
+def search_compressed(
+    index: faiss.Index,
+    queries: np.ndarray,
+    k: int,
+    excluded_ids: Optional[Sequence[int]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Approximate scores over the codes; missing results have id -1"""
+    selector, _wrapped = id_selector(excluded_ids=excluded_ids)
+    scan_params = faiss.SearchParameters(sel=selector)
+    params = scan_params
+    if isinstance(index, faiss.IndexPreTransform):
+        params = faiss.SearchParametersPreTransform(index_params=scan_params)
+    return index.search(np.ascontiguousarray(queries, dtype=np.float32), k, params=params)
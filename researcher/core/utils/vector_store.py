@@ -1,51 +1,329 @@
 import os
-from typing import List, Dict
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+import shutil
+import asyncio
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
+import numpy as np
 import logging
+from researcher.core.config.vector_store_config import VECTOR_STORE_CONFIG
+from researcher.core.utils.lru_cache import LRUCache
+from researcher.core.utils.mmap_index import MMapIndex, UnsupportedIndexFormatError, is_mmap_index, is_legacy_index
+from researcher.core.utils.embedding_cache import CachedEmbeddings, EmbeddingStore
+from researcher.core.utils.embedding_providers import check_embedding_model, create_embeddings
+from researcher.core.utils.concurrency import run_io_bound
+from researcher.core.utils.corpus_index import CorpusIndex, CorpusUpdate, DocumentFilter, DocumentRecord, document_id_for
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-embeddings = OpenAIEmbeddings(
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    model="text-embedding-ada-002"
+# Chosen by EMBEDDING_PROVIDER; indexes record embeddings.model so queries stay in the same space
+embeddings = create_embeddings()
+
+if VECTOR_STORE_CONFIG.embedding_cache.enabled:
+    embeddings = CachedEmbeddings(
+        embeddings,
+        EmbeddingStore(
+            VECTOR_STORE_CONFIG.embedding_cache.path,
+            lookup_batch_size=VECTOR_STORE_CONFIG.embedding_cache.lookup_batch_size
+        ),
+        model_name=embeddings.model,
+        query_cache_max_entries=VECTOR_STORE_CONFIG.embedding_cache.query_cache_max_entries
+    )
+
+INDEX_DIR = VECTOR_STORE_CONFIG.index_dir
+
+# mtime of the cached copy of each index path; load_index runs on pool threads, so guarded by a lock
+_cached_index_mtimes: Dict[str, float] = {}
+_cached_index_mtimes_lock = threading.Lock()
+
+def _forget_evicted_index(key: Tuple[str, float], index: MMapIndex) -> None:
+    path, mtime = key
+    with _cached_index_mtimes_lock:
+        if _cached_index_mtimes.get(path) == mtime:
+            del _cached_index_mtimes[path]
+
+# Process-wide cache of loaded indexes, keyed by index path and validated by mtime
+index_cache = LRUCache(
+    max_entries=VECTOR_STORE_CONFIG.cache.max_entries,
+    max_bytes=VECTOR_STORE_CONFIG.cache.max_bytes,
+    on_evict=_forget_evicted_index
 )
 
-INDEX_DIR = "faiss_indexes"
+# Every LangChain save_local index was embedded with OpenAI's ada-002, whatever the current provider
+LEGACY_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+_corpus_index: Optional[CorpusIndex] = None
+_corpus_maintenance: Optional[asyncio.Task] = None
 
 def ensure_index_dir():
     if not os.path.exists(INDEX_DIR):
         os.makedirs(INDEX_DIR)
 
-def create_index(chunks: List[str], metadata: Dict[str, str]):
+def embed_chunks(chunks: List[str]) -> np.ndarray:
+    return np.array(embeddings.embed_documents(chunks), dtype=np.float32)
+
+def index_path_for(filename: str) -> str:
+    return os.path.join(INDEX_DIR, f"index_{filename.replace('.', '_')}.bin")
+
+def create_index(chunks: List[str], metadata: Dict[str, str], vectors: Optional[np.ndarray] = None):
     ensure_index_dir()
     
-    # Create a new index for the current document
-    new_index = FAISS.from_texts(chunks, embeddings, metadatas=[metadata] * len(chunks))
+    # Embed the chunks for the current document
+    if vectors is None:
+        vectors = embed_chunks(chunks)
     
-    # Generate a unique filename for this document
-    index_filename = f"index_{metadata['filename'].replace('.', '_')}.bin"
-    index_path = os.path.join(INDEX_DIR, index_filename)
+    index_path = index_path_for(metadata['filename'])
     
     # Save the new index
-    new_index.save_local(index_path)
+    MMapIndex.write(
+        index_path,
+        chunks,
+        vectors,
+        metadatas=[metadata] * len(chunks),
+        embedding_model=embeddings.model
+    )
     return index_path
 
-async def store_chunks(chunks: List[str], metadata: Dict[str, str]):
-    index_path = create_index(chunks, metadata)
-    return index_path
+def convert_legacy_index(index_path: str, embedding_model: str = LEGACY_EMBEDDING_MODEL) -> str:
+    """
+    Rewrites a LangChain FAISS save_local directory in the memory-mapped format, in place.
+    Unpickling the legacy docstore is only done here, as an explicit offline step.
+    The vectors are copied as they are, so the index is stamped with the model that produced them.
+    """
+    from langchain_community.vectorstores import FAISS
 
-async def search_similar_chunks(query: str, index_path: str, k: int = 5):
-    if not os.path.exists(index_path):
-        raise FileNotFoundError(f"No index found at {index_path}. Please upload a document first.")
-    
-    index = FAISS.load_local(
+    legacy = FAISS.load_local(
         index_path,
         embeddings,
         allow_dangerous_deserialization=True
     )
-    similar_chunks = index.similarity_search(query, k=k)
+    vectors = legacy.index.reconstruct_n(0, legacy.index.ntotal)
+    documents = [
+        legacy.docstore.search(legacy.index_to_docstore_id[i])
+        for i in range(legacy.index.ntotal)
+    ]
+    MMapIndex.write(
+        index_path,
+        [doc.page_content for doc in documents],
+        vectors,
+        metadatas=[doc.metadata for doc in documents],
+        embedding_model=embedding_model
+    )
+    logger.info(f"Converted legacy index {index_path} ({len(documents)} chunks)")
+    return index_path
+
+async def store_chunks(chunks: List[str], metadata: Dict[str, str]):
+    # Embedding calls and index writes block, so keep them off the event loop
+    vectors = await run_io_bound(embed_chunks, chunks)
+    index_path = await run_io_bound(create_index, chunks, metadata, vectors)
+    return index_path
+
+def _index_files(index_path: str) -> List[str]:
+    if os.path.isdir(index_path):
+        return [os.path.join(index_path, name) for name in os.listdir(index_path)]
+    return [index_path]
+
+def _index_mtime(index_path: str) -> float:
+    """Returns the latest mtime of the files that make up an index"""
+    files = _index_files(index_path)
+    return max((os.path.getmtime(f) for f in files), default=os.path.getmtime(index_path))
+
+def load_index(index_path: str) -> MMapIndex:
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"No index found at {index_path}. Please upload a document first.")
+    if not is_mmap_index(index_path):
+        if is_legacy_index(index_path):
+            raise UnsupportedIndexFormatError(
+                f"Index at {index_path} uses the legacy pickled format. "
+                "Run scripts/convert_faiss_indexes.py to convert it."
+            )
+        raise UnsupportedIndexFormatError(f"Unrecognised index format at {index_path}. Please upload the document again.")
+
+    path = os.path.abspath(index_path)
+    mtime = _index_mtime(index_path)
+    cached = index_cache.get((path, mtime))
+    if cached is not None:
+        return cached
+
+    # Drop the stale entry if the index was rewritten since it was cached
+    with _cached_index_mtimes_lock:
+        previous_mtime = _cached_index_mtimes.pop(path, None)
+    if previous_mtime is not None:
+        index_cache.pop((path, previous_mtime))
+
+    logger.info(f"Loading index from disk: {index_path}")
+    index = MMapIndex(index_path)
+    # Sized by what searches keep resident, so compressed indexes let more of them fit the budget
+    # put() may evict other entries, whose callbacks take the lock, so it is called without holding it
+    index_cache.put((path, mtime), index, nbytes=index.memory_bytes())
+    with _cached_index_mtimes_lock:
+        _cached_index_mtimes[path] = mtime
+    return index
+
+def get_index_cache_stats() -> Dict[str, Any]:
+    return index_cache.stats()
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.stats()
+    return {"enabled": False}
+
+def get_index_content_hash(index_path: str) -> str:
+    return load_index(index_path).content_hash
+
+def require_query_model(index: MMapIndex) -> MMapIndex:
+    """Refuses to search an index built with a different embedding model than the current one"""
+    check_embedding_model(index.embedding_model, embeddings.model, index.index_path)
+    return index
+
+def embed_query(query: str) -> List[float]:
+    return embeddings.embed_query(query)
+
+def embed_queries(queries: List[str]) -> np.ndarray:
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_queries(queries)
+    # Both providers embed queries and documents identically, so one documents request covers them all
+    return np.array(embeddings.embed_documents(queries), dtype=np.float32)
+
+async def search_similar_chunks(
+    query: str,
+    index_path: str,
+    k: int = 5,
+    query_vector: Optional[List[float]] = None
+):
+    index = require_query_model(load_index(index_path))
+    if query_vector is None:
+        query_vector = embed_query(query)
+    similar_chunks = index.similarity_search_by_vector(query_vector, k=k)
     return similar_chunks
+
+def get_corpus_index() -> CorpusIndex:
+    """The corpus-wide index, opened on first use; shards are loaded through the index cache"""
+    global _corpus_index
+    if _corpus_index is None:
+        _corpus_index = CorpusIndex(
+            VECTOR_STORE_CONFIG.corpus.index_dir,
+            VECTOR_STORE_CONFIG.corpus,
+            load_shard=load_index,
+            embedding_model=embeddings.model
+        )
+    return _corpus_index
+
+def add_to_corpus(
+    filename: str,
+    chunks: List[str],
+    vectors: np.ndarray,
+    source: Optional[str] = None
+) -> Optional[CorpusUpdate]:
+    if not VECTOR_STORE_CONFIG.corpus.enabled:
+        return None
+    return get_corpus_index().add_document(document_id_for(filename), filename, chunks, vectors, source=source)
+
+def delete_document(document_id: str) -> Optional[DocumentRecord]:
+    """Removes a document from the corpus and deletes its per-document index"""
+    corpus = get_corpus_index()
+    record = corpus.registry.get(document_id)
+    if record is None or not corpus.delete_document(document_id):
+        return None
+    shutil.rmtree(index_path_for(record.filename), ignore_errors=True)
+    return record
+
+def schedule_corpus_maintenance() -> None:
+    """Compacts the corpus in the background after writes; at most one run at a time"""
+    global _corpus_maintenance
+    if not VECTOR_STORE_CONFIG.corpus.enabled:
+        return
+    if _corpus_maintenance is not None and not _corpus_maintenance.done():
+        return
+    _corpus_maintenance = asyncio.create_task(run_io_bound(get_corpus_index().maintain))
+
+    def finished(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Corpus maintenance failed: {str(task.exception())}")
+
+    _corpus_maintenance.add_done_callback(finished)
+
+async def stop_corpus_maintenance() -> None:
+    # Compaction runs in a worker thread and cannot be interrupted, so let it finish
+    if _corpus_maintenance is not None:
+        await asyncio.gather(_corpus_maintenance, return_exceptions=True)
+
+async def search_corpus(
+    query: str,
+    k: int = 5,
+    document_filter: Optional[DocumentFilter] = None,
+    query_vector: Optional[List[float]] = None
+):
+    if query_vector is None:
+        query_vector = embed_query(query)
+    return await get_corpus_index().search(query_vector, k=k, document_filter=document_filter)
+
+def mmr_select(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+    duplicate_threshold: float = 0.95
+) -> List[int]:
+    """
+    Greedy maximal marginal relevance over L2-normalized candidate vectors. Candidates whose
+    similarity to an already selected one reaches duplicate_threshold are dropped outright.
+    Returns positions into the candidate arrays in selection order.
+    """
+    n = len(relevance)
+    if n == 0 or k <= 0:
+        return []
+    relevance = np.asarray(relevance, dtype=np.float32)
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    while len(selected) < k and available.any():
+        redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        marginal = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, vectors @ vectors[best])
+        available &= max_similarity < duplicate_threshold
+    return selected
+
+async def search_similar_chunks_batch(
+    queries: List[str],
+    index_path: str,
+    k: int = 8,
+    max_chunks: Optional[int] = None,
+    lambda_mult: float = 0.7,
+    duplicate_threshold: float = 0.95
+):
+    """
+    Retrieves a diverse chunk set for several queries at once: one embedding request,
+    one matrix search over the index, then MMR with near-duplicate suppression.
+    """
+    if not queries:
+        return []
+    index = require_query_model(load_index(index_path))
+    hits_per_query = index.search_batch(embed_queries(queries), k=k)
+
+    # A chunk retrieved by several queries keeps its best score
+    best_scores: Dict[int, float] = {}
+    for hits in hits_per_query:
+        for chunk_id, score in hits:
+            best_scores[chunk_id] = max(score, best_scores.get(chunk_id, -1.0))
+    if not best_scores:
+        return []
+
+    candidate_ids = list(best_scores)
+    relevance = np.array([best_scores[chunk_id] for chunk_id in candidate_ids], dtype=np.float32)
+    selected = mmr_select(
+        index.get_vectors(candidate_ids),
+        relevance,
+        k=max_chunks or len(candidate_ids),
+        lambda_mult=lambda_mult,
+        duplicate_threshold=duplicate_threshold
+    )
+    logger.info(f"Selected {len(selected)} of {len(candidate_ids)} candidate chunks for {len(queries)} queries")
+    return index.get_documents([(candidate_ids[i], best_scores[candidate_ids[i]]) for i in selected])
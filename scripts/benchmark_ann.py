@@ -0,0 +1,82 @@
+import logging
+import argparse
+import tempfile
+import time
+import os
+import numpy as np
+from researcher.core.config.vector_store_config import VECTOR_STORE_CONFIG
+from researcher.core.utils.ann_index import INDEX_TYPES
+from researcher.core.utils.mmap_index import MMapIndex, normalize_vectors
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def synthetic_vectors(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered vectors, closer to real embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(clusters, size=n)] + 0.5 * rng.normal(size=(n, dim))
+    return normalize_vectors(vectors)
+
+def recall_at_k(results, ground_truth, k: int) -> float:
+    hits = sum(len({i for i, _ in found[:k]} & {i for i, _ in truth[:k]}) for found, truth in zip(results, ground_truth))
+    return hits / (k * len(ground_truth))
+
+def timed_searches(index: MMapIndex, queries: np.ndarray, k: int):
+    results, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(index.search(query, k))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return results, np.array(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare ANN index types against exact search: recall@k, latency and build time')
+    parser.add_argument('--index-path', help='Benchmark the vectors of an existing index instead of synthetic ones')
+    parser.add_argument('--vectors', type=int, default=50000, help='Number of synthetic vectors')
+    parser.add_argument('--dim', type=int, default=256, help='Dimension of synthetic vectors')
+    parser.add_argument('--clusters', type=int, default=200, help='Number of clusters in the synthetic data')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('-k', type=int, default=10, help='Number of neighbours per query')
+    parser.add_argument('--types', nargs='+', default=list(INDEX_TYPES), choices=INDEX_TYPES, help='Index types to benchmark')
+    parser.add_argument('--nprobe', type=int, default=VECTOR_STORE_CONFIG.ann.nprobe, help='IVF lists probed per query')
+    parser.add_argument('--ef-search', type=int, default=VECTOR_STORE_CONFIG.ann.ef_search, help='HNSW candidate list size')
+    args = parser.parse_args()
+
+    if args.index_path:
+        vectors = np.asarray(MMapIndex(args.index_path).vectors)
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dim, args.clusters, seed=0)
+    # Queries are perturbed corpus vectors so each has real near neighbours
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(len(vectors), size=args.queries)] + 0.1 * rng.normal(size=(args.queries, vectors.shape[1]))
+    texts = [""] * len(vectors)
+
+    print(f"{len(vectors)} vectors, dim {vectors.shape[1]}, {args.queries} queries, k={args.k}")
+    print(f"{'type':<8}{'build s':>10}{'p50 ms':>10}{'p95 ms':>10}{f'recall@{args.k}':>12}{'size MB':>10}")
+
+    ground_truth = None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for index_type in [t for t in INDEX_TYPES if t == "flat" or t in args.types]:
+            config = VECTOR_STORE_CONFIG.ann.model_copy(update={
+                "index_type": index_type, "nprobe": args.nprobe, "ef_search": args.ef_search
+            })
+            index_path = os.path.join(tmp_dir, index_type)
+            started = time.perf_counter()
+            index = MMapIndex.write(index_path, texts, vectors, ann_config=config)
+            build_seconds = time.perf_counter() - started
+            if index.index_type != index_type:
+                logger.warning(f"Skipping {index_type}: too few vectors to train it")
+                continue
+
+            results, latencies = timed_searches(index, queries, args.k)
+            if ground_truth is None:
+                ground_truth = results
+            print(
+                f"{index_type:<8}{build_seconds:>10.2f}{np.percentile(latencies, 50):>10.2f}"
+                f"{np.percentile(latencies, 95):>10.2f}{recall_at_k(results, ground_truth, args.k):>12.3f}"
+                f"{index.nbytes() / 1024 / 1024:>10.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
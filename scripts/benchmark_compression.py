@@ -0,0 +1,68 @@
+import logging
+import argparse
+import tempfile
+import os
+import numpy as np
+from benchmark_ann import recall_at_k, timed_searches
+from researcher.core.config.vector_store_config import AnnConfig, CompressionConfig
+from researcher.core.utils.mmap_index import MMapIndex, normalize_vectors
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def low_rank_vectors(n: int, dim: int, rank: int, seed: int) -> np.ndarray:
+    """Vectors near a rank-dimensional subspace, like real embeddings"""
+    rng = np.random.default_rng(seed)
+    basis = rng.normal(size=(rank, dim))
+    return normalize_vectors(rng.normal(size=(n, rank)) @ basis + 0.1 * rng.normal(size=(n, dim)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare compressed vector codecs against float32 exact search: memory, latency and recall@k')
+    parser.add_argument('--index-path', help='Benchmark the vectors of an existing index instead of synthetic ones')
+    parser.add_argument('--vectors', type=int, default=50000, help='Number of synthetic vectors')
+    parser.add_argument('--dim', type=int, default=1536, help='Dimension of synthetic vectors')
+    parser.add_argument('--rank', type=int, default=128, help='Intrinsic dimension of the synthetic vectors')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('-k', type=int, default=10, help='Number of neighbours per query')
+    parser.add_argument('--pca-dim', type=int, default=256, help='Components kept by the PCA variants')
+    parser.add_argument('--rescore-factor', type=int, default=4, help='Candidates re-scored exactly per result')
+    args = parser.parse_args()
+
+    if args.index_path:
+        vectors = np.asarray(MMapIndex(args.index_path).vectors)
+    else:
+        vectors = low_rank_vectors(args.vectors, args.dim, args.rank, seed=0)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(len(vectors), size=args.queries)] + 0.05 * rng.normal(size=(args.queries, vectors.shape[1]))
+    texts = [""] * len(vectors)
+
+    variants = [
+        ("float32", CompressionConfig(codec="none")),
+        ("fp16", CompressionConfig(codec="fp16", rescore_factor=args.rescore_factor)),
+        ("int8", CompressionConfig(codec="int8", rescore_factor=args.rescore_factor)),
+        (f"fp16+pca{args.pca_dim}", CompressionConfig(codec="fp16", pca_dim=args.pca_dim, rescore_factor=args.rescore_factor)),
+        (f"int8+pca{args.pca_dim}", CompressionConfig(codec="int8", pca_dim=args.pca_dim, rescore_factor=args.rescore_factor))
+    ]
+    # Exact scans only, so the codecs are compared on equal terms
+    ann_config = AnnConfig(index_type="flat")
+
+    print(f"{len(vectors)} vectors, dim {vectors.shape[1]}, {args.queries} queries, k={args.k}")
+    print(f"{'codec':<14}{'memory MB':>11}{'ratio':>8}{'p50 ms':>10}{'p95 ms':>10}{f'recall@{args.k}':>12}")
+
+    ground_truth, baseline_bytes = None, None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, compression in variants:
+            index = MMapIndex.write(
+                os.path.join(tmp_dir, name), texts, vectors, ann_config=ann_config, compression_config=compression
+            )
+            results, latencies = timed_searches(index, queries, args.k)
+            if ground_truth is None:
+                ground_truth, baseline_bytes = results, index.memory_bytes()
+            print(
+                f"{name:<14}{index.memory_bytes() / 1024 / 1024:>11.1f}{baseline_bytes / index.memory_bytes():>8.1f}"
+                f"{np.percentile(latencies, 50):>10.2f}{np.percentile(latencies, 95):>10.2f}"
+                f"{recall_at_k(results, ground_truth, args.k):>12.3f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import logging
+import argparse
+import os
+from researcher.core.utils.mmap_index import is_legacy_index
+from researcher.core.utils.vector_store import INDEX_DIR, LEGACY_EMBEDDING_MODEL, convert_legacy_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert legacy FAISS/pickle indexes to the memory-mapped index format')
+    parser.add_argument('--index-dir', default=INDEX_DIR, help='Directory containing the indexes to convert')
+    parser.add_argument('--embedding-model', default=LEGACY_EMBEDDING_MODEL,
+                        help='Model that embedded the legacy indexes, recorded in the converted manifests')
+    args = parser.parse_args()
+
+    converted = 0
+    for name in sorted(os.listdir(args.index_dir)):
+        index_path = os.path.join(args.index_dir, name)
+        if not is_legacy_index(index_path):
+            continue
+        try:
+            convert_legacy_index(index_path, args.embedding_model)
+            converted += 1
+        except Exception as e:
+            logger.error(f"Failed to convert {index_path}: {str(e)}")
+
+    logger.info(f"Converted {converted} legacy indexes in {args.index_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from researcher.core.config.answer_cache_config import AnswerCacheConfig
+from researcher.core.utils.answer_cache import AnswerCache
+
+SCOPE = ("index-hash", "openai", "gpt-3.5-turbo")
+SOURCES = {"documents": [], "web": []}
+
+def make_cache(**overrides) -> AnswerCache:
+    return AnswerCache(AnswerCacheConfig(similarity_threshold=0.9, **overrides))
+
+def test_exact_then_semantic_lookup():
+    cache = make_cache()
+    cache.store(SCOPE, "What are the main findings?", [1.0, 0.0], "findings", SOURCES)
+
+    assert cache.lookup(SCOPE, "what are the  main findings?", [0.0, 1.0]).answer == "findings"
+    assert cache.lookup(SCOPE, "Summarize the key results", [0.95, 0.05]).answer == "findings"
+    assert cache.lookup(SCOPE, "Who are the authors?", [0.2, 0.98]) is None
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["semantic_hits"], stats["misses"]) == (1, 1, 1)
+
+def test_new_index_hash_does_not_see_old_answers():
+    cache = make_cache()
+    cache.store(SCOPE, "What are the main findings?", [1.0, 0.0], "findings", SOURCES)
+
+    assert cache.lookup(("new-hash",) + SCOPE[1:], "What are the main findings?", [1.0, 0.0]) is None
+
+def test_web_answers_are_not_cached_by_default():
+    cache = make_cache()
+    cache.store(SCOPE, "latest news", [1.0, 0.0], "news", {"documents": [], "web": [{"url": "u"}]})
+
+    assert cache.lookup(SCOPE, "latest news", [1.0, 0.0]) is None
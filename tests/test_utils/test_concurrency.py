@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import fitz
+from researcher.core.utils.concurrency import (
+    ConcurrencyLimiter,
+    TokenBucket,
+    get_cpu_pool,
+    get_io_pool,
+    get_query_pool,
+    run_io_bound,
+    run_query_bound,
+    shutdown_pools
+)
+from researcher.core.utils.text_processing import chunk_text, extract_text
+
+def test_limits_in_flight_requests_and_records_queue_time():
+    limiter = ConcurrencyLimiter(max_concurrent=2, name="test")
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter.acquire():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.02)
+
+    async def run():
+        await asyncio.gather(*[request() for _ in range(5)])
+
+    asyncio.run(run())
+    stats = limiter.stats()
+
+    assert peak == 2
+    assert stats["completed"] == 5
+    assert stats["in_flight"] == 0
+    assert stats["max_queue_time"] >= 0.02
+
+def test_token_bucket_allows_burst_then_refuses():
+    bucket = TokenBucket(rate_per_minute=0, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+def test_text_processing_round_trips_through_the_pools(tmp_path):
+    pdf_path = str(tmp_path / "paper.pdf")
+    pdf = fitz.open()
+    pdf.new_page().insert_text((72, 72), "Attention is all you need")
+    pdf.save(pdf_path)
+    pdf.close()
+
+    async def run():
+        text = await extract_text(pdf_path)
+        with open(pdf_path, "rb") as f:
+            in_memory_text = await extract_text(pdf_path, f.read())
+        chunks = await chunk_text("word " * 300, chunk_size=100, chunk_overlap=10)
+        worker = await run_io_bound(lambda: threading.current_thread().name)
+        query_worker = await run_query_bound(lambda: threading.current_thread().name)
+        return text, in_memory_text, chunks, worker, query_worker
+
+    try:
+        text, in_memory_text, chunks, worker, query_worker = asyncio.run(run())
+    finally:
+        shutdown_pools()
+
+    assert "Attention is all you need" in text
+    assert in_memory_text == text
+    assert len(chunks) > 1 and all(len(chunk) <= 100 for chunk in chunks)
+    assert worker.startswith("ingest-io")
+    assert query_worker.startswith("query")
+
+def test_pools_are_recreated_after_shutdown():
+    cpu_pool, io_pool, query_pool = get_cpu_pool(), get_io_pool(), get_query_pool()
+    shutdown_pools()
+
+    try:
+        assert get_cpu_pool() is not cpu_pool
+        assert get_io_pool() is not io_pool
+        assert get_query_pool() is not query_pool
+        assert asyncio.run(run_io_bound(sum, [1, 2, 3])) == 6
+    finally:
+        shutdown_pools()
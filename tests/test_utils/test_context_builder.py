@@ -0,0 +1,58 @@
+from langchain.docstore.document import Document
+from researcher.core.config.context_config import ContextConfig
+from researcher.core.utils.context_builder import ContextBuilder, overlap_length
+from researcher.core.utils.search_utils import SearchResult
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+def chunk(chunk_id: int, text: str, score: float) -> Document:
+    return Document(page_content=text, metadata={"chunk_id": chunk_id, "score": score})
+
+def test_overlap_length_finds_shared_boundary():
+    assert overlap_length("the model uses attention", "uses attention layers", 50) == len("uses attention")
+    assert overlap_length("abc", "xyz", 50) == 0
+
+def test_overlap_length_ignores_coincidental_matches():
+    assert overlap_length("results support the", "theory that attention helps", 50, min_chars=10) == 0
+    assert overlap_length("an accuracy of 92.5", "5 datasets were used", 50, min_chars=10) == 0
+    assert overlap_length("results support the", "the theory", 50, min_chars=1) == len("the")
+    assert overlap_length("we train the model", "model weights", 50, min_chars=1) == len("model")
+
+def test_document_context_keeps_text_after_coincidental_matches():
+    builder = ContextBuilder(count_words, ContextConfig(document_max_tokens=100))
+    chunks = [chunk(1, "results support the", 0.9), chunk(2, "theory that attention helps", 0.8)]
+
+    assert builder.build_document_context(chunks).text == "results support the theory that attention helps"
+
+def test_document_context_keeps_best_chunks_in_order_without_overlap():
+    builder = ContextBuilder(count_words, ContextConfig(document_max_tokens=8, min_partial_tokens=100))
+    chunks = [
+        chunk(1, "the model uses attention", 0.9),
+        chunk(2, "uses attention layers everywhere", 0.8),
+        chunk(7, "unrelated appendix text here", 0.1)
+    ]
+
+    document = builder.build_document_context(chunks)
+
+    assert document.text == "the model uses attention layers everywhere"
+    assert [c.metadata["chunk_id"] for c in document.items] == [1, 2]
+    assert document.tokens <= 8
+
+def test_web_context_has_its_own_budget():
+    builder = ContextBuilder(count_words, ContextConfig(web_max_tokens=6, min_partial_tokens=100))
+    results = [SearchResult("A", "https://a", "one two"), SearchResult("B", "https://b", "three four five six")]
+
+    web = builder.build_web_context(results)
+
+    assert [result.title for result in web.items] == ["A"]
+    assert web.tokens == 4
+
+def test_chunks_from_different_documents_are_not_joined():
+    builder = ContextBuilder(count_words, ContextConfig(document_max_tokens=100))
+    first = Document(page_content="the model uses attention", metadata={"document_id": "a", "chunk_id": 1, "score": 0.9})
+    second = Document(page_content="uses attention layers", metadata={"document_id": "b", "chunk_id": 2, "score": 0.8})
+
+    document = builder.build_document_context([second, first])
+
+    assert document.text == "the model uses attention uses attention layers"
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import threading
+import numpy as np
+import pytest
+from researcher.core.config.vector_store_config import CorpusConfig
+from researcher.core.utils.concurrency import shutdown_pools
+from researcher.core.utils.corpus_index import CorpusIndex, DocumentFilter, document_id_for
+from researcher.core.utils.mmap_index import MMapIndex
+
+@pytest.fixture
+def corpus(tmp_path):
+    config = CorpusConfig(shard_max_chunks=4, compaction_max_small_shards=8, retired_shard_grace_seconds=0)
+    corpus = CorpusIndex(str(tmp_path / "corpus"), config)
+    yield corpus
+    corpus.registry.close()
+
+def add(corpus, document_id, axis, count=2, source="upload", texts=None):
+    texts = texts or [f"{document_id} chunk {i}" for i in range(count)]
+    vectors = np.zeros((len(texts), 3), dtype=np.float32)
+    vectors[:, axis] = 1.0
+    return corpus.add_document(document_id, f"{document_id}.pdf", texts, vectors, source=source)
+
+def search(corpus, query, **kwargs):
+    return asyncio.run(corpus.search(query, k=kwargs.pop("k", 5), **kwargs))
+
+def test_each_write_appends_a_shard_and_search_merges_top_k(corpus):
+    add(corpus, "a", axis=0)
+    add(corpus, "b", axis=1)
+    add(corpus, "c", axis=2)
+
+    assert corpus.shard_ids() == [0, 1, 2]
+    documents = search(corpus, [0.0, 0.2, 1.0], k=3)
+    assert [doc.metadata["document_id"] for doc in documents] == ["c", "c", "b"]
+
+def test_filters_restrict_search_to_matching_documents(corpus):
+    add(corpus, "a", axis=0)
+    add(corpus, "b", axis=1, source="https://arxiv.org/abs/1234")
+
+    by_id = search(corpus, [1.0, 0.0, 0.0], document_filter=DocumentFilter(document_ids=["b"]))
+    by_source = search(corpus, [1.0, 0.0, 0.0], document_filter=DocumentFilter(sources=["upload"]))
+
+    assert {doc.metadata["document_id"] for doc in by_id} == {"b"}
+    assert {doc.metadata["document_id"] for doc in by_source} == {"a"}
+
+def test_re_adding_a_document_only_writes_changed_chunks(corpus):
+    add(corpus, "a", axis=0, texts=["intro", "method", "results"])
+    before = corpus.version()
+    update = add(corpus, "a", axis=0, texts=["intro", "method", "new results"])
+
+    assert (update.added, update.removed, update.unchanged) == (1, 1, 2)
+    assert corpus.version() != before
+    texts = {doc.page_content for doc in search(corpus, [1.0, 0.0, 0.0])}
+    assert texts == {"intro", "method", "new results"}
+    assert corpus.registry.get("a").num_chunks == 3
+
+def test_deleted_documents_are_hidden_until_compaction_drops_them(corpus):
+    add(corpus, "a", axis=0)
+    add(corpus, "b", axis=1)
+    assert corpus.delete_document("a")
+    assert not corpus.delete_document("a")
+
+    assert {doc.metadata["document_id"] for doc in search(corpus, [1.0, 0.0, 0.0])} == {"b"}
+    assert corpus.needs_compaction()
+
+    assert corpus.compact()["dropped_chunks"] == 2
+    assert corpus.stats()["deleted_chunks"] == 0
+    assert corpus.purge_retired() == 1
+    assert not os.path.exists(corpus.shard_path(0))
+    assert {doc.metadata["document_id"] for doc in search(corpus, [1.0, 0.0, 0.0])} == {"b"}
+
+def test_small_shards_are_merged_once_there_are_too_many(tmp_path):
+    corpus = CorpusIndex(str(tmp_path / "corpus"), CorpusConfig(shard_max_chunks=16, compaction_max_small_shards=2))
+    for document_id, axis in [("a", 0), ("b", 1), ("c", 2)]:
+        add(corpus, document_id, axis=axis, count=1)
+
+    assert corpus.compact() == {"compacted_shards": 3, "written_shards": 1, "dropped_chunks": 0}
+    assert len(search(corpus, [1.0, 1.0, 1.0], k=10)) == 3
+    assert not corpus.needs_compaction()
+    corpus.registry.close()
+
+def test_merged_shards_are_not_rewritten_by_later_compactions(tmp_path):
+    config = CorpusConfig(shard_max_chunks=1000, compaction_max_small_shards=8, retired_shard_grace_seconds=0)
+    corpus = CorpusIndex(str(tmp_path / "corpus"), config)
+    rewritten = 0
+    for i in range(60):
+        add(corpus, f"doc{i}", axis=i % 3, count=10)
+        rewritten += sum(shard.live for shard in corpus._compaction_plan())
+        corpus.compact()
+
+    assert rewritten <= 2 * 600
+    assert sum(shard.live for shard in corpus.registry.shards()) == 600
+    corpus.registry.close()
+
+def test_arxiv_versions_share_a_document_id():
+    assert document_id_for("2301.01234v1.pdf") == document_id_for("2301.01234v3.pdf")
+    assert document_id_for("2301.01234v1.pdf").startswith("2301_01234_pdf-")
+    assert document_id_for("notes v2.pdf") != document_id_for("notes v3.pdf")
+
+def test_sanitized_names_do_not_collide():
+    ids = {document_id_for(name) for name in ["a b.pdf", "a_b.pdf", "a.b.pdf"]}
+    assert len(ids) == 3
+
+def test_shards_from_another_embedding_model_are_skipped(tmp_path):
+    old = CorpusIndex(str(tmp_path / "corpus"), CorpusConfig(), embedding_model="old-model")
+    add(old, "a", axis=0)
+    old.registry.close()
+
+    corpus = CorpusIndex(str(tmp_path / "corpus"), CorpusConfig(), embedding_model="new-model")
+    add(corpus, "b", axis=0)
+
+    assert {doc.metadata["document_id"] for doc in search(corpus, [1.0, 0.0, 0.0])} == {"b"}
+    corpus.registry.close()
+
+def test_chunk_ids_are_positions_within_the_document(corpus):
+    add(corpus, "a", axis=0, texts=["intro", "method", "results"])
+    add(corpus, "a", axis=0, texts=["abstract", "intro", "method"])
+    assert corpus.compact()["dropped_chunks"] == 1
+
+    documents = search(corpus, [1.0, 0.0, 0.0])
+    assert {doc.page_content: doc.metadata["chunk_id"] for doc in documents} == {"abstract": 0, "intro": 1, "method": 2}
+
+def test_shards_retired_during_a_search_keep_their_deletions(tmp_path):
+    compacting = []
+
+    def load_shard(path):
+        # Compaction lands after search() has listed its shards but before they are scanned
+        if corpus.registry.tombstones() and not compacting:
+            compacting.append(True)
+            corpus.compact()
+        return MMapIndex(path)
+
+    corpus = CorpusIndex(str(tmp_path / "corpus"), CorpusConfig(), load_shard=load_shard)
+    add(corpus, "a", axis=0, texts=["old intro", "old method"])
+    add(corpus, "b", axis=1)
+    corpus.delete_document("a")
+
+    documents = search(corpus, [1.0, 0.0, 0.0])
+
+    assert compacting
+    assert {doc.metadata["document_id"] for doc in documents} == {"b"}
+    corpus.registry.close()
+
+def test_shard_searches_run_on_the_query_pool(tmp_path):
+    workers = []
+
+    def load_shard(path):
+        workers.append(threading.current_thread().name)
+        return MMapIndex(path)
+
+    corpus = CorpusIndex(str(tmp_path / "corpus"), CorpusConfig(), load_shard=load_shard)
+    add(corpus, "a", axis=0)
+    add(corpus, "b", axis=1)
+    workers.clear()
+
+    try:
+        search(corpus, [1.0, 0.0, 0.0])
+    finally:
+        shutdown_pools()
+        corpus.registry.close()
+
+    # Hits are read back on the calling thread once the shard searches have finished
+    searched = [worker for worker in workers if worker != threading.current_thread().name]
+    assert len(searched) == 2 and all(worker.startswith("query") for worker in searched)
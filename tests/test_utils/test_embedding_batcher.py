@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import numpy as np
+from researcher.core.utils.concurrency import shutdown_pools
+from researcher.core.utils.embedding_batcher import EmbeddingBatcher, ThreadedEmbeddingBatcher
+
+def test_concurrent_calls_share_one_backend_request():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    async def run():
+        batcher = EmbeddingBatcher(embed, max_batch_size=100, max_wait_ms=20)
+        return await asyncio.gather(
+            batcher.embed(["a", "bb"]),
+            batcher.embed(["ccc"]),
+            batcher.embed([])
+        )
+
+    first, second, third = asyncio.run(run())
+
+    assert calls == [["a", "bb", "ccc"]]
+    assert first.ravel().tolist() == [1.0, 2.0]
+    assert second.ravel().tolist() == [3.0]
+    assert len(third) == 0
+
+def test_splits_large_batches_by_max_batch_size():
+    calls = []
+
+    def embed(texts):
+        calls.append(len(texts))
+        return np.zeros((len(texts), 2), dtype=np.float32)
+
+    async def run():
+        batcher = EmbeddingBatcher(embed, max_batch_size=2, max_wait_ms=1000)
+        return await batcher.embed(["a", "b", "c", "d", "e"])
+
+    vectors = asyncio.run(run())
+
+    assert sorted(calls) == [1, 2, 2]
+    assert vectors.shape == (5, 2)
+
+def test_threaded_batcher_encodes_concurrent_callers_together():
+    calls = []
+    started = threading.Barrier(3)
+
+    def embed(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    batcher = ThreadedEmbeddingBatcher(embed, max_batch_size=3, max_wait_ms=1000)
+
+    def query(text):
+        started.wait()
+        return batcher.embed([text])
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(query, ["a", "bb", "ccc"]))
+
+    assert len(calls) == 1 and sorted(calls[0]) == ["a", "bb", "ccc"]
+    assert [result.ravel().tolist() for result in results] == [[1.0], [2.0], [3.0]]
+
+def test_running_flushes_are_referenced_until_they_finish():
+    release = threading.Event()
+
+    def embed(texts):
+        release.wait()
+        return np.zeros((len(texts), 1), dtype=np.float32)
+
+    async def run():
+        batcher = EmbeddingBatcher(embed, max_batch_size=100, max_wait_ms=0)
+        pending = asyncio.ensure_future(batcher.embed(["a"]))
+        await asyncio.sleep(0.05)
+        in_flight = len(batcher._tasks)
+        release.set()
+        await pending
+        await asyncio.sleep(0)
+        return in_flight, len(batcher._tasks)
+
+    try:
+        in_flight, remaining = asyncio.run(run())
+    finally:
+        shutdown_pools()
+
+    assert (in_flight, remaining) == (1, 0)
@@ -0,0 +1,70 @@
+from typing import List
+import pytest
+from langchain_core.embeddings import Embeddings
+from researcher.core.utils.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "embeddings.sqlite"), lookup_batch_size=2)
+    yield store
+    store.close()
+
+def test_only_misses_reach_backend(store):
+    backend = CountingEmbeddings()
+    cached = CachedEmbeddings(backend, store, model_name="test-model")
+
+    first = cached.embed_documents(["a", "bb", "a"])
+    second = cached.embed_documents(["bb", "ccc", "a"])
+
+    assert backend.calls == [["a", "bb"], ["ccc"]]
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert cached.stats()["hits"] == 3
+
+def test_cache_is_keyed_by_model_name(store):
+    backend = CountingEmbeddings()
+    CachedEmbeddings(backend, store, model_name="model-a").embed_documents(["text"])
+    CachedEmbeddings(backend, store, model_name="model-b").embed_documents(["text"])
+
+    assert backend.calls == [["text"], ["text"]]
+
+def test_query_cache_normalizes_whitespace_and_case(store):
+    backend = CountingEmbeddings()
+    cached = CachedEmbeddings(backend, store, model_name="test-model")
+
+    first = cached.embed_query("What are the  main findings?")
+    second = cached.embed_query("what are the main\nfindings?")
+
+    assert first == second
+    assert len(backend.calls) == 1
+
+def test_query_cache_survives_restart_via_disk_tier(store):
+    backend = CountingEmbeddings()
+    CachedEmbeddings(backend, store, model_name="test-model").embed_query("methodology")
+    restarted = CachedEmbeddings(backend, store, model_name="test-model")
+    restarted.embed_query("Methodology")
+
+    assert len(backend.calls) == 1
+    assert restarted.stats()["query_cache"]["disk_hits"] == 1
+
+def test_embed_queries_sends_all_misses_in_one_request(store):
+    backend = CountingEmbeddings()
+    cached = CachedEmbeddings(backend, store, model_name="test-model")
+    cached.embed_query("methods")
+
+    vectors = cached.embed_queries(["Methods", "results", "limitations", "results"])
+
+    assert backend.calls == [["methods"], ["results", "limitations"]]
+    assert vectors.shape == (4, 2)
+    assert vectors[1].tolist() == vectors[3].tolist()
@@ -0,0 +1,19 @@
+import pytest
+from researcher.core.config.model_config import EmbeddingConfig, EmbeddingProvider
+from researcher.core.utils.embedding_providers import (
+    EmbeddingModelMismatchError, LocalEmbeddings, check_embedding_model, create_embeddings
+)
+
+def test_local_provider_names_its_model_without_loading_it():
+    embeddings = create_embeddings(EmbeddingConfig(provider=EmbeddingProvider.LOCAL, local_model="all-MiniLM-L6-v2"))
+
+    assert isinstance(embeddings, LocalEmbeddings)
+    assert embeddings.model == "all-MiniLM-L6-v2"
+    assert embeddings._encoder is None
+
+def test_queries_must_use_the_model_that_built_the_index():
+    check_embedding_model("text-embedding-ada-002", "text-embedding-ada-002", "index")
+    check_embedding_model(None, "all-MiniLM-L6-v2", "legacy-index")
+
+    with pytest.raises(EmbeddingModelMismatchError):
+        check_embedding_model("text-embedding-ada-002", "all-MiniLM-L6-v2", "index")
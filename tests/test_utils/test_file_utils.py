@@ -0,0 +1,32 @@
+import asyncio
+import hashlib
+import os
+import pytest
+from researcher.core.utils.file_utils import FileTooLargeError, stream_to_file
+
+async def byte_stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+def test_streams_to_disk_and_hashes_content(tmp_path):
+    file_path = str(tmp_path / "paper.pdf")
+    saved = asyncio.run(stream_to_file(byte_stream(b"abc", b"def"), file_path, keep_in_memory_below=4))
+
+    with open(file_path, "rb") as f:
+        assert f.read() == b"abcdef"
+    assert saved.size == 6
+    assert saved.sha256 == hashlib.sha256(b"abcdef").hexdigest()
+    # Larger than keep_in_memory_below, so the bytes are not retained
+    assert saved.content is None
+
+def test_keeps_small_files_in_memory(tmp_path):
+    saved = asyncio.run(stream_to_file(byte_stream(b"abc"), str(tmp_path / "small.pdf"), keep_in_memory_below=1024))
+
+    assert saved.content == b"abc"
+
+def test_rejects_oversized_stream_without_leaving_partial_file(tmp_path):
+    file_path = str(tmp_path / "large.pdf")
+    with pytest.raises(FileTooLargeError):
+        asyncio.run(stream_to_file(byte_stream(b"a" * 10, b"b" * 10), file_path, max_bytes=15))
+
+    assert os.listdir(tmp_path) == []
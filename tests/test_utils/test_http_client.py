@@ -0,0 +1,77 @@
+import asyncio
+from aiohttp import web
+from researcher.core.config.http_config import HTTPClientConfig
+from researcher.core.utils.http_client import HTTPClientManager
+
+async def start_stub_server(handler):
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def make_client(**overrides):
+    config = HTTPClientConfig(backoff_base=0.01, backoff_max=0.05, **overrides)
+    return HTTPClientManager(config)
+
+def test_reuses_keep_alive_connections():
+    client_ports = []
+
+    async def handler(request):
+        client_ports.append(request.transport.get_extra_info("peername")[1])
+        return web.json_response({"ok": True})
+
+    async def run():
+        runner, base_url = await start_stub_server(handler)
+        client = make_client()
+        try:
+            for _ in range(3):
+                async with client.request("GET", f"{base_url}/search") as response:
+                    assert (await response.json()) == {"ok": True}
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+    assert len(set(client_ports)) == 1
+
+def test_retries_retryable_statuses_with_backoff():
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request.path)
+        if len(attempts) < 3:
+            return web.Response(status=503)
+        return web.Response(text="done")
+
+    async def run():
+        runner, base_url = await start_stub_server(handler)
+        client = make_client(max_retries=3)
+        try:
+            async with client.request("GET", f"{base_url}/paper.pdf") as response:
+                return response.status, await response.text()
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == (200, "done")
+    assert len(attempts) == 3
+
+def test_returns_last_response_when_retries_are_exhausted():
+    async def handler(request):
+        return web.Response(status=429)
+
+    async def run():
+        runner, base_url = await start_stub_server(handler)
+        client = make_client(max_retries=1)
+        try:
+            async with client.request("GET", base_url) as response:
+                return response.status
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == 429
@@ -0,0 +1,54 @@
+import asyncio
+import numpy as np
+import pytest
+from researcher.core.utils import ingestion
+from researcher.core.config.vector_store_config import VECTOR_STORE_CONFIG
+
+@pytest.fixture
+def written(monkeypatch):
+    written = {"indexes": [], "corpus": []}
+
+    async def extract_text(file_path, content=None):
+        return "intro. method. results."
+
+    async def chunk_text(text):
+        return text.split(" ")
+
+    async def embed(chunks):
+        return np.ones((len(chunks), 3), dtype=np.float32)
+
+    def create_index(chunks, metadata, vectors):
+        written["indexes"].append(metadata["filename"])
+        return f"index_{metadata['filename']}"
+
+    def add_to_corpus(filename, chunks, vectors, source):
+        written["corpus"].append(filename)
+        return None
+
+    monkeypatch.setattr(ingestion, "extract_text", extract_text)
+    monkeypatch.setattr(ingestion, "chunk_text", chunk_text)
+    monkeypatch.setattr(ingestion.embedding_batcher, "embed", embed)
+    monkeypatch.setattr(ingestion, "create_index", create_index)
+    monkeypatch.setattr(ingestion, "add_to_corpus", add_to_corpus)
+    monkeypatch.setattr(ingestion, "schedule_corpus_maintenance", lambda: None)
+    return written
+
+@pytest.mark.parametrize("per_document_indexes", [True, False])
+def test_per_document_indexes_can_be_turned_off(written, monkeypatch, per_document_indexes):
+    monkeypatch.setattr(VECTOR_STORE_CONFIG.corpus, "enabled", True)
+    monkeypatch.setattr(VECTOR_STORE_CONFIG.corpus, "per_document_indexes", per_document_indexes)
+
+    result = asyncio.run(ingestion.ingest_document("/tmp/paper.pdf", "paper.pdf"))
+
+    assert written["corpus"] == ["paper.pdf"]
+    assert written["indexes"] == (["paper.pdf"] if per_document_indexes else [])
+    assert result["index_path"] == ("index_paper.pdf" if per_document_indexes else None)
+    assert result["num_chunks"] == 3
+
+def test_per_document_index_is_kept_when_the_corpus_is_disabled(written, monkeypatch):
+    monkeypatch.setattr(VECTOR_STORE_CONFIG.corpus, "enabled", False)
+    monkeypatch.setattr(VECTOR_STORE_CONFIG.corpus, "per_document_indexes", False)
+
+    result = asyncio.run(ingestion.ingest_document("/tmp/paper.pdf", "paper.pdf"))
+
+    assert result["index_path"] == "index_paper.pdf"
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from researcher.core.utils import ingestion_jobs
+from researcher.core.utils.ingestion import INGESTION_STAGES
+from researcher.core.utils.ingestion_jobs import (
+    IngestionJob,
+    IngestionJobManager,
+    JobStatus,
+    JobStore,
+    StageStatus
+)
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    yield store
+    store.close()
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(ingestion_jobs.summary_manager, "schedule", scheduled.append)
+    return scheduled
+
+def fake_ingest(seen_stages, error=None):
+    async def ingest_document(file_path, filename, on_stage, content=None, source=None):
+        for stage in INGESTION_STAGES:
+            await on_stage(stage)
+            seen_stages.append(stage)
+            if error is not None and stage == INGESTION_STAGES[1]:
+                raise error
+        return {"index_path": f"index_{filename}", "chunks": 3}
+    return ingest_document
+
+async def run_jobs(manager, submit=None):
+    await manager.start()
+    job = submit() if submit else None
+    await manager._queue.join()
+    await manager.stop()
+    return job
+
+def test_submitted_job_runs_every_stage(store, scheduled, monkeypatch):
+    seen_stages = []
+    monkeypatch.setattr(ingestion_jobs, "ingest_document", fake_ingest(seen_stages))
+    manager = IngestionJobManager(store, max_workers=1)
+
+    job = asyncio.run(run_jobs(manager, lambda: manager.submit_file("/tmp/paper.pdf", "paper.pdf")))
+
+    done = store.get(job.job_id)
+    assert done.status == JobStatus.COMPLETED
+    assert done.stages == {stage: StageStatus.COMPLETED for stage in INGESTION_STAGES}
+    assert seen_stages == INGESTION_STAGES
+    assert done.result["index_path"] == "index_paper.pdf"
+    assert scheduled == ["index_paper.pdf"]
+
+def test_failed_job_records_the_error(store, scheduled, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs, "ingest_document", fake_ingest([], error=ValueError("no text found")))
+    manager = IngestionJobManager(store, max_workers=1)
+
+    job = asyncio.run(run_jobs(manager, lambda: manager.submit_file("/tmp/paper.pdf", "paper.pdf")))
+
+    failed = store.get(job.job_id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "no text found"
+    assert failed.current_stage == INGESTION_STAGES[1]
+    assert scheduled == []
+
+def test_unfinished_jobs_are_requeued_on_start(store, scheduled, monkeypatch):
+    interrupted = IngestionJob(
+        file_path="/tmp/paper.pdf",
+        filename="paper.pdf",
+        status=JobStatus.RUNNING,
+        current_stage=INGESTION_STAGES[2],
+        stages={stage: StageStatus.COMPLETED for stage in INGESTION_STAGES[:2]}
+    )
+    finished = IngestionJob(filename="old.pdf", status=JobStatus.COMPLETED)
+    store.save(interrupted)
+    store.save(finished)
+    seen_stages = []
+    monkeypatch.setattr(ingestion_jobs, "ingest_document", fake_ingest(seen_stages))
+
+    asyncio.run(run_jobs(IngestionJobManager(store, max_workers=2)))
+
+    assert store.get(interrupted.job_id).status == JobStatus.COMPLETED
+    assert seen_stages == INGESTION_STAGES
+    assert store.unfinished() == []
+    assert scheduled == ["index_paper.pdf"]
@@ -0,0 +1,43 @@
+import pytest
+from researcher.core.utils.lru_cache import LRUCache
+
+def test_evicts_least_recently_used_by_entry_count():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_evicts_by_total_bytes():
+    evicted = []
+    cache = LRUCache(max_entries=10, max_bytes=100, on_evict=lambda k, v: evicted.append(k))
+    cache.put("a", "x", nbytes=60)
+    cache.put("b", "y", nbytes=60)
+
+    assert evicted == ["a"]
+    assert cache.stats()["bytes"] == 60
+
+def test_counts_hits_and_misses():
+    cache = LRUCache(max_entries=4)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == pytest.approx(0.5)
+
+def test_expired_entries_read_as_misses():
+    cache = LRUCache(max_entries=4)
+    cache.put("fresh", 1, ttl=60)
+    cache.put("stale", 2, ttl=0)
+
+    assert cache.get("fresh") == 1
+    assert cache.get("stale") is None
+    assert "stale" not in cache
+    assert cache.stats()["expirations"] == 1
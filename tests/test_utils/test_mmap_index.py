@@ -0,0 +1,119 @@
+import os
+import numpy as np
+import pytest
+from researcher.core.config.vector_store_config import AnnConfig, CompressionConfig
+from researcher.core.utils.ann_index import ANN_FILE, choose_index_type
+from researcher.core.utils.mmap_index import MMapIndex, is_mmap_index, normalize_vectors
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "index_paper_pdf.bin")
+
+def test_write_and_search_returns_top_k_documents(index_path):
+    texts = ["alpha chunk", "beta chunk", "gamma chunk"]
+    vectors = np.eye(3, dtype=np.float32)
+    MMapIndex.write(index_path, texts, vectors, metadatas=[{"filename": "paper.pdf"}] * 3, embedding_model="test-model")
+
+    assert is_mmap_index(index_path)
+    index = MMapIndex(index_path)
+    documents = index.similarity_search_by_vector([0.1, 0.9, 0.0], k=2)
+
+    assert [doc.page_content for doc in documents] == ["beta chunk", "alpha chunk"]
+    assert documents[0].metadata["filename"] == "paper.pdf"
+    assert index.embedding_model == "test-model"
+
+def test_reads_unicode_texts_by_offset(index_path):
+    texts = ["naïve résumé", "", "∑ x²"]
+    MMapIndex.write(index_path, texts, np.random.rand(3, 4))
+
+    assert MMapIndex(index_path).get_texts([2, 0, 1]) == ["∑ x²", "naïve résumé", ""]
+
+def test_rewrite_replaces_index_and_content_hash(index_path):
+    first = MMapIndex.write(index_path, ["one"], np.ones((1, 2)))
+    second = MMapIndex.write(index_path, ["two"], np.ones((1, 2)))
+
+    assert first.content_hash != second.content_hash
+    assert MMapIndex(index_path).get_texts([0]) == ["two"]
+
+def test_search_batch_matches_single_query_search(index_path):
+    vectors = np.random.default_rng(0).normal(size=(20, 8)).astype(np.float32)
+    index = MMapIndex.write(index_path, [f"chunk {i}" for i in range(20)], vectors)
+    queries = np.random.default_rng(1).normal(size=(3, 8)).astype(np.float32)
+
+    batched = index.search_batch(queries, k=4)
+
+    for query, hits in zip(queries, batched):
+        assert [i for i, _ in hits] == [i for i, _ in index.search(query, k=4)]
+
+def test_choose_index_type_by_vector_count():
+    config = AnnConfig(flat_max_vectors=100, hnsw_max_vectors=1000, ivfpq_min_vectors=10000)
+
+    assert [choose_index_type(n, config) for n in (10, 500, 5000, 50000)] == ["flat", "hnsw", "ivf", "ivfpq"]
+    assert choose_index_type(10, AnnConfig(index_type="ivf")) == "ivf"
+
+@pytest.mark.parametrize("index_type", ["hnsw", "ivf"])
+def test_ann_index_matches_exact_search(index_path, index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 16)).astype(np.float32)
+    config = AnnConfig(index_type=index_type, nprobe=64, ef_search=128, flat_max_vectors=100)
+    index = MMapIndex.write(index_path, [f"chunk {i}" for i in range(2000)], vectors, ann_config=config)
+
+    assert index.index_type == index_type
+    assert os.path.isfile(os.path.join(index_path, ANN_FILE))
+    query = rng.normal(size=16)
+    exact = index._exact_search(normalize_vectors(query.reshape(1, -1))[0], 10)
+    approximate = index.search(query, k=10)
+    assert len({i for i, _ in exact} & {i for i, _ in approximate}) >= 9
+
+def test_small_filtered_search_does_not_load_the_ann_index(index_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 16)).astype(np.float32)
+    metadatas = [{"filename": "big.pdf"}] * 1990 + [{"filename": "small.pdf"}] * 10
+    config = AnnConfig(index_type="ivf", flat_max_vectors=100)
+    MMapIndex.write(index_path, [f"chunk {i}" for i in range(2000)], vectors, metadatas=metadatas, ann_config=config)
+    index = MMapIndex(index_path, ann_config=config)
+
+    hits = index.search(rng.normal(size=16), k=5, allowed_metadata_ids=index.metadata_rows("filename", ["small.pdf"]))
+
+    assert {i for i, _ in hits} <= set(range(1990, 2000))
+    assert index._ann is None
+
+def test_small_indexes_are_searched_exactly(index_path):
+    index = MMapIndex.write(index_path, ["a", "b"], np.eye(2), ann_config=AnnConfig(index_type="ivf"))
+
+    assert index.index_type == "flat"
+    assert index.ann_index() is None
+    assert not os.path.exists(os.path.join(index_path, ANN_FILE))
+
+@pytest.mark.parametrize("compression", [
+    CompressionConfig(codec="fp16"),
+    CompressionConfig(codec="int8"),
+    CompressionConfig(codec="int8", pca_dim=16, rescore_factor=8)
+])
+def test_compressed_scan_is_rescored_to_exact_results(tmp_path, compression):
+    # Embeddings have low intrinsic dimension, which is what PCA exploits
+    rng = np.random.default_rng(0)
+    basis = rng.normal(size=(12, 64))
+    vectors = rng.normal(size=(1000, 12)) @ basis + 0.05 * rng.normal(size=(1000, 64))
+    texts = [f"chunk {i}" for i in range(1000)]
+    exact = MMapIndex.write(str(tmp_path / "exact"), texts, vectors)
+    compressed = MMapIndex.write(str(tmp_path / "compressed"), texts, vectors, compression_config=compression)
+
+    assert compressed.memory_bytes() < exact.memory_bytes()
+    query = rng.normal(size=12) @ basis
+    expected = exact.search(query, k=5)
+    found = compressed.search(query, k=5, excluded_ids=[expected[0][0]])
+    assert found[0][0] != expected[0][0]
+    assert len({i for i, _ in found} & {i for i, _ in expected[1:]}) >= 3
+    # Scores come from the float32 vectors, not the codes
+    assert np.isclose(found[0][1], dict(expected).get(found[0][0], found[0][1]), atol=1e-5)
+
+def test_ann_indexes_store_quantized_codes(index_path):
+    vectors = np.random.default_rng(0).normal(size=(2000, 16)).astype(np.float32)
+    index = MMapIndex.write(
+        index_path, [str(i) for i in range(2000)], vectors,
+        ann_config=AnnConfig(index_type="ivf", nprobe=64), compression_config=CompressionConfig(codec="int8")
+    )
+
+    assert index.codec == "int8"
+    assert index.search(vectors[7], k=1)[0][0] == 7
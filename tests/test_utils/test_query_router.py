@@ -0,0 +1,62 @@
+import asyncio
+import json
+from langchain.docstore.document import Document
+from researcher.core.config.router_config import QueryRouterConfig
+from researcher.core.utils.query_router import QueryRouter
+from researcher.core.utils.search_utils import QueryAnalyzer, FunctionRegistry
+
+class RecordingModel:
+    def __init__(self, choice: str):
+        self.choice = choice
+        self.calls = []
+
+    async def generate_text_with_functions(self, prompt, system_prompt, functions, max_tokens=None):
+        self.calls.append(max_tokens)
+        return json.dumps({"name": self.choice, "arguments": "{}"})
+
+def make_router(choice: str):
+    model = RecordingModel(choice)
+    config = QueryRouterConfig(
+        document_similarity_threshold=0.8,
+        external_similarity_threshold=0.7,
+        llm_max_tokens=42
+    )
+    return QueryRouter(model, QueryAnalyzer(), FunctionRegistry(), config), model
+
+def chunks(score: float):
+    return [Document(page_content="transformers use attention layers", metadata={"score": score})]
+
+def test_confident_document_query_skips_llm():
+    router, model = make_router("google_search")
+    decision = asyncio.run(router.route("how do attention layers work", chunks(0.9), "transformers use attention layers"))
+    assert decision.function_name == "answer_from_document"
+    assert decision.tier == "local"
+    assert model.calls == []
+
+def test_temporal_query_with_weak_match_goes_to_search_locally():
+    router, model = make_router("answer_from_document")
+    decision = asyncio.run(router.route("what are the latest results", chunks(0.5), "transformers use attention layers"))
+    assert decision.function_name == "google_search"
+    assert decision.tier == "local"
+    assert model.calls == []
+
+def test_ambiguous_query_falls_back_to_capped_llm_call():
+    router, model = make_router("google_search")
+    decision = asyncio.run(router.route("how do attention layers work", chunks(0.75), "transformers use attention layers"))
+    assert decision.tier == "llm"
+    assert decision.function_name == "google_search"
+    assert model.calls == [42]
+    assert router.stats()["agreement_rate"] == 0.0
+
+def test_whole_word_matching_ignores_substrings():
+    analysis = QueryAnalyzer().analyze_query("what is the nowcasting approach", "nowcasting approach explained")
+    assert not analysis["temporal_match"]
+
+def test_inflected_keywords_still_match():
+    analyzer = QueryAnalyzer()
+
+    for query in ["what are the trends since then", "any updates on this method", "which is the newest model"]:
+        assert analyzer.analyze_query(query, query)["temporal_match"], query
+    for query in ["a comparison with prior work", "how does it compare to others"]:
+        assert analyzer.analyze_query(query, query)["external_match"], query
+    assert not analyzer.analyze_query("do we know the network depth", "network depth")["temporal_match"]
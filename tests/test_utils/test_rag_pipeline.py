@@ -0,0 +1,156 @@
+import asyncio
+import gc
+import pytest
+from langchain.docstore.document import Document
+from researcher.core.utils import rag_pipeline
+from researcher.core.utils.concurrency import TokenBucket
+from researcher.core.utils.model_factory import ModelFactory, ModelProvider
+from researcher.core.utils.query_router import ANSWER_FROM_DOCUMENT, GOOGLE_SEARCH, RouteDecision
+from researcher.core.utils.rag_pipeline import RAGPipeline
+from researcher.core.utils.search_utils import SearchResult
+
+class FakeModel:
+    model_name = "test-model"
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    async def stream_text(self, prompt, system_prompt=None):
+        for token in ["The ", "answer"]:
+            yield token
+
+    def stats(self):
+        return {}
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    created = []
+
+    def create_model(provider):
+        created.append(FakeModel())
+        return created[-1]
+
+    monkeypatch.setattr(ModelFactory, "create_model", staticmethod(create_model))
+    monkeypatch.setattr(ModelFactory, "_models", {})
+    monkeypatch.setattr(RAGPipeline, "_pipelines", {})
+    return created
+
+def test_pipelines_are_rebuilt_after_models_are_closed(fake_models):
+    first = RAGPipeline.for_provider(ModelProvider.OPENAI)
+    assert RAGPipeline.for_provider(ModelProvider.OPENAI) is first
+
+    asyncio.run(ModelFactory.close_all())
+    RAGPipeline.clear()
+
+    second = RAGPipeline.for_provider(ModelProvider.OPENAI)
+    assert first.model.closed
+    assert second is not first and not second.model.closed
+
+def test_stream_answer_yields_context_tokens_then_sources(fake_models, monkeypatch):
+    pipeline = RAGPipeline.for_provider(ModelProvider.OPENAI)
+    chunk = Document(page_content="text", metadata={"filename": "a.pdf", "chunk_id": 3, "score": 0.9})
+
+    async def plan_answer(query, similar_chunks):
+        return {"context": "document", "prompt": "prompt", "chunks": similar_chunks, "search_results": []}
+
+    monkeypatch.setattr(pipeline, "_plan_answer", plan_answer)
+
+    async def run():
+        return [event async for event in pipeline.stream_answer("question", [chunk])]
+
+    events = asyncio.run(run())
+
+    assert [event["event"] for event in events] == ["context", "token", "token", "sources"]
+    assert "".join(event["data"] for event in events if event["event"] == "token") == "The answer"
+    assert events[-1]["data"]["documents"][0]["chunk_id"] == 3
+    assert events[-1]["data"]["web"] == []
+
+class StubRouter:
+    """Leans towards web search locally but is unsure, so the LLM decides after a delay"""
+
+    def __init__(self, events, function_name):
+        self.events = events
+        self.function_name = function_name
+
+    def local_decision(self, query, similar_chunks, context):
+        return {"function_name": GOOGLE_SEARCH, "confident": False}
+
+    def needs_llm(self, local):
+        return True
+
+    async def route(self, query, similar_chunks, context, local=None):
+        self.events.append("route started")
+        await asyncio.sleep(0.05)
+        self.events.append("route finished")
+        return RouteDecision(self.function_name, "llm", [])
+
+class StubSearch:
+    def __init__(self, events, delay, error=None):
+        self.events = events
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def search(self, query):
+        self.calls += 1
+        self.events.append("search started")
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            if self.error is not None:
+                # e.g. a client that turns the cancellation into its own error
+                self.events.append("search failed")
+                raise self.error
+            self.events.append("search cancelled")
+            raise
+        self.events.append("search finished")
+        return [SearchResult("Result", "https://example.com", "recent news")]
+
+def plan_with_route(monkeypatch, function_name, search_delay, search_error=None):
+    monkeypatch.setattr(rag_pipeline, "speculative_search_budget", TokenBucket(60, 5))
+    monkeypatch.setattr(rag_pipeline.SEARCH_CONFIG, "speculative_search_enabled", True)
+    pipeline = RAGPipeline.for_provider(ModelProvider.OPENAI)
+    events = []
+    pipeline.router = StubRouter(events, function_name)
+    pipeline.google_search = StubSearch(events, search_delay, search_error)
+    chunk = Document(page_content="document text", metadata={"chunk_id": 0, "score": 0.5})
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: events.append(context["message"]))
+        plan = await pipeline._plan_answer("latest results?", [chunk])
+        events.append("plan returned")
+        await asyncio.sleep(0.01)
+        # Unretrieved task exceptions are reported when the task is collected
+        gc.collect()
+        return plan
+
+    return pipeline, events, asyncio.run(run())
+
+def test_speculative_search_is_used_when_the_route_agrees(fake_models, monkeypatch):
+    pipeline, events, plan = plan_with_route(monkeypatch, GOOGLE_SEARCH, search_delay=0.01)
+
+    # The search ran while the routing completion was in flight, and only once
+    assert events.index("search finished") < events.index("route finished")
+    assert pipeline.google_search.calls == 1
+    assert [result.title for result in plan["search_results"]] == ["Result"]
+    assert pipeline.speculative_search_stats() == {"started": 1, "used": 1, "discarded": 0}
+
+def test_speculative_search_is_cancelled_when_the_route_disagrees(fake_models, monkeypatch):
+    pipeline, events, plan = plan_with_route(monkeypatch, ANSWER_FROM_DOCUMENT, search_delay=1.0)
+
+    assert events == ["route started", "search started", "route finished", "search cancelled", "plan returned"]
+    assert plan["search_results"] == []
+    assert "Additional Information from Web Search" not in plan["prompt"]
+    assert pipeline.speculative_search_stats() == {"started": 1, "used": 0, "discarded": 1}
+
+def test_discarded_search_errors_are_retrieved_before_returning(fake_models, monkeypatch):
+    pipeline, events, plan = plan_with_route(
+        monkeypatch, ANSWER_FROM_DOCUMENT, search_delay=1.0, search_error=RuntimeError("connection reset")
+    )
+
+    assert events == ["route started", "search started", "route finished", "search failed", "plan returned"]
+    assert plan["search_results"] == []
+    assert pipeline.speculative_search_stats() == {"started": 1, "used": 0, "discarded": 1}
@@ -0,0 +1,30 @@
+import asyncio
+from researcher.core.utils import search_utils
+from researcher.core.utils.search_utils import GoogleSearchTool, SearchResult
+
+def test_repeated_queries_and_errors_are_served_from_cache(monkeypatch):
+    search_utils.search_cache.clear()
+    calls = []
+
+    async def fake_fetch(self, query, max_results):
+        calls.append((query, max_results))
+        if query == "broken":
+            return [], True
+        return [SearchResult("title", "https://example.com", "snippet")], False
+
+    monkeypatch.setattr(GoogleSearchTool, "_fetch", fake_fetch)
+    tool = GoogleSearchTool()
+
+    async def run():
+        first = await tool.search("Latest  Transformers")
+        second = await tool.search("latest transformers")
+        await tool.search("latest transformers", max_results=3)
+        await tool.search("broken")
+        errored = await tool.search("broken")
+        return first, second, errored
+
+    first, second, errored = asyncio.run(run())
+
+    assert [r.url for r in second] == [r.url for r in first]
+    assert errored == []
+    assert calls == [("Latest  Transformers", 5), ("latest transformers", 3), ("broken", 5)]
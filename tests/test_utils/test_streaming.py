@@ -0,0 +1,64 @@
+import asyncio
+import json
+from researcher.core.utils.streaming import collect_stream, format_sse, replay_events, stream_events
+
+async def events_from(items, error=None):
+    for item in items:
+        yield item
+    if error is not None:
+        raise error
+
+async def collect(stream):
+    return [item async for item in stream]
+
+def parse_sse(frames):
+    parsed = []
+    for frame in frames:
+        assert frame.endswith("\n\n")
+        event_line, data_line = frame.strip("\n").split("\n")
+        parsed.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return parsed
+
+def test_format_sse_frames_json_data():
+    assert format_sse("token", "a\nb") == 'event: token\ndata: "a\\nb"\n\n'
+
+def test_stream_ends_with_done_event():
+    events = [{"event": "token", "data": "Hello"}, {"event": "sources", "data": {"documents": []}}]
+
+    frames = asyncio.run(collect(stream_events(events_from(events))))
+
+    assert parse_sse(frames) == [("token", "Hello"), ("sources", {"documents": []}), ("done", {})]
+
+def test_stream_failure_ends_with_error_event():
+    events = events_from([{"event": "token", "data": "Hel"}], error=RuntimeError("model timed out"))
+
+    frames = asyncio.run(collect(stream_events(events)))
+
+    assert parse_sse(frames) == [("token", "Hel"), ("error", {"detail": "model timed out"})]
+
+def test_completed_stream_is_handed_to_the_cache_callback():
+    completed = []
+    events = [
+        {"event": "context", "data": "document"},
+        {"event": "token", "data": "Hel"},
+        {"event": "token", "data": "lo"},
+        {"event": "sources", "data": {"documents": [1]}}
+    ]
+
+    passed = asyncio.run(collect(collect_stream(events_from(events), lambda *result: completed.append(result))))
+
+    assert passed == events
+    assert completed == [("Hello", {"documents": [1]})]
+
+def test_interrupted_stream_is_not_cached():
+    completed = []
+    events = events_from([{"event": "token", "data": "Hel"}], error=RuntimeError("model timed out"))
+
+    frames = asyncio.run(collect(stream_events(collect_stream(events, lambda *result: completed.append(result)))))
+
+    assert parse_sse(frames)[-1][0] == "error"
+    assert completed == []
+
+def test_cached_answers_replay_as_one_token():
+    events = asyncio.run(collect(replay_events("Hello", {"documents": []})))
+    assert events == [{"event": "token", "data": "Hello"}, {"event": "sources", "data": {"documents": []}}]
@@ -0,0 +1,70 @@
+import asyncio
+from langchain.docstore.document import Document
+from researcher.core.config.summary_config import SummaryConfig
+from researcher.core.utils.summarizer import Summarizer, group_by_budget
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+class RecordingModel:
+    model_name = "test-model"
+
+    def __init__(self):
+        self.prompts = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_text(self, prompt, system_prompt=None):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return "partial summary"
+
+def make_chunks(count: int, words: int):
+    return [
+        Document(page_content=" ".join([f"w{i}"] * words), metadata={"chunk_id": i})
+        for i in reversed(range(count))
+    ]
+
+def test_group_by_budget_packs_consecutive_texts():
+    groups = group_by_budget(["a b", "c d", "e f g", "h"], count_words, max_tokens=4)
+    assert groups == [["a b", "c d"], ["e f g", "h"]]
+
+def test_short_documents_use_a_single_call():
+    model = RecordingModel()
+    summarizer = Summarizer(model, SummaryConfig(single_pass_max_tokens=100), count_tokens=count_words)
+
+    asyncio.run(summarizer.summarize(make_chunks(3, 10)))
+
+    assert len(model.prompts) == 1
+    assert model.prompts[0].index("w0") < model.prompts[0].index("w2")
+
+def test_long_documents_are_mapped_concurrently_then_reduced():
+    model = RecordingModel()
+    config = SummaryConfig(single_pass_max_tokens=5, group_max_tokens=20, max_concurrent_calls=2)
+    summarizer = Summarizer(model, config, count_tokens=count_words)
+
+    asyncio.run(summarizer.summarize(make_chunks(8, 10)))
+
+    # 4 map calls, one combine call for the partial summaries, then the final summary
+    assert len(model.prompts) == 4 + 1 + 1
+    assert "Section summaries" in model.prompts[4]
+    assert model.peak == 2
+
+class NonShrinkingModel(RecordingModel):
+    async def generate_text(self, prompt, system_prompt=None):
+        self.prompts.append(prompt)
+        return " ".join(["long"] * 50)
+
+def test_reduce_stops_when_one_summary_is_left_over_budget():
+    model = NonShrinkingModel()
+    config = SummaryConfig(single_pass_max_tokens=5, group_max_tokens=20)
+    summarizer = Summarizer(model, config, count_tokens=count_words)
+
+    asyncio.run(summarizer.summarize(make_chunks(4, 10)))
+
+    # 2 map calls, combine calls until one partial is left, then the final summary
+    assert len(model.prompts) < 10
+    assert "Please summarize" in model.prompts[-1]
@@ -0,0 +1,124 @@
+import asyncio
+from researcher.core.config.summary_config import SummaryConfig
+from researcher.core.utils import summary_cache
+from researcher.core.utils.summary_cache import SummaryManager, SummaryStore
+
+SCOPE = ("index-hash", "openai", "gpt-3.5-turbo")
+
+def test_store_round_trip(tmp_path):
+    store = SummaryStore(str(tmp_path / "summaries.sqlite"))
+    store.put(SCOPE, "summary", {"documents": [{"chunk_id": 1}], "web": []})
+
+    cached = store.get(SCOPE)
+    assert cached["summary"] == "summary"
+    assert cached["sources"]["documents"] == [{"chunk_id": 1}]
+    assert store.get(("other-hash",) + SCOPE[1:]) is None
+
+def test_requests_wait_for_in_flight_generation(tmp_path, monkeypatch):
+    manager = SummaryManager(SummaryStore(str(tmp_path / "summaries.sqlite")))
+    generations = []
+
+    async def fake_generate(rag, index_path, scope):
+        generations.append(index_path)
+        await asyncio.sleep(0.02)
+        result = {"summary": "summary", "sources": {"documents": [], "web": []}}
+        manager.store_summary(scope, result["summary"], result["sources"])
+        return result
+
+    monkeypatch.setattr(manager, "_generate", fake_generate)
+    monkeypatch.setattr(SummaryManager, "scope", staticmethod(lambda rag, index_path: SCOPE))
+
+    async def run():
+        background = manager._start(None, "index", SCOPE)
+        waiting = await asyncio.gather(manager.get_summary(None, "index"), manager.get_summary(None, "index"))
+        await background
+        return waiting, await manager.get_summary(None, "index")
+
+    waiting, later = asyncio.run(run())
+
+    assert generations == ["index"]
+    assert [result["summary"] for result in waiting] == ["summary", "summary"]
+    assert later["summary"] == "summary"
+    assert manager.stats()["waits_on_in_flight"] == 2
+
+def test_background_summaries_run_a_few_at_a_time(tmp_path, monkeypatch):
+    manager = SummaryManager(SummaryStore(str(tmp_path / "summaries.sqlite")), SummaryConfig(max_background_summaries=2))
+    running, peak = 0, 0
+
+    async def fake_generate(rag, index_path, scope):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"summary": index_path, "sources": {}}
+
+    monkeypatch.setattr(manager, "_generate", fake_generate)
+
+    async def run():
+        tasks = [manager._start(None, f"index-{i}", (f"hash-{i}",) + SCOPE[1:], background=True) for i in range(6)]
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+
+    assert peak == 2
+    assert len(results) == 6
+
+class StreamingRag:
+    def __init__(self):
+        self.streams = 0
+
+    async def stream_summary(self, chunks):
+        self.streams += 1
+        for token in ["stream", "ed"]:
+            await asyncio.sleep(0.01)
+            yield {"event": "token", "data": token}
+        yield {"event": "sources", "data": {"documents": [], "web": []}}
+
+def test_requests_wait_for_an_in_flight_stream(tmp_path, monkeypatch):
+    manager = SummaryManager(SummaryStore(str(tmp_path / "summaries.sqlite")))
+    rag = StreamingRag()
+
+    async def retrieve(rag, index_path):
+        return []
+
+    monkeypatch.setattr(summary_cache, "retrieve_summary_chunks", retrieve)
+    monkeypatch.setattr(SummaryManager, "scope", staticmethod(lambda rag, index_path: SCOPE))
+
+    async def consume(events):
+        return [event async for event in events]
+
+    async def run():
+        events = await manager.stream_summary(rag, "index", SCOPE)
+        streamed, waiting = await asyncio.gather(consume(events), manager.get_summary(rag, "index"))
+        return streamed, waiting
+
+    streamed, waiting = asyncio.run(run())
+
+    assert rag.streams == 1
+    assert [event["event"] for event in streamed] == ["token", "token", "sources"]
+    assert waiting["summary"] == "streamed"
+    assert manager.store.get(SCOPE)["summary"] == "streamed"
+
+def test_waiters_generate_when_a_stream_ends_early(tmp_path, monkeypatch):
+    manager = SummaryManager(SummaryStore(str(tmp_path / "summaries.sqlite")))
+
+    async def retrieve(rag, index_path):
+        return []
+
+    async def fake_generate(rag, index_path, scope):
+        return {"summary": "generated", "sources": {}}
+
+    monkeypatch.setattr(summary_cache, "retrieve_summary_chunks", retrieve)
+    monkeypatch.setattr(manager, "_generate", fake_generate)
+    monkeypatch.setattr(SummaryManager, "scope", staticmethod(lambda rag, index_path: SCOPE))
+
+    async def run():
+        events = await manager.stream_summary(StreamingRag(), "index", SCOPE)
+        waiting = asyncio.create_task(manager.get_summary(None, "index"))
+        await events.__anext__()
+        await events.aclose()
+        return await waiting
+
+    assert asyncio.run(run())["summary"] == "generated"
+    assert manager.stats()["in_flight"] == 0
@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pytest
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from researcher.core.utils.mmap_index import MMapIndex, UnsupportedIndexFormatError, normalize_vectors
+from researcher.core.utils import vector_store
+from researcher.core.utils.vector_store import LEGACY_EMBEDDING_MODEL, convert_legacy_index, load_index, mmr_select
+
+def test_mmr_select_drops_near_duplicates_and_prefers_diversity():
+    vectors = normalize_vectors(np.array([
+        [1.0, 0.0, 0.0],
+        [0.999, 0.01, 0.0],
+        [0.9, 0.3, 0.0],
+        [0.0, 0.0, 1.0]
+    ], dtype=np.float32))
+    relevance = np.array([0.9, 0.89, 0.85, 0.5], dtype=np.float32)
+
+    selected = mmr_select(vectors, relevance, k=3, lambda_mult=0.5, duplicate_threshold=0.99)
+
+    assert selected[0] == 0
+    assert 1 not in selected
+    assert set(selected) == {0, 2, 3}
+
+def test_legacy_indexes_raise_a_conversion_error(tmp_path):
+    legacy = tmp_path / "index_paper_pdf.bin"
+    legacy.mkdir()
+    (legacy / "index.faiss").write_bytes(b"")
+    (legacy / "index.pkl").write_bytes(b"")
+
+    with pytest.raises(UnsupportedIndexFormatError, match="convert_faiss_indexes.py"):
+        load_index(str(legacy))
+
+def test_converted_indexes_record_the_legacy_embedding_model(tmp_path):
+    legacy = str(tmp_path / "index_paper_pdf.bin")
+    FAISS.from_texts(["intro", "method"], FakeEmbeddings(size=8), metadatas=[{"filename": "paper.pdf"}] * 2).save_local(legacy)
+
+    convert_legacy_index(legacy)
+
+    index = MMapIndex(legacy)
+    assert index.embedding_model == LEGACY_EMBEDDING_MODEL
+    assert index.ntotal == 2 and index.vectors.shape == (2, 8)
+
+def test_evicted_indexes_are_forgotten(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store.index_cache, "max_entries", 1)
+    paths = [str(tmp_path / name) for name in ("index_a", "index_b")]
+    for path in paths:
+        MMapIndex.write(path, ["text"], np.eye(1, 3))
+        load_index(path)
+
+    assert os.path.abspath(paths[0]) not in vector_store._cached_index_mtimes
+    assert os.path.abspath(paths[1]) in vector_store._cached_index_mtimes